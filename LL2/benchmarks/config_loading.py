@@ -0,0 +1,135 @@
+"""
+Lightning Lesson 2: Config Loading Benchmark
+Startup time of ConfigLoader for a generated 10k-entry persona fleet in single-file and sharded layouts
+
+Usage:
+    python benchmarks/config_loading.py
+    python benchmarks/config_loading.py --entries 10000 --repeat 3 --output artifacts/benchmarks/config_loading.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+from pathlib import Path
+from statistics import median
+
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src import config_loader
+from src.config_loader import ConfigLoader, CACHE_DIR_NAME
+
+
+def generate_fleet(entries: int):
+    """Agents, tasks and crews in a 2:2:1 ratio that reference each other"""
+    agents_count = tasks_count = entries * 2 // 5
+    crews_count = entries - agents_count - tasks_count
+    agents = {
+        f"persona_{i:05d}_agent": {
+            "role": f"Persona {i} Specialist",
+            "goal": f"Deliver domain expertise for segment {i % 50}",
+            "backstory": "A seasoned professional with a consistent voice. " * 4,
+            "verbose": False,
+            "allow_delegation": False,
+            "max_iter": 3
+        }
+        for i in range(agents_count)
+    }
+    tasks = {
+        f"persona_{i:05d}_task": {
+            "description": f"Write a response for customer segment {i % 50}",
+            "expected_output": "A persona-aligned response",
+            "agent": f"persona_{i:05d}_agent"
+        }
+        for i in range(tasks_count)
+    }
+    crews = {
+        f"persona_{i:05d}_crew": {
+            "agents": [f"persona_{(2 * i) % agents_count:05d}_agent", f"persona_{(2 * i + 1) % agents_count:05d}_agent"],
+            "tasks": [f"persona_{(2 * i) % tasks_count:05d}_task", f"persona_{(2 * i + 1) % tasks_count:05d}_task"],
+            "process": "sequential"
+        }
+        for i in range(crews_count)
+    }
+    return {"agents": agents, "tasks": tasks, "crews": crews}
+
+
+def write_layout(config_dir: Path, fleet, shard_size: int):
+    """Write the fleet as one file per type (shard_size 0) or shards of shard_size entries"""
+    config_dir.mkdir(parents=True)
+    for config_type, entries in fleet.items():
+        if not shard_size:
+            with open(config_dir / f"{config_type}.yaml", 'w', encoding='utf-8') as f:
+                yaml.dump(entries, f, default_flow_style=False, sort_keys=False)
+            continue
+        shard_dir = config_dir / config_type
+        shard_dir.mkdir()
+        names = list(entries)
+        for start in range(0, len(names), shard_size):
+            shard = {name: entries[name] for name in names[start:start + shard_size]}
+            with open(shard_dir / f"{names[start]}.yaml", 'w', encoding='utf-8') as f:
+                yaml.dump(shard, f, default_flow_style=False, sort_keys=False)
+
+
+def time_load(config_dir: Path, repeat: int, use_cache: bool, keep_memory: bool, max_workers=None) -> float:
+    """Median ConfigLoader startup time in seconds"""
+    timings = []
+    for _ in range(repeat):
+        if not keep_memory:
+            config_loader._compiled_configs.clear()
+        start = time.perf_counter()
+        ConfigLoader(str(config_dir), use_cache=use_cache, max_workers=max_workers)
+        timings.append(time.perf_counter() - start)
+    return median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ConfigLoader startup on a generated fleet")
+    parser.add_argument("--entries", type=int, default=10000, help="Total agents + tasks + crews")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (median reported)")
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    fleet = generate_fleet(args.entries)
+    layouts = {"single file": 0, "shards of 100": 100, "file per entry": 1}
+    results = {"entries": args.entries, "loader": config_loader.YAML_LOADER.__name__, "layouts": {}}
+
+    print(f"⏱️  CONFIG LOADING BENCHMARK ({args.entries:,} entries, {results['loader']}, "
+          f"median of {args.repeat})")
+    print("-" * 84)
+    print(f"{'Layout':<16} {'Files':>6} {'Cold 1 thread':>14} {'Cold parallel':>14} {'Disk cache':>11} {'In memory':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for layout, shard_size in layouts.items():
+            config_dir = Path(tmp) / layout.replace(" ", "_")
+            write_layout(config_dir, fleet, shard_size)
+            files = sum(1 for path in config_dir.rglob("*.yaml"))
+
+            timings = {
+                "cold_sequential": time_load(config_dir, args.repeat, use_cache=False, keep_memory=False, max_workers=1),
+                "cold_parallel": time_load(config_dir, args.repeat, use_cache=False, keep_memory=False)
+            }
+            config_loader._compiled_configs.clear()
+            ConfigLoader(str(config_dir))  # populate the on-disk cache
+            timings["disk_cache"] = time_load(config_dir, args.repeat, use_cache=True, keep_memory=False)
+            timings["in_memory"] = time_load(config_dir, args.repeat, use_cache=True, keep_memory=True)
+            assert (config_dir / CACHE_DIR_NAME).is_dir()
+
+            results["layouts"][layout] = {"files": files, **{k: round(v, 4) for k, v in timings.items()}}
+            print(f"{layout:<16} {files:>6} {timings['cold_sequential']:>13.3f}s {timings['cold_parallel']:>13.3f}s "
+                  f"{timings['disk_cache']:>10.3f}s {timings['in_memory']:>9.3f}s")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results saved to: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
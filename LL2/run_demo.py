@@ -9,8 +9,11 @@ Usage:
     python run_demo.py --showcase               # Run persona showcase only
     python run_demo.py --prompt-inspection      # Run prompt inspection demo only
     python run_demo.py --customization          # Run customization approaches demo only
+    python run_demo.py --prompt-budget          # Report prompt token overhead per agent
+    python run_demo.py --compact-prompts        # Write a de-duplicated persona prompt config
     python run_demo.py --task "Your task"       # Run with custom task
     python run_demo.py --crew "crew_name"       # Run specific crew
+    python run_demo.py --showcase --concurrency 3  # Run personas concurrently
 """
 
 import argparse
@@ -41,6 +44,18 @@ def main():
                        help='Run prompt inspection demo only')
     parser.add_argument('--customization', action='store_true',
                        help='Run customization approaches demo only')
+    parser.add_argument('--prompt-budget', action='store_true',
+                       help='Report prompt token overhead for every configured agent')
+    parser.add_argument('--compact-prompts', action='store_true',
+                       help='Detect duplicated persona instructions and write a compacted config')
+    parser.add_argument('--evaluate', action='store_true',
+                       help='Run the persona A/B evaluation with repeated samples')
+    parser.add_argument('--samples', type=int, default=5,
+                       help='Samples per persona and task for --evaluate')
+    parser.add_argument('--rpm', type=float,
+                       help='Crew kickoffs per minute for --evaluate (default: EVAL_REQUESTS_PER_MINUTE or 30)')
+    parser.add_argument('--tokenizer', type=str, default='regex',
+                       help='Token counter for --prompt-budget (regex, chars, tiktoken)')
     parser.add_argument('--task', type=str,
                        help='Task name from config/tasks.yaml for the demo')
     parser.add_argument('--crew', type=str,
@@ -49,6 +64,13 @@ def main():
                        help='List available agents, tasks, and crews')
     parser.add_argument('--validate', action='store_true',
                        help='Validate YAML configurations')
+    parser.add_argument('--concurrency', type=int,
+                       help='Max personas/crews to run at once (default: DEMO_MAX_CONCURRENCY or 1; '
+                            'for --evaluate, EVAL_MAX_CONCURRENCY or 4)')
+    parser.add_argument('--compress-results', action='store_true',
+                       help='Gzip the JSONL results log (default: DEMO_RESULTS_COMPRESS)')
+    parser.add_argument('--results-max-mb', type=float,
+                       help='Rotate the results log after this many MB (default: DEMO_RESULTS_MAX_MB, 0 = never)')
     
     args = parser.parse_args()
     
@@ -73,7 +95,9 @@ def main():
         print("Please set your OpenAI API key in the .env file")
         return 1
     
-    demo = LightningLesson2Demo()
+    demo = LightningLesson2Demo(max_concurrency=args.concurrency,
+                                compress_results=args.compress_results or None,
+                                results_max_mb=args.results_max_mb)
     
     try:
         if args.list_configs:
@@ -123,6 +147,18 @@ def main():
             # Run customization approaches demo only
             demo.run_customization_approaches_demo()
             
+        elif args.prompt_budget:
+            # Run prompt token budget analysis only
+            demo.run_prompt_budget_demo(args.tokenizer)
+            
+        elif args.compact_prompts:
+            # Run prompt compaction only
+            demo.run_prompt_compaction_demo()
+            
+        elif args.evaluate:
+            # Run persona A/B evaluation only
+            demo.run_evaluation_demo([args.task] if args.task else None, args.samples, args.rpm, args.concurrency)
+            
         elif args.comparison:
             # Run comparison demo only
             demo.run_comparison_demo(args.task)
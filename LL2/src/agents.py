@@ -4,24 +4,68 @@ Agent implementations using YAML configurations following CrewAI guidelines
 """
 
 import os
+import json
+import hashlib
+import threading
 from typing import Dict, Any, Optional
 from crewai import Agent, Task, Crew
 from langchain_openai import ChatOpenAI
-from .config_loader import ConfigLoader
+from .config_loader import ConfigLoader, ConfigChange
+from .prompt_slices import load_prompt_slices
+from .template_cache import TemplateCache, default_template_cache
+
+
+# LLM clients shared across factories, keyed by model parameters
+_llm_registry: Dict[str, ChatOpenAI] = {}
+_llm_registry_lock = threading.Lock()
+
+
+def get_shared_llm(model: str, temperature: float = 0.7, **kwargs) -> ChatOpenAI:
+    """Get the ChatOpenAI client for these model parameters, creating it once"""
+    key = json.dumps({"model": model, "temperature": temperature, **kwargs},
+                     sort_keys=True, default=str)
+    with _llm_registry_lock:
+        llm = _llm_registry.get(key)
+        if llm is None:
+            llm = ChatOpenAI(model=model, temperature=temperature, **kwargs)
+            _llm_registry[key] = llm
+    return llm
 
 
 class YAMLAgentFactory:
     """Factory for creating agents from YAML configurations"""
     
-    def __init__(self, config_loader: ConfigLoader):
+    def __init__(self, config_loader: ConfigLoader, template_cache: Optional[TemplateCache] = None):
         self.config_loader = config_loader
-        self.llm = ChatOpenAI(
+        self.template_cache = template_cache or default_template_cache
+        self.llm = get_shared_llm(
             model=os.getenv("OPENAI_MODEL_NAME", "gpt-4o-mini"),
             temperature=0.7
         )
+        self.config_loader.subscribe(self._on_config_change)
+    
+    def create_agent(self, agent_name: str, cache: Optional[Dict[str, Agent]] = None) -> Agent:
+        """Create agent from YAML configuration with prompt customization support.
+
+        Every call builds a new agent unless ``cache`` is given: agents with
+        identical resolved configuration (including loaded templates) are
+        then built once and reused from that dict. ``create_crew`` passes a
+        dict per crew build, so instances are never shared between crews.
+        """
+        agent_params = self._resolve_agent_params(agent_name)
+        if cache is None:
+            return Agent(llm=self.llm, **agent_params)
+        
+        agent_key = hashlib.sha256(
+            json.dumps(agent_params, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+        agent = cache.get(agent_key)
+        if agent is None:
+            agent = cache[agent_key] = Agent(llm=self.llm, **agent_params)
+        return agent
     
-    def create_agent(self, agent_name: str) -> Agent:
-        """Create agent from YAML configuration with prompt customization support"""
+    def _resolve_agent_params(self, agent_name: str) -> Dict[str, Any]:
+        """Resolve agent constructor parameters (except the LLM) from YAML"""
         agent_config = self.config_loader.get_agent_config(agent_name)
         
         if not agent_config:
@@ -50,12 +94,11 @@ class YAMLAgentFactory:
             else:
                 system_template = self._load_template_file(system_template)
         
-        # Create agent with custom templates
+        # Agent parameters with custom templates
         agent_params = {
             "role": role,
             "goal": goal,
             "backstory": backstory,
-            "llm": self.llm,
             "verbose": verbose,
             "allow_delegation": allow_delegation,
             "max_iter": max_iter,
@@ -70,14 +113,17 @@ class YAMLAgentFactory:
         if response_template:
             agent_params["response_template"] = response_template
         
-        return Agent(**agent_params)
+        return agent_params
+    
+    def _on_config_change(self, changes: ConfigChange):
+        """Drop cached templates whose prompt files changed"""
+        for prompt_file in changes.prompt_files:
+            self.template_cache.invalidate(prompt_file)
     
     def _load_template_file(self, template_path: str) -> str:
-        """Load template content from file"""
+        """Load template content from file (cached until the file's mtime changes)"""
         try:
-            with open(template_path, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
-                return content
+            return self.template_cache.get(template_path).content
         except FileNotFoundError:
             print(f"Warning: Template file not found: {template_path}")
             return None
@@ -85,7 +131,15 @@ class YAMLAgentFactory:
             print(f"Warning: Error loading template file {template_path}: {e}")
             return None
     
-    def create_task(self, task_name: str) -> Task:
+    def preload_templates(self) -> int:
+        """Warm the template cache with every template referenced in agents.yaml"""
+        results = self.template_cache.preload_agent_templates(self.config_loader.get_all_agents())
+        for template_path, error in results.items():
+            if error:
+                print(f"Warning: Could not preload template file {template_path}: {error}")
+        return sum(1 for error in results.values() if error is None)
+    
+    def create_task(self, task_name: str, agent_cache: Optional[Dict[str, Agent]] = None) -> Task:
         """Create task from YAML configuration"""
         task_config = self.config_loader.get_task_config(task_name)
         
@@ -109,13 +163,18 @@ class YAMLAgentFactory:
         
         # Add agent if specified
         if agent_name:
-            agent = self.create_agent(agent_name)
+            agent = self.create_agent(agent_name, cache=agent_cache)
             task_params["agent"] = agent
         
         return Task(**task_params)
     
     def create_crew(self, crew_name: str) -> Crew:
-        """Create crew from YAML configuration with prompt customization support"""
+        """Create crew from YAML configuration with prompt customization support.
+
+        Each distinct agent is instantiated once and shared by the crew's
+        agent list and its tasks. CrewAI mutates agents on kickoff, so agents
+        are never shared with another crew; only the LLM clients are.
+        """
         crew_config = self.config_loader.get_crew_config(crew_name)
         
         if not crew_config:
@@ -129,9 +188,10 @@ class YAMLAgentFactory:
         memory = crew_config.get("memory", True)
         prompt_file = crew_config.get("prompt_file")
         
-        # Create agents and tasks
-        agents = [self.create_agent(agent_name) for agent_name in agent_names]
-        tasks = [self.create_task(task_name) for task_name in task_names]
+        # Create agents and tasks, reusing agents within this crew only
+        agent_cache: Dict[str, Agent] = {}
+        agents = [self.create_agent(agent_name, cache=agent_cache) for agent_name in agent_names]
+        tasks = [self.create_task(task_name, agent_cache=agent_cache) for task_name in task_names]
         
         # Create crew with optional prompt_file
         crew_params = {
@@ -143,6 +203,8 @@ class YAMLAgentFactory:
         }
         
         if prompt_file:
+            # Fail now on undefined slice placeholders rather than mid-run
+            load_prompt_slices(prompt_file)
             crew_params["prompt_file"] = prompt_file
         
         return Crew(**crew_params)
@@ -154,6 +216,7 @@ class LightningLesson2Agents:
     def __init__(self, config_dir: str = "config"):
         self.config_loader = ConfigLoader(config_dir)
         self.factory = YAMLAgentFactory(self.config_loader)
+        self.factory.preload_templates()
     
     def create_comparison_agents(self) -> Dict[str, Agent]:
         """Create default vs persona-engineered agents for comparison"""
@@ -3,86 +3,441 @@ Lightning Lesson 2: YAML Configuration Loader
 Loads CrewAI configurations from YAML files following official guidelines
 """
 
+import io
 import os
+import copy
+import json
+import hashlib
+import pickle
+import threading
 import yaml
-from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Any, Callable, List, NamedTuple, Optional, Set, Tuple
 from pathlib import Path
 
+from .config_validation import ConfigValidator
+
+
+# Use libyaml's C loader when PyYAML was built against it
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+CACHE_DIR_NAME = ".config_cache"
+
+CONFIG_TYPES = ("agents", "tasks", "crews")
+
+# Shard files inside config/agents/, config/tasks/ and config/crews/
+SHARD_SUFFIXES = (".yaml", ".yml")
+
+
+class CompiledConfig(NamedTuple):
+    """Parsed YAML file together with the file state it was parsed from"""
+    mtime_ns: int
+    size: int
+    digest: str
+    data: Dict[str, Any]
+
+
+# Process-wide cache of parsed YAML files, keyed by absolute path
+_compiled_configs: Dict[str, CompiledConfig] = {}
+
+
+def load_yaml_file(path: Path, cache_dir: Optional[Path] = None) -> CompiledConfig:
+    """Load a YAML file through the compiled config cache.
+
+    Unchanged files (same mtime and size) are served from memory without
+    touching their contents. Otherwise the file is hashed and the parsed
+    result is looked up by content hash, first in memory and then in the
+    file's on-disk pickle cache entry, before falling back to parsing the
+    YAML. Safe to call from several threads at once.
+
+    The returned data is shared by every caller and must be treated as
+    read-only; ConfigLoader hands out copies of the entries.
+    """
+    key = os.path.abspath(path)
+    stat = path.stat()
+    cached = _compiled_configs.get(key)
+    if cached and (cached.mtime_ns, cached.size) == (stat.st_mtime_ns, stat.st_size):
+        return cached
+    
+    raw = path.read_bytes()
+    digest = hashlib.sha256(raw).hexdigest()
+    
+    if cached and cached.digest == digest:
+        # Touched but not modified
+        compiled = cached._replace(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+        _compiled_configs[key] = compiled
+        return compiled
+    
+    data = None
+    # One cache entry per source file (shards in different directories may share a name)
+    path_hash = hashlib.sha256(key.encode("utf-8")).hexdigest()[:12]
+    cache_file = cache_dir / f"{path.stem}-{path_hash}.pickle" if cache_dir else None
+    if cache_file:
+        try:
+            with open(cache_file, 'rb') as f:
+                cached_digest, cached_data = pickle.load(f)
+            if cached_digest == digest:
+                data = cached_data
+        except Exception:
+            data = None
+    
+    if data is None:
+        # A named stream, so parse errors say which file they are in
+        stream = io.BytesIO(raw)
+        stream.name = str(path)
+        data = yaml.load(stream, Loader=YAML_LOADER) or {}
+        if cache_file:
+            _write_compiled_cache(cache_file, digest, data)
+    
+    compiled = CompiledConfig(stat.st_mtime_ns, stat.st_size, digest, data)
+    _compiled_configs[key] = compiled
+    return compiled
+
+
+def store_compiled_config(path: Path, data: Dict[str, Any]) -> CompiledConfig:
+    """Record data just written to a YAML file so it is not parsed back"""
+    raw = path.read_bytes()
+    stat = path.stat()
+    compiled = CompiledConfig(stat.st_mtime_ns, stat.st_size,
+                              hashlib.sha256(raw).hexdigest(), copy.deepcopy(dict(data)))
+    _compiled_configs[os.path.abspath(path)] = compiled
+    return compiled
+
+
+def _write_compiled_cache(cache_file: Path, digest: str, data: Dict[str, Any]):
+    """Best-effort write of a parsed config (and its source hash) to the on-disk cache"""
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_file, 'wb') as f:
+            pickle.dump((digest, data), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        # The cache is an optimization only; a read-only config dir is fine
+        pass
+
+
+@dataclass
+class ConfigChange:
+    """Configuration entries affected by a reload or save.
+
+    Changes are propagated along references: an agent whose prompt file
+    changed marks the agent, every task assigned to it and every crew that
+    includes either of them.
+    """
+    agents: Set[str] = field(default_factory=set)
+    tasks: Set[str] = field(default_factory=set)
+    crews: Set[str] = field(default_factory=set)
+    prompt_files: Set[str] = field(default_factory=set)
+    
+    def __bool__(self) -> bool:
+        return bool(self.agents or self.tasks or self.crews or self.prompt_files)
+
 
 class ConfigLoader:
-    """Loads and manages CrewAI configurations from YAML files"""
+    """Loads and manages CrewAI configurations from YAML files.
+
+    Each configuration type is read from ``<config_dir>/<type>.yaml`` and
+    from any shard files under ``<config_dir>/<type>/`` (one entry or a
+    group of entries per file). All files are read in parallel and merged
+    in a single pass; an entry defined in more than one file is an error.
+
+    Loaded entries share their data with the compiled config cache, so
+    the ``get_*`` methods hand out copies that callers may modify.
+    """
     
-    def __init__(self, config_dir: str = "config"):
+    def __init__(self, config_dir: str = "config", use_cache: bool = True,
+                 max_workers: Optional[int] = None):
         self.config_dir = Path(config_dir)
+        self.cache_dir = self.config_dir / CACHE_DIR_NAME if use_cache else None
+        self.max_workers = max_workers
         self.agents_config = {}
         self.tasks_config = {}
         self.crews_config = {}
+        
+        # File each entry was loaded from, per configuration type
+        self._entry_sources: Dict[str, Dict[str, Path]] = {config_type: {} for config_type in CONFIG_TYPES}
+        
+        # Reverse indexes, rebuilt whenever configs are (re)loaded
+        self._tasks_by_agent: Dict[str, List[str]] = {}
+        self._crews_by_agent: Dict[str, List[str]] = {}
+        self._crews_by_task: Dict[str, List[str]] = {}
+        self._agents_by_token: Dict[str, List[str]] = {}
+        self._agent_positions: Dict[str, int] = {}
+        self._agents_by_type: Dict[str, List[str]] = {}
+        self._agents_by_prompt_file: Dict[str, List[str]] = {}
+        self._crews_by_prompt_file: Dict[str, List[str]] = {}
+        
+        # Hot reload state: content hash and entry names of every loaded file, per configuration type
+        self._file_digests: Dict[str, Dict[str, str]] = {config_type: {} for config_type in CONFIG_TYPES}
+        self._file_entries: Dict[str, Dict[str, List[str]]] = {config_type: {} for config_type in CONFIG_TYPES}
+        # Bumped by save_config, so a reload scanned before a save does not undo it
+        self._generation = 0
+        self._prompt_mtimes: Dict[str, Optional[int]] = {}
+        self._subscribers: List[Callable[[ConfigChange], None]] = []
+        self._lock = threading.RLock()
+        self._watch_thread: Optional[threading.Thread] = None
+        self._watch_stop = threading.Event()
+        
         self._load_configs()
+        self._validator = ConfigValidator(self)
     
     def _load_configs(self):
         """Load all configuration files"""
         try:
-            # Load agents configuration
-            agents_file = self.config_dir / "agents.yaml"
-            if agents_file.exists():
-                with open(agents_file, 'r', encoding='utf-8') as f:
-                    self.agents_config = yaml.safe_load(f)
-            
-            # Load tasks configuration
-            tasks_file = self.config_dir / "tasks.yaml"
-            if tasks_file.exists():
-                with open(tasks_file, 'r', encoding='utf-8') as f:
-                    self.tasks_config = yaml.safe_load(f)
-            
-            # Load crews configuration
-            crews_file = self.config_dir / "crews.yaml"
-            if crews_file.exists():
-                with open(crews_file, 'r', encoding='utf-8') as f:
-                    self.crews_config = yaml.safe_load(f)
+            for config_type, merged in self._merge_configs(self._scan_configs()).items():
+                self._apply_merge(config_type, merged)
                     
         except Exception as e:
             print(f"Error loading configurations: {e}")
             raise
+        
+        self._build_indexes()
+        self._prompt_mtimes = self._stat_prompt_files()
+    
+    def _config_file(self, config_type: str) -> Path:
+        """Path of the YAML file holding one configuration type"""
+        return self.config_dir / f"{config_type}.yaml"
+    
+    def _config_files(self, config_type: str) -> List[Path]:
+        """The type's YAML file (if any) followed by its shard files in path order"""
+        config_files = []
+        config_file = self._config_file(config_type)
+        if config_file.exists():
+            config_files.append(config_file)
+        shard_paths = []
+        for root, _, filenames in os.walk(self.config_dir / config_type):
+            shard_paths.extend(os.path.join(root, name) for name in filenames if name.endswith(SHARD_SUFFIXES))
+        config_files.extend(Path(path) for path in sorted(shard_paths))
+        return config_files
+    
+    def _scan_configs(self) -> Dict[str, List[Tuple[Path, Any]]]:
+        """Load every configuration file in parallel through the compiled config cache.
+
+        Returns config type -> (path, CompiledConfig) pairs in merge order.
+        Unchanged files cost one stat call; a file with a YAML syntax error
+        is paired with the error instead, so it is reported with the rest.
+        """
+        files = {config_type: self._config_files(config_type) for config_type in CONFIG_TYPES}
+        all_files = [path for paths in files.values() for path in paths]
+        
+        def load(path: Path):
+            try:
+                return load_yaml_file(path, self.cache_dir)
+            except yaml.YAMLError as e:
+                return e
+        
+        if len(all_files) > 1 and self.max_workers != 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="config-loader") as executor:
+                loaded = iter(list(executor.map(load, all_files)))
+        else:
+            loaded = (load(path) for path in all_files)
+        return {config_type: [(path, next(loaded)) for path in paths] for config_type, paths in files.items()}
+    
+    def _merge_configs(self, scanned: Dict[str, List[Tuple[Path, Any]]]) -> Dict[str, Tuple]:
+        """Merge the files of every configuration type whose files changed.
+
+        Only entries from files whose digest changed (or that were added or
+        removed) are replaced; the rest of the type's entries are kept, in
+        place. Returns config type -> (file digests, entries, entry sources,
+        entry names per file, changed entry names), leaving out unchanged
+        types. Raises ValueError listing every malformed shard (YAML syntax
+        errors included) and every entry defined in more than one file.
+        """
+        results = {}
+        errors = []
+        for config_type, loaded in scanned.items():
+            old_digests = self._file_digests[config_type]
+            digests = {str(path): compiled.digest for path, compiled in loaded
+                       if not isinstance(compiled, yaml.YAMLError)}
+            if digests == old_digests and len(digests) == len(loaded):
+                continue
+            
+            old_config = self._get_section(config_type)
+            config = dict(old_config)
+            sources = dict(self._entry_sources[config_type])
+            file_entries = dict(self._file_entries[config_type])
+            changed: Set[str] = set()
+            
+            # Drop the entries of files that changed or disappeared
+            for path_key in [key for key in old_digests if digests.get(key) != old_digests[key]]:
+                for name in file_entries.pop(path_key, []):
+                    if str(sources.get(name)) == path_key:
+                        del config[name]
+                        del sources[name]
+                        changed.add(name)
+            
+            for path, compiled in loaded:
+                if isinstance(compiled, yaml.YAMLError):
+                    errors.append(f"{path}: {compiled}")
+                    continue
+                if old_digests.get(str(path)) == compiled.digest:
+                    continue
+                data = compiled.data
+                if not isinstance(data, dict):
+                    errors.append(f"{path}: expected a mapping of {config_type}, got {type(data).__name__}")
+                    continue
+                names = []
+                for name, entry in data.items():
+                    if name in sources:
+                        errors.append(f"Duplicate {config_type} entry '{name}' in {sources[name]} and {path}")
+                        continue
+                    # Shared with the compiled cache: getters hand out copies
+                    config[name] = entry
+                    sources[name] = path
+                    names.append(name)
+                file_entries[str(path)] = names
+                changed.update(names)
+            
+            changed = {name for name in changed if old_config.get(name) != config.get(name)}
+            results[config_type] = (digests, config, sources, file_entries, changed)
+        
+        if errors:
+            raise ValueError("Invalid configuration files:\n  - " + "\n  - ".join(errors))
+        return results
+    
+    def _apply_merge(self, config_type: str, merged: Tuple):
+        digests, config, sources, file_entries, _ = merged
+        self._file_digests[config_type] = digests
+        self._entry_sources[config_type] = sources
+        self._file_entries[config_type] = file_entries
+        setattr(self, f"{config_type}_config", config)
+    
+    def _get_section(self, config_type: str) -> Dict[str, Dict[str, Any]]:
+        """Get the loaded configuration dict for a configuration type"""
+        if config_type not in CONFIG_TYPES:
+            raise ValueError(f"Unknown config type: {config_type}")
+        return getattr(self, f"{config_type}_config")
+    
+    def _build_indexes(self):
+        """Build reverse lookup indexes over the loaded configurations"""
+        tasks_by_agent: Dict[str, List[str]] = {}
+        for task_name, task_config in self.tasks_config.items():
+            agent_name = (task_config or {}).get('agent')
+            if agent_name:
+                tasks_by_agent.setdefault(agent_name, []).append(task_name)
+        
+        crews_by_agent: Dict[str, List[str]] = {}
+        crews_by_task: Dict[str, List[str]] = {}
+        for crew_name, crew_config in self.crews_config.items():
+            crew_config = crew_config or {}
+            for agent_name in dict.fromkeys(crew_config.get('agents', [])):
+                crews_by_agent.setdefault(agent_name, []).append(crew_name)
+            for task_name in dict.fromkeys(crew_config.get('tasks', [])):
+                crews_by_task.setdefault(task_name, []).append(crew_name)
+        
+        # Agent types are substrings of agent names; any substring without an
+        # underscore lies inside a single name token, so index by token
+        agents_by_token: Dict[str, List[str]] = {}
+        for agent_name in self.agents_config:
+            for token in dict.fromkeys(agent_name.lower().split("_")):
+                agents_by_token.setdefault(token, []).append(agent_name)
+        
+        agents_by_prompt_file: Dict[str, List[str]] = {}
+        for agent_name, agent_config in self.agents_config.items():
+            for prompt_file in self._agent_prompt_files(agent_config or {}):
+                agents_by_prompt_file.setdefault(prompt_file, []).append(agent_name)
+        
+        crews_by_prompt_file: Dict[str, List[str]] = {}
+        for crew_name, crew_config in self.crews_config.items():
+            prompt_file = (crew_config or {}).get('prompt_file')
+            if prompt_file:
+                crews_by_prompt_file.setdefault(prompt_file, []).append(crew_name)
+        
+        self._tasks_by_agent = tasks_by_agent
+        self._crews_by_agent = crews_by_agent
+        self._crews_by_task = crews_by_task
+        self._agents_by_token = agents_by_token
+        self._agent_positions = {name: i for i, name in enumerate(self.agents_config)}
+        self._agents_by_type = {}
+        self._agents_by_prompt_file = agents_by_prompt_file
+        self._crews_by_prompt_file = crews_by_prompt_file
+    
+    @staticmethod
+    def _agent_prompt_files(agent_config: Dict[str, Any]) -> List[str]:
+        """Prompt files an agent configuration reads from disk"""
+        prompt_files = []
+        system_template = agent_config.get('system_template')
+        if isinstance(system_template, str) and system_template.endswith('.txt'):
+            prompt_files.append(system_template)
+        if agent_config.get('prompt_file'):
+            prompt_files.append(agent_config['prompt_file'])
+        return prompt_files
+    
+    def _stat_prompt_files(self, known: Optional[Dict[str, Optional[int]]] = None) -> Dict[str, Optional[int]]:
+        """Modification times of all referenced prompt files (None if missing), reusing ``known`` ones"""
+        mtimes = {}
+        for prompt_file in {**self._agents_by_prompt_file, **self._crews_by_prompt_file}:
+            if known and prompt_file in known:
+                mtimes[prompt_file] = known[prompt_file]
+                continue
+            try:
+                mtimes[prompt_file] = os.stat(prompt_file).st_mtime_ns
+            except OSError:
+                mtimes[prompt_file] = None
+        return mtimes
+    
+    def prompt_file_exists(self, prompt_file: str) -> bool:
+        """Whether a referenced prompt file existed when configs were last (re)loaded"""
+        return self._prompt_mtimes.get(prompt_file) is not None
+    
+    def state_digest(self) -> str:
+        """Hash of every loaded config file's content and every prompt file's mtime"""
+        with self._lock:
+            state = {"files": self._file_digests, "prompts": self._prompt_mtimes}
+            return hashlib.sha256(json.dumps(state, sort_keys=True).encode("utf-8")).hexdigest()
     
     def get_agent_config(self, agent_name: str) -> Dict[str, Any]:
         """Get configuration for a specific agent"""
-        return self.agents_config.get(agent_name, {})
+        return copy.deepcopy(self.agents_config.get(agent_name, {}))
     
     def get_task_config(self, task_name: str) -> Dict[str, Any]:
         """Get configuration for a specific task"""
-        return self.tasks_config.get(task_name, {})
+        return copy.deepcopy(self.tasks_config.get(task_name, {}))
     
     def get_crew_config(self, crew_name: str) -> Dict[str, Any]:
         """Get configuration for a specific crew"""
-        return self.crews_config.get(crew_name, {})
+        return copy.deepcopy(self.crews_config.get(crew_name, {}))
     
     def get_all_agents(self) -> Dict[str, Dict[str, Any]]:
         """Get all agent configurations"""
-        return self.agents_config
+        return copy.deepcopy(self.agents_config)
     
     def get_all_tasks(self) -> Dict[str, Dict[str, Any]]:
         """Get all task configurations"""
-        return self.tasks_config
+        return copy.deepcopy(self.tasks_config)
     
     def get_all_crews(self) -> Dict[str, Dict[str, Any]]:
         """Get all crew configurations"""
-        return self.crews_config
+        return copy.deepcopy(self.crews_config)
     
     def get_agents_by_type(self, agent_type: str) -> List[str]:
         """Get agent names by type (e.g., 'marketing', 'legal', 'technical')"""
-        agents = []
-        for agent_name, config in self.agents_config.items():
-            if agent_type in agent_name.lower():
-                agents.append(agent_name)
-        return agents
+        agents = self._agents_by_type.get(agent_type)
+        if agents is None:
+            if "_" in agent_type:
+                agents = [name for name in self.agents_config if agent_type in name.lower()]
+            else:
+                matches = set()
+                for token, names in self._agents_by_token.items():
+                    if agent_type in token:
+                        matches.update(names)
+                agents = sorted(matches, key=self._agent_positions.__getitem__)
+            self._agents_by_type[agent_type] = agents
+        return list(agents)
     
     def get_tasks_by_agent(self, agent_name: str) -> List[str]:
         """Get task names that use a specific agent"""
-        tasks = []
-        for task_name, config in self.tasks_config.items():
-            if config.get('agent') == agent_name:
-                tasks.append(task_name)
-        return tasks
+        return list(self._tasks_by_agent.get(agent_name, []))
+    
+    def get_crews_by_agent(self, agent_name: str) -> List[str]:
+        """Get crew names that include a specific agent"""
+        return list(self._crews_by_agent.get(agent_name, []))
+    
+    def get_crews_by_task(self, task_name: str) -> List[str]:
+        """Get crew names that include a specific task"""
+        return list(self._crews_by_task.get(task_name, []))
     
     def get_comparison_configs(self) -> Dict[str, Any]:
         """Get configurations for before/after comparison demo"""
@@ -111,58 +466,155 @@ class ConfigLoader:
         }
     
     def validate_configs(self) -> Dict[str, List[str]]:
-        """Validate configuration consistency"""
-        errors = []
-        warnings = []
-        
-        # Check agent references in tasks
-        for task_name, task_config in self.tasks_config.items():
-            agent_name = task_config.get('agent')
-            if agent_name and agent_name not in self.agents_config:
-                errors.append(f"Task '{task_name}' references unknown agent '{agent_name}'")
-        
-        # Check agent references in crews
-        for crew_name, crew_config in self.crews_config.items():
-            for agent_name in crew_config.get('agents', []):
-                if agent_name not in self.agents_config:
-                    errors.append(f"Crew '{crew_name}' references unknown agent '{agent_name}'")
-            
-            for task_name in crew_config.get('tasks', []):
-                if task_name not in self.tasks_config:
-                    errors.append(f"Crew '{crew_name}' references unknown task '{task_name}'")
+        """Validate configuration consistency.
+
+        Checks crew → task → agent → prompt file references, dependency
+        cycles and agents or tasks nothing uses. Results are cached by
+        content hash and only entries changed since the last reload or save
+        are re-checked. Configs edited in memory without ``save_config``
+        are not picked up.
+        """
+        return self._validator.validate()
+    
+    def get_dependency_graph(self) -> Dict[tuple, List[tuple]]:
+        """Crew, task and agent nodes mapped to the nodes they reference"""
+        return self._validator.get_dependency_graph()
+    
+    def reload_configs(self) -> ConfigChange:
+        """Reload configuration files that changed on disk.
+
+        Files are stat'ed without holding the lock, and only files whose
+        content hash changed are re-parsed and re-merged, so a reload with
+        nothing changed costs a stat per file. Entries are diffed one by one,
+        so subscribers are told exactly which agents, tasks and crews need
+        rebuilding. If the new files are invalid (e.g. a duplicate entry
+        across shards) nothing is applied.
+        """
+        while True:
+            generation = self._generation
+            scanned = self._scan_configs()
+            prompt_mtimes = self._stat_prompt_files()
+            with self._lock:
+                if generation != self._generation:
+                    continue  # saved while scanning; the scan may predate the save
+                
+                changes = ConfigChange()
+                for config_type, merged in self._merge_configs(scanned).items():
+                    getattr(changes, config_type).update(merged[-1])
+                    self._apply_merge(config_type, merged)
+                
+                if changes:
+                    self._build_indexes()
+                    # Only prompt files the new entries reference still need a stat
+                    prompt_mtimes = self._stat_prompt_files(prompt_mtimes)
+                
+                for prompt_file in prompt_mtimes.keys() | self._prompt_mtimes.keys():
+                    if prompt_mtimes.get(prompt_file) != self._prompt_mtimes.get(prompt_file):
+                        changes.prompt_files.add(prompt_file)
+                self._prompt_mtimes = prompt_mtimes
+                
+                self._notify(changes)
+                return changes
+    
+    def subscribe(self, callback: Callable[[ConfigChange], None]):
+        """Register a callback invoked with a ConfigChange after each reload or save"""
+        with self._lock:
+            if callback not in self._subscribers:
+                self._subscribers.append(callback)
+        return callback
+    
+    def unsubscribe(self, callback: Callable[[ConfigChange], None]):
+        """Remove a previously registered change callback"""
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+    
+    def _notify(self, changes: ConfigChange):
+        """Expand changes along references and deliver them to subscribers"""
+        if not changes:
+            return
         
-        # Check for missing prompt files
-        for agent_name, agent_config in self.agents_config.items():
-            prompt_file = agent_config.get('prompt_file')
-            if prompt_file and not os.path.exists(prompt_file):
-                warnings.append(f"Agent '{agent_name}' references missing prompt file '{prompt_file}'")
+        for prompt_file in changes.prompt_files:
+            changes.agents.update(self._agents_by_prompt_file.get(prompt_file, []))
+            changes.crews.update(self._crews_by_prompt_file.get(prompt_file, []))
+        for agent_name in changes.agents:
+            changes.tasks.update(self._tasks_by_agent.get(agent_name, []))
+            changes.crews.update(self._crews_by_agent.get(agent_name, []))
+        for task_name in changes.tasks:
+            changes.crews.update(self._crews_by_task.get(task_name, []))
         
-        return {"errors": errors, "warnings": warnings}
+        for callback in list(self._subscribers):
+            try:
+                callback(changes)
+            except Exception as e:
+                print(f"Warning: Config change subscriber failed: {e}")
     
-    def reload_configs(self):
-        """Reload all configuration files"""
-        self._load_configs()
+    def start_watching(self, interval: float = 1.0):
+        """Hot-reload configs in a background thread whenever files change.
+
+        Polls file modification times, which only costs a few stat calls per
+        interval while nothing changes.
+        """
+        with self._lock:
+            if self._watch_thread and self._watch_thread.is_alive():
+                return
+            self._watch_stop.clear()
+            self._watch_thread = threading.Thread(
+                target=self._watch_loop, args=(interval,),
+                name="config-watcher", daemon=True
+            )
+            self._watch_thread.start()
+    
+    def stop_watching(self):
+        """Stop the background hot-reload thread"""
+        self._watch_stop.set()
+        if self._watch_thread:
+            self._watch_thread.join()
+            self._watch_thread = None
+    
+    def _watch_loop(self, interval: float):
+        while not self._watch_stop.wait(interval):
+            try:
+                self.reload_configs()
+            except Exception as e:
+                # Usually a file caught mid-write; retry on the next tick
+                print(f"Warning: Config hot reload failed: {e}")
     
     def save_config(self, config_type: str, config_name: str, config_data: Dict[str, Any]):
-        """Save configuration data to YAML file"""
-        config_file = self.config_dir / f"{config_type}.yaml"
-        
-        # Load existing config
-        if config_type == "agents":
-            config = self.agents_config
-        elif config_type == "tasks":
-            config = self.tasks_config
-        elif config_type == "crews":
-            config = self.crews_config
-        else:
-            raise ValueError(f"Unknown config type: {config_type}")
-        
-        # Update config
-        config[config_name] = config_data
-        
-        # Save to file
-        with open(config_file, 'w', encoding='utf-8') as f:
-            yaml.dump(config, f, default_flow_style=False, indent=2)
-        
-        # Reload configs
-        self._load_configs()
+        """Save configuration data to YAML file.
+
+        Existing entries are written back to the file they were loaded from.
+        New entries go to ``<type>.yaml``, or to a new ``<type>/<name>.yaml``
+        shard when the type is only sharded.
+        """
+        with self._lock:
+            # Load existing config
+            config = self._get_section(config_type)
+            sources = self._entry_sources[config_type]
+            previous = config.get(config_name)
+            
+            config_file = sources.get(config_name)
+            if config_file is None:
+                config_file = self._config_file(config_type)
+                if not config_file.exists() and (self.config_dir / config_type).is_dir():
+                    config_file = self.config_dir / config_type / f"{config_name}.yaml"
+            
+            # Update config
+            config[config_name] = config_data
+            sources[config_name] = config_file
+            file_config = {name: config[name] for name, path in sources.items() if path == config_file}
+            
+            # Save to file
+            config_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(config_file, 'w', encoding='utf-8') as f:
+                yaml.dump(file_config, f, default_flow_style=False, indent=2)
+            
+            # Record what was written instead of re-parsing every file
+            self._file_digests[config_type][str(config_file)] = store_compiled_config(config_file, file_config).digest
+            self._file_entries[config_type][str(config_file)] = list(file_config)
+            self._generation += 1
+            self._build_indexes()
+            self._prompt_mtimes = self._stat_prompt_files()
+            
+            if previous != config_data:
+                self._notify(ConfigChange(**{config_type: {config_name}}))
@@ -0,0 +1,189 @@
+"""
+Lightning Lesson 2: Configuration Graph Validation
+Validates crew → task → agent → prompt file references as a dependency graph, with cached results
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from .prompt_slices import load_prompt_slices
+
+
+# Graph nodes are (kind, name) with kind one of "crew", "task", "agent", "prompt"
+Node = Tuple[str, str]
+
+NODE_KINDS = {"agents": "agent", "tasks": "task", "crews": "crew"}
+
+
+def entry_references(config_type: str, entry: Dict[str, Any]) -> List[Tuple[Node, str]]:
+    """Nodes a configuration entry depends on, with the relation named in messages"""
+    references = []
+    if config_type == "crews":
+        references.extend((("agent", name), "agent") for name in entry.get("agents", []))
+        if entry.get("manager_agent"):
+            references.append((("agent", entry["manager_agent"]), "manager agent"))
+        references.extend((("task", name), "task") for name in entry.get("tasks", []))
+        if entry.get("prompt_file"):
+            references.append((("prompt", entry["prompt_file"]), "prompt file"))
+    elif config_type == "tasks":
+        if entry.get("agent"):
+            references.append((("agent", entry["agent"]), "agent"))
+        # A list of task names (CrewAI YAML style); free-text context is not a reference
+        context = entry.get("context")
+        if isinstance(context, list):
+            references.extend((("task", name), "context task") for name in context if isinstance(name, str))
+    elif config_type == "agents":
+        system_template = entry.get("system_template")
+        if isinstance(system_template, str) and system_template.endswith(".txt"):
+            references.append((("prompt", system_template), "system template"))
+        if entry.get("prompt_file"):
+            references.append((("prompt", entry["prompt_file"]), "prompt file"))
+    return references
+
+
+def find_cycles(edges: Dict[Node, List[Node]]) -> List[List[Node]]:
+    """Cycles found by an iterative depth-first search, each as a closed node path"""
+    visiting, done = 1, 2
+    state: Dict[Node, int] = {}
+    cycles = []
+    for root in edges:
+        if root in state:
+            continue
+        state[root] = visiting
+        path = [root]
+        stack = [iter(edges.get(root, ()))]
+        while stack:
+            for child in stack[-1]:
+                child_state = state.get(child)
+                if child_state == visiting:
+                    cycles.append(path[path.index(child):] + [child])
+                elif child_state is None:
+                    state[child] = visiting
+                    path.append(child)
+                    stack.append(iter(edges.get(child, ())))
+                    break
+            else:
+                state[path.pop()] = done
+                stack.pop()
+    return cycles
+
+
+class ConfigValidator:
+    """Validates a ConfigLoader's entries as a crew → task → agent → prompt file graph.
+
+    Each entry's outgoing edges and reference issues are cached and only
+    recomputed for entries named in a ConfigChange from a reload or save
+    (the loader already extends a change to dependent entries). Complete
+    results are cached by the loader's content digest, so validating an
+    unchanged tree is a dictionary lookup. Prompt files are checked against
+    the loader's tracked file states rather than the filesystem.
+    """
+
+    def __init__(self, config_loader, max_cached_results: int = 8):
+        self.config_loader = config_loader
+        self.max_cached_results = max_cached_results
+        self._edges: Dict[Node, List[Node]] = {}
+        self._issues: Dict[Node, Tuple[List[str], List[str]]] = {}
+        self._dirty: Optional[Set[Tuple[str, str]]] = None  # None: everything
+        self._results: "OrderedDict[str, Dict[str, List[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        config_loader.subscribe(self._on_config_change)
+
+    def _on_config_change(self, changes):
+        with self._lock:
+            if self._dirty is None:
+                return
+            for config_type in NODE_KINDS:
+                self._dirty.update((config_type, name) for name in getattr(changes, config_type))
+
+    def _check_entry(self, config_type: str, name: str, entry: Dict[str, Any]) -> Tuple[List[Node], List[str], List[str]]:
+        """Outgoing edges and (errors, warnings) of one entry"""
+        label = f"{NODE_KINDS[config_type].capitalize()} '{name}'"
+        edges, errors, warnings = [], [], []
+        for node, relation in entry_references(config_type, entry):
+            edges.append(node)
+            kind, target = node
+            if kind == "prompt":
+                if not self.config_loader.prompt_file_exists(target):
+                    warnings.append(f"{label} references missing {relation} '{target}'")
+                elif config_type == "crews" and target.endswith(".json"):
+                    try:
+                        slice_set = load_prompt_slices(target, strict=False)
+                    except Exception as e:
+                        errors.append(f"{label} has an unreadable {relation} '{target}': {e}")
+                        continue
+                    errors.extend(slice_set.errors)
+                    warnings.extend(slice_set.warnings)
+            elif target not in self.config_loader._get_section(f"{kind}s"):
+                errors.append(f"{label} references unknown {relation} '{target}'")
+        return edges, errors, warnings
+
+    def _refresh(self):
+        """Recompute edges and issues of changed entries only"""
+        if self._dirty is None:
+            self._edges.clear()
+            self._issues.clear()
+            dirty = [(config_type, name) for config_type in NODE_KINDS
+                     for name in self.config_loader._get_section(config_type)]
+        else:
+            # Entries referencing a changed entry may gain or lose an error
+            changed = {(NODE_KINDS[config_type], name) for config_type, name in self._dirty}
+            dirty = set(self._dirty)
+            if changed:
+                for (kind, name), edges in self._edges.items():
+                    if changed.intersection(edges):
+                        dirty.add((f"{kind}s", name))
+        self._dirty = set()
+
+        for config_type, name in dirty:
+            node = (NODE_KINDS[config_type], name)
+            section = self.config_loader._get_section(config_type)
+            if name not in section:
+                self._edges.pop(node, None)
+                self._issues.pop(node, None)
+                continue
+            edges, errors, warnings = self._check_entry(config_type, name, section[name] or {})
+            self._edges[node] = edges
+            self._issues[node] = (errors, warnings)
+
+    def validate(self) -> Dict[str, List[str]]:
+        """Validate references, dependency cycles and orphaned agents/tasks"""
+        with self._lock:
+            digest = self.config_loader.state_digest()
+            cached = self._results.get(digest)
+            if cached is not None:
+                self._results.move_to_end(digest)
+                return {key: list(value) for key, value in cached.items()}
+
+            self._refresh()
+            errors, warnings = [], []
+            for config_type in ("tasks", "crews", "agents"):
+                kind = NODE_KINDS[config_type]
+                for name in self.config_loader._get_section(config_type):
+                    entry_errors, entry_warnings = self._issues.get((kind, name), ((), ()))
+                    errors.extend(entry_errors)
+                    warnings.extend(entry_warnings)
+
+            for cycle in find_cycles(self._edges):
+                errors.append("Dependency cycle: " + " → ".join(f"{kind} '{name}'" for kind, name in cycle))
+
+            referenced = {node for targets in self._edges.values() for node in targets}
+            for name in self.config_loader._get_section("agents"):
+                if ("agent", name) not in referenced:
+                    warnings.append(f"Agent '{name}' is not used by any task or crew")
+            for name in self.config_loader._get_section("tasks"):
+                if ("task", name) not in referenced:
+                    warnings.append(f"Task '{name}' is not used by any crew or task context")
+
+            result = {"errors": errors, "warnings": warnings}
+            self._results[digest] = result
+            while len(self._results) > self.max_cached_results:
+                self._results.popitem(last=False)
+            return {key: list(value) for key, value in result.items()}
+
+    def get_dependency_graph(self) -> Dict[Node, List[Node]]:
+        """Outgoing edges of every agent, task and crew node"""
+        with self._lock:
+            self._refresh()
+            return {node: list(edges) for node, edges in self._edges.items()}
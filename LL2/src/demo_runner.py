@@ -4,10 +4,11 @@ Demonstrates before/after comparison of default vs persona-engineered agents usi
 """
 
 import os
-import json
+import time
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple
 from dotenv import load_dotenv
 
 # Suppress annoying warnings
@@ -17,20 +18,46 @@ warnings.filterwarnings("ignore", message=".*pkg_resources is deprecated.*")
 warnings.filterwarnings("ignore", message=".*Mixing V1 models and V2 models.*")
 
 from .agents import LightningLesson2Agents
+from .prompt_budget import PromptBudgetAnalyzer
+from .prompt_compaction import PromptCompactor
+from .evaluation import PersonaEvaluation, DEFAULT_EVAL_CONCURRENCY
+from .results_log import ResultsLog
 
 
 class LightningLesson2Demo:
     """Demo runner for Lightning Lesson 2: Advanced Agent Persona Architecture"""
     
-    def __init__(self, config_dir: str = "config"):
+    def __init__(self, config_dir: str = "config", max_concurrency: Optional[int] = None,
+                 results_log: Optional[ResultsLog] = None, compress_results: Optional[bool] = None,
+                 results_max_mb: Optional[float] = None, results_window: Optional[int] = None):
         load_dotenv()
+        
+        # Every result is streamed to an append-only JSONL log. self.results
+        # keeps all of them unless results_window limits it to the most recent
+        # ones (0 = keep all); save_results() always exports the full log.
+        if compress_results is None:
+            compress_results = self._get_boolean_env("DEMO_RESULTS_COMPRESS", False)
+        if results_max_mb is None:
+            results_max_mb = float(os.getenv("DEMO_RESULTS_MAX_MB", "0"))
+        if results_window is None:
+            results_window = int(os.getenv("DEMO_RESULTS_WINDOW", "0"))
         self.results = []
+        self.results_window = max(0, results_window)
+        self.results_log = results_log or ResultsLog(
+            compress=compress_results,
+            max_bytes=int(results_max_mb * 1024 * 1024)
+        )
         self.agents_manager = LightningLesson2Agents(config_dir)
         
         # Load CrewAI configuration from environment
         self.crewai_verbose = self._get_boolean_env("CREWAI_VERBOSE", False)
         self.crewai_memory = self._get_boolean_env("CREWAI_MEMORY", False)
         
+        # Number of personas/crews kicked off at once (1 = sequential)
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv("DEMO_MAX_CONCURRENCY", "1"))
+        self.max_concurrency = max(1, max_concurrency)
+        
         # Check for required environment variables
         self._check_environment()
     
@@ -61,6 +88,56 @@ class LightningLesson2Demo:
         print("✅ Environment variables configured correctly")
         print(f"   CREWAI_VERBOSE: {self.crewai_verbose}")
         print(f"   CREWAI_MEMORY: {self.crewai_memory}")
+        print(f"   DEMO_MAX_CONCURRENCY: {self.max_concurrency}")
+    
+    def _record_result(self, result: Dict[str, Any]):
+        """Keep a result in memory (within results_window) and append it to the results log"""
+        self.results.append(result)
+        if self.results_window and len(self.results) > self.results_window:
+            del self.results[:len(self.results) - self.results_window]
+        self.results_log.append(result)
+    
+    def _run_jobs(self, jobs: Dict[str, Callable[[], Any]]) -> Iterator[Tuple[str, Any, float]]:
+        """Run jobs up to max_concurrency at a time.
+
+        Yields (name, result, seconds) in the order the jobs were given, so
+        output stays deterministic however the runs interleave.
+        """
+        def timed(job):
+            start = time.perf_counter()
+            result = job()
+            return result, time.perf_counter() - start
+        
+        if self.max_concurrency <= 1 or len(jobs) <= 1:
+            for name, job in jobs.items():
+                yield (name, *timed(job))
+            return
+        
+        workers = min(self.max_concurrency, len(jobs))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ll2-crew") as executor:
+            futures = {name: executor.submit(timed, job) for name, job in jobs.items()}
+            for name, future in futures.items():
+                yield (name, *future.result())
+    
+    def _timing_report(self, latencies: Dict[str, float], wall_seconds: float) -> Dict[str, Any]:
+        """Print and return per-run latency and the speedup over running sequentially"""
+        sequential_seconds = sum(latencies.values())
+        speedup = sequential_seconds / wall_seconds if wall_seconds > 0 else 1.0
+        
+        print("\n⏱️  LATENCY REPORT:")
+        print("-" * 40)
+        for name, seconds in latencies.items():
+            print(f"   {name}: {seconds:.2f}s")
+        print(f"   Wall time: {wall_seconds:.2f}s (sequential sum {sequential_seconds:.2f}s, "
+              f"speedup x{speedup:.2f}, concurrency {self.max_concurrency})")
+        
+        return {
+            "max_concurrency": self.max_concurrency,
+            "latencies_seconds": {name: round(seconds, 3) for name, seconds in latencies.items()},
+            "wall_seconds": round(wall_seconds, 3),
+            "sequential_seconds": round(sequential_seconds, 3),
+            "speedup": round(speedup, 2)
+        }
         
     def run_comparison_demo(self, task_name: str = None) -> Dict[str, Any]:
         """Run before/after comparison demo"""
@@ -80,19 +157,31 @@ class LightningLesson2Demo:
         print(f"\n📝 Task: {task_description}")
         print("\n" + "="*60)
         
-        # Run default agent
-        print("\n🤖 DEFAULT AGENT RESPONSE:")
-        print("-" * 40)
-        default_response = self._execute_agent_task(agents["default"], task_description)
-        print(default_response)
+        headings = {
+            "default": "🤖 DEFAULT AGENT RESPONSE:",
+            "persona": "🎭 PERSONA-ENGINEERED AGENT RESPONSE:"
+        }
+        jobs = {
+            name: (lambda agent=agents[name]: self._execute_agent_task(agent, task_description))
+            for name in headings
+        }
         
-        print("\n" + "="*60)
+        # Run default and persona-engineered agents
+        responses = {}
+        latencies = {}
+        start = time.perf_counter()
+        for name, response, seconds in self._run_jobs(jobs):
+            if name != "default":
+                print("\n" + "="*60)
+            print(f"\n{headings[name]}")
+            print("-" * 40)
+            print(response)
+            responses[name] = response
+            latencies[name] = seconds
+        timing = self._timing_report(latencies, time.perf_counter() - start)
         
-        # Run persona-engineered agent
-        print("\n🎭 PERSONA-ENGINEERED AGENT RESPONSE:")
-        print("-" * 40)
-        persona_response = self._execute_agent_task(agents["persona"], task_description)
-        print(persona_response)
+        default_response = responses["default"]
+        persona_response = responses["persona"]
         
         # Store results
         demo_result = {
@@ -100,10 +189,11 @@ class LightningLesson2Demo:
             "task": task_description,
             "default_response": default_response,
             "persona_response": persona_response,
-            "comparison_notes": self._analyze_differences(default_response, persona_response)
+            "comparison_notes": self._analyze_differences(default_response, persona_response),
+            "timing": timing
         }
         
-        self.results.append(demo_result)
+        self._record_result(demo_result)
         return demo_result
     
     def run_persona_showcase(self, task_name: str = None) -> Dict[str, Any]:
@@ -113,6 +203,7 @@ class LightningLesson2Demo:
         
         agents = self.agents_manager.create_all_personas()
         persona_responses = {}
+        latencies = {}
         
         # Get task configuration
         if task_name:
@@ -121,22 +212,30 @@ class LightningLesson2Demo:
         else:
             task_description = "Write a product launch email for our new AI tool"
         
-        for persona_name, agent in agents.items():
-            print(f"\n🔹 {persona_name.upper()} PERSONA:")
+        jobs = {
+            persona_name: (lambda agent=agent: self._execute_agent_task(agent, task_description))
+            for persona_name, agent in agents.items()
+        }
+        
+        start = time.perf_counter()
+        for persona_name, response, seconds in self._run_jobs(jobs):
+            print(f"\n🔹 {persona_name.upper()} PERSONA ({seconds:.2f}s):")
             print("-" * 40)
             
-            response = self._execute_agent_task(agent, task_description)
             persona_responses[persona_name] = response
+            latencies[persona_name] = seconds
             print(response)
             print("\n" + "="*60)
+        timing = self._timing_report(latencies, time.perf_counter() - start)
         
         showcase_result = {
             "timestamp": datetime.now().isoformat(),
             "task": task_description,
-            "persona_responses": persona_responses
+            "persona_responses": persona_responses,
+            "timing": timing
         }
         
-        self.results.append(showcase_result)
+        self._record_result(showcase_result)
         return showcase_result
     
     def run_prompt_inspection_demo(self) -> Dict[str, Any]:
@@ -191,9 +290,99 @@ class LightningLesson2Demo:
             "inspection_results": inspection_results
         }
         
-        self.results.append(inspection_result)
+        self._record_result(inspection_result)
         return inspection_result
     
+    def run_prompt_budget_demo(self, tokenizer: str = "regex") -> Dict[str, Any]:
+        """Measure the prompt token overhead of every configured agent"""
+        print("\n📏 PROMPT TOKEN BUDGET ANALYSIS")
+        print("=" * 60)
+        
+        analyzer = PromptBudgetAnalyzer(self.agents_manager, tokenizer=tokenizer)
+        rows = analyzer.analyze()
+        analyzer.print_report(rows)
+        
+        budget_result = {
+            "timestamp": datetime.now().isoformat(),
+            "model": analyzer.model,
+            "context_window": analyzer.context_window,
+            "tokenizer": tokenizer,
+            "prompt_budget": rows
+        }
+        
+        self._record_result(budget_result)
+        return budget_result
+    
+    def run_prompt_compaction_demo(self, output_dir: str = "artifacts/compacted_prompts") -> Dict[str, Any]:
+        """Find persona instructions repeated across prompt sources and emit a compacted config"""
+        print("\n✂️  PROMPT COMPACTION")
+        print("=" * 60)
+        
+        compactor = PromptCompactor(self.agents_manager.config_loader)
+        report = compactor.compact_all()
+        compactor.print_report(report)
+        
+        agents_file = compactor.write_config(report, output_dir)
+        print(f"\n💾 Compacted agent configuration written to: {agents_file}")
+        
+        compaction_result = {
+            "timestamp": datetime.now().isoformat(),
+            "compacted_config": agents_file,
+            "agents": {
+                name: {key: value for key, value in agent.items() if key not in ("backstory", "system_template")}
+                for name, agent in report["agents"].items()
+            },
+            "crews": report["crews"]
+        }
+        
+        self._record_result(compaction_result)
+        return compaction_result
+    
+    def run_evaluation_demo(self, task_names: Optional[List[str]] = None, samples: int = 5,
+                            requests_per_minute: Optional[float] = None,
+                            max_concurrency: Optional[int] = None) -> Dict[str, Any]:
+        """Sample the default and persona-engineered agents repeatedly and compare distributions"""
+        print("\n🧪 PERSONA A/B EVALUATION")
+        print("=" * 60)
+        
+        comparison_configs = self.agents_manager.config_loader.get_comparison_configs()
+        personas = {
+            "default": comparison_configs["default_agent"],
+            "persona": comparison_configs["persona_agent"]
+        }
+        task_names = task_names or [comparison_configs["default_task"]]
+        if requests_per_minute is None:
+            requests_per_minute = float(os.getenv("EVAL_REQUESTS_PER_MINUTE", "30"))
+        if max_concurrency is None:
+            # Separate from DEMO_MAX_CONCURRENCY, whose default of 1 would make sampling serial
+            max_concurrency = int(os.getenv("EVAL_MAX_CONCURRENCY", DEFAULT_EVAL_CONCURRENCY))
+        
+        evaluation = PersonaEvaluation(
+            self.agents_manager,
+            samples=samples,
+            max_concurrency=max_concurrency,
+            requests_per_minute=requests_per_minute,
+            verbose=self.crewai_verbose,
+            memory=self.crewai_memory
+        )
+        start = time.perf_counter()
+        sample_results = evaluation.run(personas, task_names)
+        summary = evaluation.aggregate(sample_results)
+        evaluation.print_report(summary)
+        print(f"\n   Wall time: {time.perf_counter() - start:.2f}s")
+        
+        evaluation_result = {
+            "timestamp": datetime.now().isoformat(),
+            "personas": personas,
+            "tasks": task_names,
+            "samples_per_task": samples,
+            "requests_per_minute": requests_per_minute,
+            "summary": summary
+        }
+        
+        self._record_result(evaluation_result)
+        return evaluation_result
+    
     def run_customization_approaches_demo(self) -> Dict[str, Any]:
         """Demonstrate different prompt customization approaches"""
         print("\n⚙️ PROMPT CUSTOMIZATION APPROACHES DEMO")
@@ -202,6 +391,7 @@ class LightningLesson2Demo:
         # Create crews for different approaches
         crews = self.agents_manager.create_customization_demo_crews()
         customization_results = {}
+        latencies = {}
 
         # Showcase three approaches clearly
         approach_titles = {
@@ -212,31 +402,45 @@ class LightningLesson2Demo:
 
         task_description = "Write a product launch email for our new AI tool"
 
-        for crew_key, crew in crews.items():
-            print(f"\n🔧 {approach_titles.get(crew_key, crew_key).upper()}:")
-            print("-" * 40)
-            
+        def kickoff(crew_key, crew):
             try:
                 # Execute the crew as-is; crew configuration defines customization
                 result = crew.kickoff()
                 
                 response = str(result.raw) if hasattr(result, 'raw') else str(result)
-                print(response)
-                customization_results[crew_key] = {"success": True, "response": response}
+                return {"success": True, "response": response}
             except Exception as e:
                 error_msg = f"Error executing {crew_key}: {str(e)}"
-                print(f"❌ {error_msg}")
-                customization_results[crew_key] = {"success": False, "error": error_msg}
+                return {"success": False, "error": error_msg}
+        
+        jobs = {
+            crew_key: (lambda crew_key=crew_key, crew=crew: kickoff(crew_key, crew))
+            for crew_key, crew in crews.items()
+        }
+        
+        start = time.perf_counter()
+        for crew_key, crew_result, seconds in self._run_jobs(jobs):
+            print(f"\n🔧 {approach_titles.get(crew_key, crew_key).upper()} ({seconds:.2f}s):")
+            print("-" * 40)
+            
+            if crew_result["success"]:
+                print(crew_result["response"])
+            else:
+                print(f"❌ {crew_result['error']}")
+            customization_results[crew_key] = crew_result
+            latencies[crew_key] = seconds
             
             print("\n" + "="*60)
+        timing = self._timing_report(latencies, time.perf_counter() - start)
         
         customization_result = {
             "timestamp": datetime.now().isoformat(),
             "task": task_description,
-            "customization_results": customization_results
+            "customization_results": customization_results,
+            "timing": timing
         }
         
-        self.results.append(customization_result)
+        self._record_result(customization_result)
         return customization_result
     
     def run_crew_demo(self, crew_name: str) -> Dict[str, Any]:
@@ -254,7 +458,7 @@ class LightningLesson2Demo:
                 "result": str(result)
             }
             
-            self.results.append(crew_result)
+            self._record_result(crew_result)
             return crew_result
             
         except Exception as e:
@@ -263,7 +467,7 @@ class LightningLesson2Demo:
                 "crew_name": crew_name,
                 "error": str(e)
             }
-            self.results.append(error_result)
+            self._record_result(error_result)
             return error_result
     
     def _execute_agent_task(self, agent, task: str) -> str:
@@ -342,16 +546,11 @@ class LightningLesson2Demo:
         }
     
     def save_results(self, filename: str = None):
-        """Save demo results to file"""
+        """Save every logged result to a JSON file (default: artifacts/ll2_demo_results_<timestamp>.json)"""
         if not filename:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"artifacts/ll2_demo_results_{timestamp}.json"
-        
-        os.makedirs("artifacts", exist_ok=True)
-        
-        with open(filename, 'w') as f:
-            json.dump(self.results, f, indent=2)
+            filename = os.path.join(self.results_log.output_dir, f"{self.results_log.base_name}.json")
         
+        self.results_log.export_json(filename)
         print(f"\n💾 Results saved to: {filename}")
         return filename
 
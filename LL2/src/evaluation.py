@@ -0,0 +1,245 @@
+"""
+Lightning Lesson 2: Persona A/B Evaluation
+Runs N samples per persona and task concurrently under a global rate limit and aggregates
+latency, token usage and response quality distributions per persona
+"""
+
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List
+
+import numpy as np
+
+from .agents import LightningLesson2Agents
+from .response_analytics import ResponseAnalytics, text_features
+from .results_log import ResultsLog, find_result_logs, iter_results
+
+
+EVALUATION_CACHE_DIR = "artifacts/evaluation_cache"
+
+# Samples generated at once (the rate limit still caps kickoffs per minute)
+DEFAULT_EVAL_CONCURRENCY = 4
+
+
+class RateLimiter:
+    """Token bucket shared by all worker threads.
+
+    ``rate_per_minute`` crew kickoffs are allowed per minute, with bursts of
+    up to ``burst`` kickoffs; 0 disables the limit.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int = 1):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a kickoff is allowed"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def distribution(values: List[float]) -> Dict[str, float]:
+    """Summary statistics of a sample distribution"""
+    values = np.asarray(values, dtype=np.float64)
+    if values.size == 0:
+        return {"n": 0}
+    p50, p90 = np.percentile(values, [50, 90])
+    return {
+        "n": int(values.size),
+        "mean": float(values.mean()),
+        "std": float(values.std(ddof=1)) if values.size > 1 else 0.0,
+        "min": float(values.min()),
+        "p50": float(p50),
+        "p90": float(p90),
+        "max": float(values.max())
+    }
+
+
+class PersonaEvaluation:
+    """Samples personas repeatedly on the same tasks and compares the distributions.
+
+    Completed samples are appended to a JSONL cache keyed by a fingerprint
+    of the agent's resolved configuration, the task and the sample index,
+    so re-running an evaluation (or raising ``samples``) only generates
+    the samples that are missing. Changing an agent's YAML or templates
+    changes its fingerprint and invalidates its samples.
+    """
+
+    def __init__(self, agents_manager: LightningLesson2Agents, samples: int = 5,
+                 max_concurrency: int = DEFAULT_EVAL_CONCURRENCY, requests_per_minute: float = 30,
+                 cache_dir: str = EVALUATION_CACHE_DIR, verbose: bool = False, memory: bool = False):
+        self.agents_manager = agents_manager
+        self.samples = max(1, samples)
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate_limiter = RateLimiter(requests_per_minute, burst=self.max_concurrency)
+        self.cache_dir = cache_dir
+        self.verbose = verbose
+        self.memory = memory
+
+        self._cache: Dict[str, Dict[str, Any]] = {
+            sample["key"]: sample for sample in iter_results(find_result_logs(cache_dir, "samples"))
+        }
+        self._cache_log = ResultsLog(output_dir=cache_dir, prefix="samples")
+        self._print_lock = threading.Lock()
+
+    def _fingerprint(self, data: Any) -> str:
+        return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+    def _task_spec(self, task_name: str) -> Dict[str, str]:
+        task_config = self.agents_manager.config_loader.get_task_config(task_name)
+        if not task_config:
+            raise ValueError(f"Task configuration not found: {task_name}")
+        return {
+            "description": task_config.get("description", task_name),
+            "expected_output": task_config.get("expected_output", "A detailed, professional response")
+        }
+
+    def _sample_key_prefix(self, agent_name: str, task_name: str) -> str:
+        """Fingerprint of an agent's resolved config and model plus the task"""
+        factory = self.agents_manager.factory
+        agent_fingerprint = self._fingerprint({
+            "agent": factory._resolve_agent_params(agent_name),
+            "model": factory.llm.model_name
+        })
+        return f"{agent_fingerprint}:{self._fingerprint(self._task_spec(task_name))}"
+
+    def _run_sample(self, persona: str, agent_name: str, task_name: str, index: int, key: str) -> Dict[str, Any]:
+        """Kick off one single-task crew with a private agent instance"""
+        from crewai import Task, Crew
+
+        task_spec = self._task_spec(task_name)
+        agent = self.agents_manager.factory.create_agent(agent_name)
+        crew = Crew(
+            agents=[agent],
+            tasks=[Task(agent=agent, **task_spec)],
+            verbose=self.verbose,
+            memory=self.memory
+        )
+
+        self.rate_limiter.acquire()
+        start = time.perf_counter()
+        sample = {"key": key, "persona": persona, "agent": agent_name, "task": task_name, "index": index}
+        try:
+            output = crew.kickoff()
+        except Exception as e:
+            sample.update(error=str(e), latency_seconds=time.perf_counter() - start)
+            return sample
+
+        usage = getattr(output, "token_usage", None)
+        sample.update(
+            timestamp=datetime.now().isoformat(),
+            latency_seconds=time.perf_counter() - start,
+            response=str(getattr(output, "raw", output)),
+            prompt_tokens=getattr(usage, "prompt_tokens", 0),
+            completion_tokens=getattr(usage, "completion_tokens", 0),
+            total_tokens=getattr(usage, "total_tokens", 0)
+        )
+        return sample
+
+    def run(self, personas: Dict[str, str], task_names: List[str]) -> List[Dict[str, Any]]:
+        """Collect ``samples`` responses for every persona (label -> agent name) and task.
+
+        Failed samples are returned but not cached, so they are retried on
+        the next run.
+        """
+        samples = []
+        pending = []
+        for persona, agent_name in personas.items():
+            for task_name in task_names:
+                key_prefix = self._sample_key_prefix(agent_name, task_name)
+                for index in range(self.samples):
+                    key = f"{key_prefix}:{index}"
+                    if key in self._cache:
+                        samples.append({**self._cache[key], "persona": persona, "cached": True})
+                    else:
+                        pending.append((persona, agent_name, task_name, index, key))
+
+        print(f"🧪 {len(samples)} cached samples, generating {len(pending)} "
+              f"({self.max_concurrency} at a time)")
+
+        def generate(job):
+            sample = self._run_sample(*job)
+            with self._print_lock:
+                status = f"❌ {sample['error']}" if "error" in sample else f"{sample['latency_seconds']:.2f}s"
+                print(f"   {sample['persona']} / {sample['task']} #{sample['index']}: {status}")
+            if "error" not in sample:
+                self._cache[sample["key"]] = sample
+                self._cache_log.append(sample)
+            return sample
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="ll2-eval") as executor:
+            samples.extend(executor.map(generate, pending))
+        self._cache_log.close()
+        return samples
+
+    def aggregate(self, samples: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Latency, token and quality distributions per persona.
+
+        Every persona in ``samples`` is reported, including one whose
+        samples all failed (``samples: 0`` with its error count).
+        """
+        completed = [sample for sample in samples if "error" not in sample]
+        summary: Dict[str, Dict[str, Any]] = {}
+        for persona in dict.fromkeys(sample["persona"] for sample in samples):
+            summary[persona] = {
+                "samples": 0,
+                "errors": sum(1 for sample in samples if sample["persona"] == persona and "error" in sample)
+            }
+        if not completed:
+            return summary
+
+        texts = [sample["response"] for sample in completed]
+        analytics = ResponseAnalytics()
+        matrix, vocabulary = analytics.tfidf(texts)
+        coverage = analytics.keyword_coverage(matrix, vocabulary)
+        features = text_features(texts)
+        personas = np.array([sample["persona"] for sample in completed])
+
+        for persona in dict.fromkeys(personas.tolist()):
+            rows = np.flatnonzero(personas == persona)
+            similarity = matrix[rows] @ matrix[rows].T
+            off_diagonal = similarity[~np.eye(len(rows), dtype=bool)]
+            persona_samples = [completed[i] for i in rows]
+            summary[persona].update({
+                "samples": int(len(rows)),
+                "latency_seconds": distribution([s["latency_seconds"] for s in persona_samples]),
+                "total_tokens": distribution([s["total_tokens"] for s in persona_samples]),
+                "completion_tokens": distribution([s["completion_tokens"] for s in persona_samples]),
+                "words": distribution(features["words"][rows]),
+                "flesch_reading_ease": distribution(features["flesch_reading_ease"][rows]),
+                "self_similarity": distribution(off_diagonal),
+                **{f"coverage_{name}": distribution(coverage[rows, p])
+                   for p, name in enumerate(analytics.keywords)}
+            })
+        return summary
+
+    def print_report(self, summary: Dict[str, Dict[str, Any]]):
+        """Print mean ± std and p90 of each metric per persona"""
+        print("\n🧪 PERSONA EVALUATION REPORT")
+        print("-" * 60)
+        for persona, metrics in summary.items():
+            print(f"\n🔹 {persona} ({metrics['samples']} samples, {metrics['errors']} errors)")
+            for name, stats in metrics.items():
+                if not isinstance(stats, dict):
+                    continue
+                if not stats["n"]:
+                    print(f"   {name}: n/a")
+                    continue
+                print(f"   {name}: {stats['mean']:.3f} ± {stats['std']:.3f} (p90 {stats['p90']:.3f}, n={stats['n']})")
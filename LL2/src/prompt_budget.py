@@ -0,0 +1,188 @@
+"""
+Lightning Lesson 2: Prompt Token Budget Analyzer
+Renders the prompts CrewAI sends for every configured agent and measures their token overhead
+"""
+
+import os
+import re
+import json
+import hashlib
+from typing import Dict, Any, Callable, List, Optional
+
+from .agents import LightningLesson2Agents
+
+
+# Approximates BPE tokenization: words, numbers and individual punctuation marks
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def regex_token_count(text: str) -> int:
+    """Offline token estimate from word and punctuation boundaries"""
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+def char_token_count(text: str) -> int:
+    """Offline token estimate using the ~4 characters per token rule of thumb"""
+    return (len(text) + 3) // 4
+
+
+TOKENIZERS: Dict[str, Callable[[str], int]] = {
+    "regex": regex_token_count,
+    "chars": char_token_count
+}
+
+
+def register_tokenizer(name: str, count_tokens: Callable[[str], int]):
+    """Register a token counting function under a name"""
+    TOKENIZERS[name] = count_tokens
+
+
+def get_tokenizer(name: str = "regex") -> Callable[[str], int]:
+    """Get a token counting function by name.
+
+    "tiktoken" uses the OpenAI encoding for OPENAI_MODEL_NAME when the
+    tiktoken package (and its cached encoding files) is available.
+    """
+    if name == "tiktoken" and name not in TOKENIZERS:
+        import tiktoken
+
+        try:
+            encoding = tiktoken.encoding_for_model(os.getenv("OPENAI_MODEL_NAME", "gpt-4o-mini"))
+        except KeyError:
+            encoding = tiktoken.get_encoding("o200k_base")
+        register_tokenizer("tiktoken", lambda text: len(encoding.encode(text)))
+
+    if name not in TOKENIZERS:
+        raise ValueError(f"Unknown tokenizer: {name} (available: {', '.join(TOKENIZERS)})")
+    return TOKENIZERS[name]
+
+
+# Context window sizes (tokens) for models used in the lessons
+CONTEXT_WINDOWS = {
+    "gpt-4o-mini": 128000,
+    "gpt-4o": 128000,
+    "gpt-4.1": 1047576,
+    "gpt-4.1-mini": 1047576,
+    "gpt-4-turbo": 128000,
+    "gpt-3.5-turbo": 16385,
+    "llama-3.3-70b": 128000
+}
+DEFAULT_CONTEXT_WINDOW = 128000
+
+
+class PromptBudgetAnalyzer:
+    """Renders system/user prompts per agent and slice set and counts their tokens"""
+
+    def __init__(self, agents_manager: LightningLesson2Agents, tokenizer: str = "regex",
+                 context_window: Optional[int] = None, model: Optional[str] = None):
+        self.agents_manager = agents_manager
+        self.tokenizer_name = tokenizer
+        self.count_tokens = get_tokenizer(tokenizer)
+        self.model = model or agents_manager.factory.llm.model_name
+        self.context_window = context_window or CONTEXT_WINDOWS.get(self.model, DEFAULT_CONTEXT_WINDOW)
+
+        # Rendered prompts keyed by a hash of agent config, templates and slices
+        self._rendered: Dict[str, Dict[str, str]] = {}
+        self._i18n: Dict[Optional[str], Any] = {}
+
+    def _slices_digest(self, prompt_file: Optional[str]) -> str:
+        """Content hash of a crew prompt_file (CrewAI's built-in slices otherwise)"""
+        if not prompt_file:
+            return "default"
+        with open(prompt_file, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    def _get_i18n(self, prompt_file: Optional[str]):
+        from crewai.utilities.i18n import I18N
+
+        if prompt_file not in self._i18n:
+            self._i18n[prompt_file] = I18N(prompt_file=prompt_file) if prompt_file else I18N()
+        return self._i18n[prompt_file]
+
+    def render(self, agent_name: str, prompt_file: Optional[str] = None) -> Dict[str, str]:
+        """Render the task-execution prompts CrewAI would send for an agent"""
+        from crewai.utilities.prompts import Prompts
+
+        factory = self.agents_manager.factory
+        agent_params = factory._resolve_agent_params(agent_name)
+        render_key = hashlib.sha256(json.dumps(
+            {"agent": agent_params, "slices": self._slices_digest(prompt_file)},
+            sort_keys=True, default=str
+        ).encode("utf-8")).hexdigest()
+
+        rendered = self._rendered.get(render_key)
+        if rendered is None:
+            agent = factory.create_agent(agent_name)
+            prompts = Prompts(
+                i18n=self._get_i18n(prompt_file),
+                agent=agent,
+                has_tools=len(agent.tools or []) > 0,
+                system_template=agent.system_template,
+                prompt_template=agent.prompt_template,
+                response_template=agent.response_template,
+                use_system_prompt=agent.use_system_prompt
+            )
+            generated = prompts.task_execution()
+            rendered = {
+                "system": generated.get("system", generated["prompt"]),
+                "user": generated.get("user", ""),
+                "prompt": generated["prompt"]
+            }
+            self._rendered[render_key] = rendered
+        return rendered
+
+    def measure(self, agent_name: str, prompt_file: Optional[str] = None) -> Dict[str, Any]:
+        """Token counts of an agent's rendered prompts against the context window"""
+        rendered = self.render(agent_name, prompt_file)
+        prompt_tokens = self.count_tokens(rendered["prompt"])
+        return {
+            "agent": agent_name,
+            "slice_set": prompt_file or "crewai-default",
+            "system_tokens": self.count_tokens(rendered["system"]),
+            "user_tokens": self.count_tokens(rendered["user"]),
+            "prompt_tokens": prompt_tokens,
+            "context_window": self.context_window,
+            "context_share": prompt_tokens / self.context_window
+        }
+
+    def analyze(self) -> List[Dict[str, Any]]:
+        """Measure every agent with CrewAI's slices and with each crew prompt_file.
+
+        Rows are sorted by prompt size, largest first.
+        """
+        config_loader = self.agents_manager.config_loader
+        targets = [(agent_name, None) for agent_name in config_loader.get_all_agents()]
+
+        for crew_name, crew_config in config_loader.get_all_crews().items():
+            prompt_file = (crew_config or {}).get("prompt_file")
+            if not prompt_file:
+                continue
+            crew_agents = list(crew_config.get("agents", []))
+            for task_name in crew_config.get("tasks", []):
+                agent_name = config_loader.get_task_config(task_name).get("agent")
+                if agent_name:
+                    crew_agents.append(agent_name)
+            targets.extend((agent_name, prompt_file) for agent_name in dict.fromkeys(crew_agents))
+
+        rows = []
+        for agent_name, prompt_file in dict.fromkeys(targets):
+            try:
+                rows.append(self.measure(agent_name, prompt_file))
+            except Exception as e:
+                rows.append({"agent": agent_name, "slice_set": prompt_file or "crewai-default",
+                             "error": str(e)})
+
+        return sorted(rows, key=lambda row: row.get("prompt_tokens", -1), reverse=True)
+
+    def print_report(self, rows: List[Dict[str, Any]]):
+        """Print a per-agent prompt overhead table"""
+        print(f"\n📏 PROMPT TOKEN BUDGET ({self.model}, {self.context_window:,} token window, "
+              f"tokenizer: {self.tokenizer_name})")
+        print("-" * 90)
+        print(f"{'Agent':<32} {'Slice set':<28} {'System':>7} {'User':>6} {'Total':>7} {'Window':>7}")
+        for row in rows:
+            if "error" in row:
+                print(f"{row['agent']:<32} {row['slice_set']:<28} ❌ {row['error']}")
+                continue
+            print(f"{row['agent']:<32} {row['slice_set']:<28} {row['system_tokens']:>7} "
+                  f"{row['user_tokens']:>6} {row['prompt_tokens']:>7} {row['context_share']:>7.2%}")
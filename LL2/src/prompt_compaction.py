@@ -0,0 +1,225 @@
+"""
+Lightning Lesson 2: Prompt Compaction
+Removes persona instructions repeated across role/goal/backstory, system templates and crew prompt slices
+"""
+
+import os
+import re
+import yaml
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from .config_loader import ConfigLoader
+from .prompt_budget import get_tokenizer
+from .prompt_slices import load_prompt_slices
+from .template_cache import TemplateCache, default_template_cache
+
+
+# Slices CrewAI renders into every task-execution prompt
+TASK_EXECUTION_SLICES = ("role_playing", "no_tools", "tools", "task")
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+_WORD_PATTERN = re.compile(r"[a-z0-9+]+")
+_FIELD_PATTERN = re.compile(r"\{\{\s*\.\w+\s*\}\}|\{\w+\}")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our that the "
+    "their this to with you your we will".split()
+)
+
+
+def sentence_key(sentence: str) -> frozenset:
+    """Content words of a sentence, used for duplicate detection"""
+    return frozenset(w for w in _WORD_PATTERN.findall(sentence.lower()) if w not in STOPWORDS)
+
+
+class PromptCompactor:
+    """Detects duplicated or near-duplicated sentences across an agent's prompt sources.
+
+    Sources are read in the order CrewAI assembles them: role, goal and
+    backstory, then the crew's prompt slices, then the system template.
+    Role, goal and slices are kept verbatim (CrewAI interpolates them);
+    sentences of the backstory and system template that repeat an earlier
+    sentence are dropped. The compacted agent config is shared by every
+    crew, so only slice sentences present in all of the agent's crews
+    count; an agent that also runs without a prompt_file keeps its text.
+    """
+
+    def __init__(self, config_loader: ConfigLoader, tokenizer: str = "regex",
+                 similarity_threshold: float = 0.8, min_words: int = 6,
+                 template_cache: Optional[TemplateCache] = None):
+        self.config_loader = config_loader
+        self.count_tokens = get_tokenizer(tokenizer)
+        self.similarity_threshold = similarity_threshold
+        self.min_words = min_words
+        self.template_cache = template_cache or default_template_cache
+
+    def _load_slices(self, prompt_file: str) -> Dict[str, str]:
+        return dict(load_prompt_slices(prompt_file, strict=False).slices)
+
+    def _agent_prompt_files(self, agent_name: str) -> List[Optional[str]]:
+        """Prompt_file of each crew the agent runs in (None for CrewAI's defaults), via membership or tasks"""
+        crews = self.config_loader.get_crews_by_agent(agent_name)
+        for task_name in self.config_loader.get_tasks_by_agent(agent_name):
+            crews.extend(self.config_loader.get_crews_by_task(task_name))
+        return list(dict.fromkeys(self.config_loader.get_crew_config(crew_name).get("prompt_file")
+                                  for crew_name in dict.fromkeys(crews)))
+
+    def _shared_slice_sentences(self, prompt_files: List[Optional[str]]) -> List[frozenset]:
+        """Sentence keys of the task-execution slices that every one of the agent's crews renders"""
+        shared: Optional[List[frozenset]] = None
+        for prompt_file in prompt_files or [None]:
+            keys: List[frozenset] = []
+            if prompt_file:
+                slices = self._load_slices(prompt_file)
+                text = "\n".join(slices.get(slice_name, "") for slice_name in TASK_EXECUTION_SLICES)
+                for sentence in _SENTENCE_SPLIT.split(_FIELD_PATTERN.sub(" ", text)):
+                    key = sentence_key(sentence)
+                    if key:
+                        keys.append(key)
+            shared = keys if shared is None else [key for key in shared if key in set(keys)]
+        return shared
+
+    def _is_duplicate(self, key: frozenset, seen: List[frozenset], seen_exact: Set[frozenset]) -> bool:
+        if key in seen_exact:
+            return True
+        if len(key) < self.min_words:
+            return False
+        for earlier in seen:
+            if len(key & earlier) / len(key) >= self.similarity_threshold:
+                return True
+        return False
+
+    def _compact_text(self, text: str, seen: List[frozenset],
+                      seen_exact: Set[frozenset]) -> Tuple[str, List[str]]:
+        """Drop sentences already covered by ``seen``, line by line; returns (text, removed)"""
+        kept_lines = []
+        removed = []
+        for line in text.splitlines():
+            bullet = re.match(r"\s*(?:[-*]|\d+\.)\s+", line)
+            prefix = bullet.group(0) if bullet else ""
+            kept = []
+            for sentence in _SENTENCE_SPLIT.split(line[len(prefix):]):
+                key = sentence_key(sentence)
+                if key and self._is_duplicate(key, seen, seen_exact):
+                    removed.append(sentence.strip())
+                    continue
+                kept.append(sentence)
+                if key:
+                    seen.append(key)
+                    seen_exact.add(key)
+            if kept:
+                kept_lines.append(prefix + " ".join(kept))
+            elif not line.strip():
+                kept_lines.append(line)
+        return "\n".join(kept_lines).strip(), removed
+
+    def compact_agent(self, agent_name: str) -> Dict[str, Any]:
+        """Compact one agent's backstory and system template"""
+        agent_config = self.config_loader.get_agent_config(agent_name)
+        if not agent_config:
+            raise ValueError(f"Agent configuration not found: {agent_name}")
+
+        seen: List[frozenset] = []
+        seen_exact: Set[frozenset] = set()
+
+        def remember(text: str):
+            for sentence in _SENTENCE_SPLIT.split(_FIELD_PATTERN.sub(" ", text)):
+                key = sentence_key(sentence)
+                if key:
+                    seen.append(key)
+                    seen_exact.add(key)
+
+        role = agent_config.get("role", "")
+        goal = agent_config.get("goal", "")
+        remember(role)
+        remember(goal)
+
+        backstory, removed_backstory = self._compact_text(agent_config.get("backstory", ""), seen, seen_exact)
+
+        prompt_files = self._agent_prompt_files(agent_name)
+        for key in self._shared_slice_sentences(prompt_files):
+            seen.append(key)
+            seen_exact.add(key)
+
+        template_path = agent_config.get("system_template")
+        template_text = ""
+        if isinstance(template_path, str) and template_path.endswith(".txt"):
+            template_text = self.template_cache.get(template_path).content
+        elif template_path:
+            template_text = template_path
+        compacted_template, removed_template = self._compact_text(template_text, seen, seen_exact)
+
+        original_tokens = self.count_tokens(
+            "\n".join([role, goal, agent_config.get("backstory", ""), template_text])
+        )
+        compacted_tokens = self.count_tokens("\n".join([role, goal, backstory, compacted_template]))
+
+        return {
+            "agent": agent_name,
+            "prompt_files": [prompt_file for prompt_file in prompt_files if prompt_file],
+            "backstory": backstory,
+            "system_template": compacted_template,
+            "system_template_path": template_path,
+            "removed": removed_backstory + removed_template,
+            "original_tokens": original_tokens,
+            "compacted_tokens": compacted_tokens,
+            "saved_tokens": original_tokens - compacted_tokens
+        }
+
+    def compact_all(self) -> Dict[str, Any]:
+        """Compact every agent and total the savings per crew run.
+
+        A crew run sends each task's agent prompt at least once, so its
+        savings are the sum over its tasks' agents.
+        """
+        agents = {}
+        for agent_name in self.config_loader.get_all_agents():
+            try:
+                agents[agent_name] = self.compact_agent(agent_name)
+            except Exception as e:
+                agents[agent_name] = {"agent": agent_name, "error": str(e), "saved_tokens": 0}
+
+        crews = {}
+        for crew_name, crew_config in self.config_loader.get_all_crews().items():
+            saved = 0
+            for task_name in (crew_config or {}).get("tasks", []):
+                agent_name = self.config_loader.get_task_config(task_name).get("agent")
+                saved += agents.get(agent_name, {}).get("saved_tokens", 0)
+            crews[crew_name] = {"saved_tokens_per_run": saved}
+
+        return {"agents": agents, "crews": crews}
+
+    def write_config(self, report: Dict[str, Any], output_dir: str = "artifacts/compacted_prompts") -> str:
+        """Write compacted templates and an agents.yaml that references them"""
+        os.makedirs(output_dir, exist_ok=True)
+        agents_config = {}
+        for agent_name, agent_config in self.config_loader.get_all_agents().items():
+            compacted = report["agents"].get(agent_name, {})
+            agent_config = dict(agent_config or {})
+            if "error" not in compacted:
+                agent_config["backstory"] = compacted["backstory"]
+                if compacted["system_template"]:
+                    template_file = os.path.join(output_dir, f"{agent_name}.txt")
+                    with open(template_file, 'w', encoding='utf-8') as f:
+                        f.write(compacted["system_template"] + "\n")
+                    agent_config["system_template"] = template_file
+            agents_config[agent_name] = agent_config
+
+        agents_file = os.path.join(output_dir, "agents.yaml")
+        with open(agents_file, 'w', encoding='utf-8') as f:
+            yaml.dump(agents_config, f, default_flow_style=False, indent=2, sort_keys=False)
+        return agents_file
+
+    def print_report(self, report: Dict[str, Any]):
+        """Print token savings per agent and per crew run"""
+        print("\n✂️  PROMPT COMPACTION REPORT")
+        print("-" * 60)
+        for agent_name, compacted in report["agents"].items():
+            if "error" in compacted:
+                print(f"   {agent_name}: ❌ {compacted['error']}")
+                continue
+            print(f"   {agent_name}: {compacted['original_tokens']} → {compacted['compacted_tokens']} tokens "
+                  f"(-{compacted['saved_tokens']}, {len(compacted['removed'])} duplicate sentences)")
+        print("\n   Savings per crew run:")
+        for crew_name, crew in report["crews"].items():
+            print(f"   {crew_name}: -{crew['saved_tokens_per_run']} tokens")
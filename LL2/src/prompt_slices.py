@@ -0,0 +1,152 @@
+"""
+Lightning Lesson 2: Prompt Slice Validation
+Checks a crew prompt_file's slices against how CrewAI fills them in, once per version of the file
+"""
+
+import os
+import re
+import json
+import string
+import threading
+from typing import Dict, FrozenSet, List, Tuple
+
+
+# Placeholders CrewAI fills in for each slice (crewai/translations/en.json)
+CREWAI_SLICE_PLACEHOLDERS: Dict[str, FrozenSet[str]] = {
+    "observation": frozenset(),
+    "task": frozenset({"input"}),
+    "memory": frozenset({"memory"}),
+    "role_playing": frozenset({"role", "goal", "backstory"}),
+    "tools": frozenset({"tools", "tool_names"}),
+    "no_tools": frozenset(),
+    "format": frozenset({"tool_names"}),
+    "final_answer_format": frozenset(),
+    "format_without_tools": frozenset({"tool_names"}),
+    "task_with_context": frozenset({"task", "context"}),
+    "expected_output": frozenset({"expected_output"}),
+    "human_feedback": frozenset({"human_feedback"}),
+    "getting_input": frozenset({"final_answer"}),
+    "summarizer_system_message": frozenset(),
+    "summarize_instruction": frozenset({"group"}),
+    "summary": frozenset({"merged_summary"}),
+    "manager_request": frozenset(),
+    "formatted_task_instructions": frozenset({"output_format"}),
+    "conversation_history_instruction": frozenset(),
+    "feedback_instructions": frozenset({"feedback"}),
+    "lite_agent_system_prompt_with_tools": frozenset({"role", "goal", "backstory", "tools", "tool_names"}),
+    "lite_agent_system_prompt_without_tools": frozenset({"role", "goal", "backstory"}),
+    "lite_agent_response_format": frozenset({"response_format"}),
+    "knowledge_search_query": frozenset({"task_prompt"}),
+    "knowledge_search_query_system_prompt": frozenset()
+}
+
+# Slices CrewAI passes through str.format somewhere, so a literal brace must
+# be doubled and any other placeholder raises. The rest are filled in with
+# str.replace (or used as they are), where other braces are just text.
+FORMATTED_SLICES = frozenset({
+    "memory", "tools", "format", "task_with_context", "expected_output", "summarize_instruction", "summary",
+    "formatted_task_instructions", "feedback_instructions", "lite_agent_system_prompt_with_tools",
+    "lite_agent_system_prompt_without_tools", "lite_agent_response_format", "knowledge_search_query"
+})
+
+# Slices that exist to carry one value into the prompt
+CONTENT_PLACEHOLDERS = {
+    "task": "input",
+    "memory": "memory",
+    "task_with_context": "context",
+    "expected_output": "expected_output",
+    "formatted_task_instructions": "output_format"
+}
+
+# What str.replace-filled slices could mean as a placeholder
+PLACEHOLDER_PATTERN = re.compile(r"\{([A-Za-z_]\w*)\}")
+
+
+def check_slice(prompt_file: str, slice_name: str, text: str) -> Tuple[List[str], List[str]]:
+    """(errors, warnings) for one slice.
+
+    Errors are what would fail inside CrewAI: a slice ``str.format`` cannot
+    parse, or a formatted slice using a placeholder CrewAI does not pass.
+    A placeholder-like word in a ``str.replace`` slice is only a warning,
+    since CrewAI leaves it in the prompt as text.
+    """
+    provided = CREWAI_SLICE_PLACEHOLDERS.get(slice_name)
+    if provided is None:
+        return [], [f"Slice '{slice_name}' in {prompt_file} is not used by CrewAI"]
+
+    label = f"Slice '{slice_name}' in {prompt_file}"
+    errors, warnings = [], []
+    if slice_name in FORMATTED_SLICES:
+        try:
+            fields = {field for _, field, _, _ in string.Formatter().parse(text) if field is not None}
+        except ValueError as e:
+            return [f"{label}: {e} (CrewAI fills it with str.format, so literal braces must be doubled)"], []
+        for placeholder in sorted(fields - provided):
+            errors.append(f"{label} uses undefined placeholder {{{placeholder}}} "
+                          f"(CrewAI provides: {', '.join(sorted(provided)) or 'none'})")
+    else:
+        fields = set(PLACEHOLDER_PATTERN.findall(text))
+        for placeholder in sorted(fields - provided):
+            warnings.append(f"{label} keeps {{{placeholder}}} as literal text "
+                            f"(CrewAI fills in: {', '.join(sorted(provided)) or 'nothing'})")
+
+    content = CONTENT_PLACEHOLDERS.get(slice_name)
+    if content and content not in fields:
+        warnings.append(f"{label} omits {{{content}}}, so CrewAI drops that content from prompts")
+    return errors, warnings
+
+
+class PromptSliceSet:
+    """All slices of one prompt_file, with the problems found while checking them"""
+
+    def __init__(self, path: str, mtime_ns: int, size: int, slices: Dict[str, str],
+                 errors: List[str], warnings: List[str]):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.slices = slices
+        self.errors = errors
+        self.warnings = warnings
+
+
+def read_prompt_file(prompt_file: str) -> PromptSliceSet:
+    """Read a prompt_file and check every slice"""
+    stat = os.stat(prompt_file)
+    with open(prompt_file, 'r', encoding='utf-8') as f:
+        slices = json.load(f).get("slices", {})
+
+    errors, warnings = [], []
+    for slice_name, text in slices.items():
+        slice_errors, slice_warnings = check_slice(prompt_file, slice_name, text)
+        errors.extend(slice_errors)
+        warnings.extend(slice_warnings)
+    return PromptSliceSet(prompt_file, stat.st_mtime_ns, stat.st_size, slices, errors, warnings)
+
+
+_slice_sets: Dict[str, PromptSliceSet] = {}
+_slice_sets_lock = threading.Lock()
+
+
+def load_prompt_slices(prompt_file: str, strict: bool = True) -> PromptSliceSet:
+    """Get the checked slices of a prompt_file, re-reading it only when the file changes.
+
+    With ``strict`` a ValueError lists every slice CrewAI would fail on, so
+    a bad prompt file fails when a crew is built instead of in the middle
+    of a run.
+    """
+    stat = os.stat(prompt_file)
+    with _slice_sets_lock:
+        slice_set = _slice_sets.get(prompt_file)
+    if slice_set is None or (slice_set.mtime_ns, slice_set.size) != (stat.st_mtime_ns, stat.st_size):
+        slice_set = read_prompt_file(prompt_file)
+        with _slice_sets_lock:
+            _slice_sets[prompt_file] = slice_set
+
+    if strict and slice_set.errors:
+        raise ValueError(f"Invalid prompt slices in {prompt_file}:\n  - " + "\n  - ".join(slice_set.errors))
+    return slice_set
+
+
+def validate_prompt_slices(prompt_file: str) -> List[str]:
+    """Check a prompt_file before any crew uses it; returns warnings and raises ValueError listing the errors"""
+    return load_prompt_slices(prompt_file).warnings
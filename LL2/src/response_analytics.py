@@ -0,0 +1,238 @@
+"""
+Lightning Lesson 2: Persona Response Analytics
+Batch TF-IDF similarity, length/readability statistics and keyword coverage over stored persona responses
+
+Usage:
+    python -m src.response_analytics "artifacts/ll2_demo_results_*.jsonl*"
+    python -m src.response_analytics artifacts/*.json --output artifacts/response_analytics
+"""
+
+import os
+import re
+import json
+import hashlib
+import argparse
+from collections import Counter
+from typing import Dict, Any, Iterable, List, Optional
+
+import numpy as np
+
+from .results_log import iter_results
+
+
+# Terms signalling each persona's voice (see _analyze_differences in demo_runner)
+PERSONA_KEYWORDS = {
+    "marketing": ["brand", "audience", "target", "creative", "innovative", "engagement", "campaign"],
+    "legal": ["compliance", "legal", "regulation", "risk", "gdpr", "liability", "disclaimer"],
+    "technical": ["technical", "architecture", "security", "scalability", "latency", "infrastructure"]
+}
+
+FEATURE_DTYPE = np.dtype([
+    ("chars", np.int32),
+    ("words", np.int32),
+    ("sentences", np.int32),
+    ("avg_word_length", np.float32),
+    ("avg_sentence_words", np.float32),
+    ("flesch_reading_ease", np.float32)
+])
+
+# How _execute_agent_task in demo_runner reports a failed kickoff in place of a response
+ERROR_RESPONSE_PREFIX = "Error executing task:"
+
+_WORD_PATTERN = re.compile(r"[a-z][a-z0-9'-]*")
+_SENTENCE_PATTERN = re.compile(r"[.!?]+(?:\s|$)")
+_VOWEL_GROUPS = re.compile(r"[aeiouy]+")
+
+
+def extract_responses(results: Iterable[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """Flatten LightningLesson2Demo results into (persona, task, response) records, skipping failed kickoffs"""
+    records = []
+    for result in results:
+        task = result.get("task", "")
+        responses = list(result.get("persona_responses", {}).items())
+        for key in ("default_response", "persona_response"):
+            if result.get(key):
+                responses.append((key.replace("_response", ""), result[key]))
+        for crew_key, crew_result in result.get("customization_results", {}).items():
+            if crew_result.get("success"):
+                responses.append((crew_key, crew_result["response"]))
+        for persona, response in responses:
+            if not response.startswith(ERROR_RESPONSE_PREFIX):
+                records.append({"persona": persona, "task": task, "response": response})
+    return records
+
+
+def text_features(texts: List[str]) -> np.ndarray:
+    """Length and Flesch reading-ease statistics, one structured row per text"""
+    features = np.zeros(len(texts), dtype=FEATURE_DTYPE)
+    letters = np.zeros(len(texts), dtype=np.float32)
+    syllables = np.zeros(len(texts), dtype=np.float32)
+    for i, text in enumerate(texts):
+        words = _WORD_PATTERN.findall(text.lower())
+        features[i]["chars"] = len(text)
+        features[i]["words"] = len(words)
+        features[i]["sentences"] = max(1, len(_SENTENCE_PATTERN.findall(text))) if words else 0
+        letters[i] = sum(map(len, words))
+        syllables[i] = sum(max(1, len(_VOWEL_GROUPS.findall(word))) for word in words)
+
+    word_counts = features["words"].astype(np.float32)
+    safe_words = np.maximum(word_counts, 1)
+    features["avg_word_length"] = letters / safe_words
+    features["avg_sentence_words"] = word_counts / np.maximum(features["sentences"], 1)
+    features["flesch_reading_ease"] = np.where(
+        word_counts > 0,
+        206.835 - 1.015 * features["avg_sentence_words"] - 84.6 * (syllables / safe_words),
+        0.0
+    )
+    return features
+
+
+class ResponseAnalytics:
+    """Vectorized analytics over a batch of persona responses"""
+
+    def __init__(self, max_features: int = 4096, min_df: int = 1,
+                 keywords: Optional[Dict[str, List[str]]] = None):
+        self.max_features = max_features
+        self.min_df = min_df
+        self.keywords = keywords or PERSONA_KEYWORDS
+
+    def _vocabulary(self, documents: List[Counter]) -> List[str]:
+        """Most frequent terms by document frequency, always including keywords"""
+        document_frequency = Counter()
+        for counts in documents:
+            document_frequency.update(counts.keys())
+        keywords = {k for terms in self.keywords.values() for k in terms}
+        ranked = [term for term, df in document_frequency.most_common()
+                  if df >= self.min_df and term not in keywords]
+        return sorted(keywords) + ranked[:max(0, self.max_features - len(keywords))]
+
+    def tfidf(self, texts: List[str]):
+        """Row-normalized TF-IDF matrix (float32) and its vocabulary"""
+        documents = [Counter(_WORD_PATTERN.findall(text.lower())) for text in texts]
+        vocabulary = self._vocabulary(documents)
+        term_index = {term: j for j, term in enumerate(vocabulary)}
+
+        matrix = np.zeros((len(texts), len(vocabulary)), dtype=np.float32)
+        for i, counts in enumerate(documents):
+            columns = [term_index[t] for t in counts if t in term_index]
+            matrix[i, columns] = [counts[vocabulary[j]] for j in columns]
+
+        document_frequency = np.count_nonzero(matrix, axis=0)
+        idf = np.log((1 + len(texts)) / (1 + document_frequency)) + 1.0
+        matrix = np.log1p(matrix) * idf.astype(np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.where(norms > 0, norms, 1.0)
+        return matrix, vocabulary
+
+    def keyword_coverage(self, matrix: np.ndarray, vocabulary: List[str]) -> np.ndarray:
+        """Fraction of each persona's keywords present in each response (docs x personas)"""
+        term_index = {term: j for j, term in enumerate(vocabulary)}
+        indicator = np.zeros((len(vocabulary), len(self.keywords)), dtype=np.float32)
+        for p, terms in enumerate(self.keywords.values()):
+            indicator[[term_index[t] for t in terms], p] = 1.0
+        # A persona without keywords covers nothing rather than dividing by zero
+        return ((matrix > 0).astype(np.float32) @ indicator) / np.maximum(indicator.sum(axis=0), 1)
+
+    def analyze(self, records: List[Dict[str, str]], output_dir: str, block_size: int = 1024) -> Dict[str, Any]:
+        """Compute analytics and write them as memory-mappable .npy files.
+
+        Re-running on the same records reuses the files on disk instead of
+        recomputing them.
+        """
+        texts = [record["response"] for record in records]
+        digest = hashlib.sha256(json.dumps(
+            {"records": records, "max_features": self.max_features, "min_df": self.min_df,
+             "keywords": self.keywords}, sort_keys=True
+        ).encode("utf-8")).hexdigest()
+
+        index_file = os.path.join(output_dir, "index.json")
+        if os.path.exists(index_file):
+            with open(index_file, 'r', encoding='utf-8') as f:
+                if json.load(f).get("digest") == digest:
+                    return load_analytics(output_dir)
+
+        os.makedirs(output_dir, exist_ok=True)
+        matrix, vocabulary = self.tfidf(texts)
+
+        # Cosine similarity in row blocks, straight into a float16 memmap
+        similarity = np.lib.format.open_memmap(
+            os.path.join(output_dir, "similarity.npy"), mode="w+",
+            dtype=np.float16, shape=(len(texts), len(texts))
+        )
+        for start in range(0, len(texts), block_size):
+            similarity[start:start + block_size] = matrix[start:start + block_size] @ matrix.T
+        similarity.flush()
+        del similarity
+
+        np.save(os.path.join(output_dir, "tfidf.npy"), matrix)
+        np.save(os.path.join(output_dir, "features.npy"), text_features(texts))
+        np.save(os.path.join(output_dir, "keyword_coverage.npy"), self.keyword_coverage(matrix, vocabulary))
+
+        with open(index_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                "digest": digest,
+                "records": [{"persona": r["persona"], "task": r["task"]} for r in records],
+                "vocabulary": vocabulary,
+                "personas": list(self.keywords)
+            }, f)
+
+        return load_analytics(output_dir)
+
+
+def load_analytics(output_dir: str) -> Dict[str, Any]:
+    """Open saved analytics with the matrices memory-mapped read-only"""
+    with open(os.path.join(output_dir, "index.json"), 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    analytics = {name: np.load(os.path.join(output_dir, f"{name}.npy"), mmap_mode="r")
+                 for name in ("similarity", "tfidf", "features", "keyword_coverage")}
+    analytics.update(index)
+    return analytics
+
+
+def persona_summary(analytics: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """Mean statistics per persona, plus mean similarity within and across personas"""
+    personas = np.array([record["persona"] for record in analytics["records"]])
+    features = analytics["features"]
+    similarity = analytics["similarity"]
+    summary = {}
+    for persona in dict.fromkeys(personas.tolist()):
+        rows = np.flatnonzero(personas == persona)
+        others = np.flatnonzero(personas != persona)
+        within = similarity[np.ix_(rows, rows)].astype(np.float32)
+        off_diagonal = within[~np.eye(len(rows), dtype=bool)]
+        summary[persona] = {
+            "responses": int(len(rows)),
+            "mean_words": float(features["words"][rows].mean()),
+            "mean_reading_ease": float(features["flesch_reading_ease"][rows].mean()),
+            "similarity_within": float(off_diagonal.mean()) if off_diagonal.size else 1.0,
+            "similarity_across": float(similarity[np.ix_(rows, others)].astype(np.float32).mean()) if others.size else 0.0,
+            **{f"coverage_{name}": float(analytics["keyword_coverage"][rows, p].mean())
+               for p, name in enumerate(analytics["personas"])}
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch analytics over stored persona responses")
+    parser.add_argument("results", nargs="+", help="Demo result files or glob patterns (.json, .jsonl, .jsonl.gz)")
+    parser.add_argument("--output", default="artifacts/response_analytics",
+                        help="Directory for the memory-mappable analytics files")
+    parser.add_argument("--max-features", type=int, default=4096, help="TF-IDF vocabulary size")
+    args = parser.parse_args()
+
+    records = extract_responses(iter_results(args.results))
+    if not records:
+        print("❌ No persona responses found in the given result files")
+        return 1
+
+    analytics = ResponseAnalytics(max_features=args.max_features).analyze(records, args.output)
+    print(f"📊 Analyzed {len(records)} responses → {args.output}")
+    for persona, stats in persona_summary(analytics).items():
+        print(f"\n🔹 {persona}")
+        for name, value in stats.items():
+            print(f"   {name}: {value:.3f}" if isinstance(value, float) else f"   {name}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
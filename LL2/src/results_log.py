@@ -0,0 +1,157 @@
+"""
+Lightning Lesson 2: Streaming Results Log
+Append-only JSONL sink for demo results, with optional gzip compression and size-based rotation
+"""
+
+import os
+import re
+import glob
+import gzip
+import json
+import time
+import threading
+from datetime import datetime
+from typing import Dict, Any, Iterable, Iterator, List, Tuple, Union
+
+
+RESULTS_DIR = "artifacts"
+RESULTS_PREFIX = "ll2_demo_results"
+
+# Seconds between flushes of a gzip segment (each flush ends a deflate block)
+GZIP_FLUSH_INTERVAL = 5.0
+
+# "<base>-<n>.jsonl[.gz]" segments and "<base>.json" exports
+RESULT_FILE_NAME = re.compile(r"^(?P<base>.*?)(?:-(?P<index>\d+))?\.(?:jsonl(?:\.gz)?|json)$")
+
+
+def _open_segment(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class ResultsLog:
+    """Writes each result as one JSON line as soon as it completes.
+
+    Segments are named ``<prefix>_<timestamp>-<n>.jsonl`` (``.jsonl.gz``
+    when compressed); a new segment is started once the current one
+    reaches ``max_bytes`` on disk (0 disables rotation). Plain segments
+    are flushed after every line, so a crash loses at most the result
+    being written. Gzip segments are flushed at most every
+    ``flush_interval`` seconds and on close, since every flush costs
+    compression; a crash may lose the results of that interval.
+    """
+
+    def __init__(self, output_dir: str = RESULTS_DIR, prefix: str = RESULTS_PREFIX,
+                 compress: bool = False, max_bytes: int = 0, flush_interval: float = GZIP_FLUSH_INTERVAL):
+        self.output_dir = output_dir
+        self.compress = compress
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.base_name = f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        self.paths: List[str] = []
+        self.count = 0
+        self._file = None
+        self._flushed_at = 0.0
+        self._lock = threading.Lock()
+
+    def _segment_path(self, index: int) -> str:
+        extension = ".jsonl.gz" if self.compress else ".jsonl"
+        return os.path.join(self.output_dir, f"{self.base_name}-{index:03d}{extension}")
+
+    def _rotate(self):
+        if self._file:
+            self._file.close()
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = self._segment_path(len(self.paths) + 1)
+        self._file = _open_segment(path, "a")
+        self._flushed_at = time.monotonic()
+        self.paths.append(path)
+
+    def append(self, result: Dict[str, Any]):
+        """Write one result (flushed as described on the class)"""
+        line = json.dumps(result, default=str) + "\n"
+        with self._lock:
+            if self._file is None or (self.max_bytes and os.path.getsize(self.paths[-1]) >= self.max_bytes):
+                self._rotate()
+            self._file.write(line)
+            now = time.monotonic()
+            if not self.compress or now - self._flushed_at >= self.flush_interval:
+                self._file.flush()
+                self._flushed_at = now
+            self.count += 1
+
+    def close(self):
+        """Close the current segment; a later append starts a new one"""
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def export_json(self, filename: str) -> str:
+        """Stream every logged result into a single JSON array file"""
+        self.close()
+        os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write("[")
+            for i, result in enumerate(iter_results(self.paths)):
+                f.write(",\n" if i else "\n")
+                f.write(json.dumps(result, indent=2, default=str))
+            f.write("\n]\n")
+        return filename
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_results(paths: Union[str, Iterable[str]]) -> Iterator[Dict[str, Any]]:
+    """Yield results one at a time from results files.
+
+    Accepts paths or glob patterns for JSONL segments (plain or gzip) and
+    for JSON result files written by earlier versions of the demo. Segments
+    of a rotated log are read in order; a truncated last line, or the cut-off
+    end of a gzip segment, is skipped.
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+
+    for pattern in paths:
+        for path in sorted(glob.glob(pattern), key=result_file_order) or [pattern]:
+            if path.endswith(".json"):
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                yield from (data if isinstance(data, list) else [data])
+                continue
+
+            try:
+                with _open_segment(path, "r") as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        try:
+                            yield json.loads(line)
+                        except json.JSONDecodeError:
+                            if line.endswith("\n"):
+                                raise
+                            print(f"Warning: Skipping truncated result line in {path}")
+            except (EOFError, gzip.BadGzipFile):
+                # A writer killed mid-flush leaves a gzip stream without its end
+                print(f"Warning: Skipping the unreadable rest of {path}")
+
+
+def result_file_order(path: str) -> Tuple[str, int]:
+    """Sort key putting a log's segments in numeric order (``-1000`` after ``-999``)"""
+    match = RESULT_FILE_NAME.match(path)
+    if not match:
+        return path, 0
+    return match.group("base"), int(match.group("index") or 0)
+
+
+def find_result_logs(output_dir: str = RESULTS_DIR, prefix: str = RESULTS_PREFIX) -> List[str]:
+    """All result files in a directory, oldest first"""
+    patterns = [f"{prefix}_*.jsonl", f"{prefix}_*.jsonl.gz", f"{prefix}_*.json"]
+    return sorted((path for pattern in patterns for path in glob.glob(os.path.join(output_dir, pattern))),
+                  key=result_file_order)
@@ -0,0 +1,88 @@
+"""
+Lightning Lesson 2: Prompt Template Cache
+Caches prompt template files, invalidated by mtime
+"""
+
+import os
+import threading
+from typing import Dict, Iterable, NamedTuple, Optional
+
+
+class PromptTemplate(NamedTuple):
+    """A prompt template file's text and the file version it was read from"""
+    path: str
+    mtime_ns: int
+    size: int
+    content: str
+
+
+class TemplateCache:
+    """Thread-safe cache of prompt template files keyed by path"""
+
+    def __init__(self):
+        self._templates: Dict[str, PromptTemplate] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, template_path: str) -> PromptTemplate:
+        """Get a template, re-reading the file only if its mtime or size changed.
+
+        Raises FileNotFoundError (or another OSError) if the file cannot be read.
+        """
+        stat = os.stat(template_path)
+        with self._lock:
+            template = self._templates.get(template_path)
+            if template and (template.mtime_ns, template.size) == (stat.st_mtime_ns, stat.st_size):
+                self._hits += 1
+                return template
+            self._misses += 1
+
+        with open(template_path, 'r', encoding='utf-8') as f:
+            content = f.read().strip()
+        template = PromptTemplate(template_path, stat.st_mtime_ns, stat.st_size, content)
+
+        with self._lock:
+            self._templates[template_path] = template
+        return template
+
+    def preload(self, template_paths: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Warm the cache for several templates; returns path -> error (None if loaded)"""
+        results = {}
+        for template_path in dict.fromkeys(template_paths):
+            try:
+                self.get(template_path)
+                results[template_path] = None
+            except Exception as e:
+                results[template_path] = str(e)
+        return results
+
+    def preload_agent_templates(self, agents_config: Dict[str, Dict]) -> Dict[str, Optional[str]]:
+        """Warm every ``.txt`` system template referenced by an agents.yaml mapping"""
+        template_paths = []
+        for agent_config in agents_config.values():
+            system_template = (agent_config or {}).get("system_template")
+            if isinstance(system_template, str) and system_template.endswith('.txt'):
+                template_paths.append(system_template)
+        return self.preload(template_paths)
+
+    def invalidate(self, template_path: Optional[str] = None):
+        """Drop one cached template, or all of them"""
+        with self._lock:
+            if template_path is None:
+                self._templates.clear()
+            else:
+                self._templates.pop(template_path, None)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Template cache statistics"""
+        with self._lock:
+            return {
+                "cached_templates": len(self._templates),
+                "hits": self._hits,
+                "misses": self._misses
+            }
+
+
+# Shared by all agent factories in the process
+default_template_cache = TemplateCache()
@@ -0,0 +1,38 @@
+"""
+Tests for agent reuse in YAMLAgentFactory
+"""
+
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("crewai")
+pytest.importorskip("langchain_openai")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.agents import LightningLesson2Agents
+
+CONFIG_DIR = os.path.join(os.path.dirname(__file__), '..', 'config')
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    return LightningLesson2Agents(CONFIG_DIR)
+
+
+def test_agents_are_not_shared_between_callers(manager):
+    first = manager.create_all_personas()
+    second = manager.create_all_personas()
+
+    assert all(first[persona] is not second[persona] for persona in first)
+
+
+def test_crew_reuses_agents_only_within_itself(manager):
+    crew = manager.create_comparison_crew()
+    other = manager.create_comparison_crew()
+
+    assert all(task.agent in crew.agents for task in crew.tasks)
+    assert not {id(agent) for agent in crew.agents} & {id(agent) for agent in other.agents}
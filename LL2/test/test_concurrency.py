@@ -0,0 +1,99 @@
+"""
+Tests for running personas concurrently and rate limiting evaluation kickoffs
+"""
+
+import os
+import sys
+import time
+import threading
+
+import pytest
+
+pytest.importorskip("crewai")
+pytest.importorskip("langchain_openai")
+pytest.importorskip("dotenv")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.demo_runner import LightningLesson2Demo
+from src.evaluation import RateLimiter, distribution
+
+
+def runner(max_concurrency):
+    demo = LightningLesson2Demo.__new__(LightningLesson2Demo)
+    demo.max_concurrency = max_concurrency
+    return demo
+
+
+@pytest.mark.parametrize("max_concurrency", [1, 3])
+def test_run_jobs_yields_in_the_given_order(max_concurrency):
+    finished = []
+
+    def job(name, seconds):
+        def run():
+            time.sleep(seconds)
+            finished.append(name)
+            return name.upper()
+        return run
+
+    jobs = {"slow": job("slow", 0.15), "medium": job("medium", 0.1), "fast": job("fast", 0.05)}
+    start = time.perf_counter()
+    results = list(runner(max_concurrency)._run_jobs(jobs))
+    wall = time.perf_counter() - start
+
+    assert [(name, result) for name, result, _ in results] == [("slow", "SLOW"), ("medium", "MEDIUM"), ("fast", "FAST")]
+    assert all(seconds >= 0.04 for _, _, seconds in results)
+    if max_concurrency > 1:
+        assert finished == ["fast", "medium", "slow"]
+        assert wall < 0.25
+    else:
+        assert finished == ["slow", "medium", "fast"]
+
+
+def test_run_jobs_caps_concurrent_jobs():
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def job():
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.pop()
+
+    list(runner(2)._run_jobs({str(i): job for i in range(6)}))
+
+    assert max(peak) == 2
+
+
+def test_rate_limiter_allows_a_burst_then_spaces_kickoffs():
+    limiter = RateLimiter(rate_per_minute=600, burst=2)  # one kickoff per 0.1 s
+    start = time.perf_counter()
+    limiter.acquire()
+    limiter.acquire()
+    burst = time.perf_counter() - start
+    limiter.acquire()
+    limiter.acquire()
+    total = time.perf_counter() - start
+
+    assert burst < 0.05
+    assert 0.18 <= total < 0.5
+
+
+def test_rate_limiter_zero_rate_never_blocks():
+    limiter = RateLimiter(rate_per_minute=0)
+    start = time.perf_counter()
+    for _ in range(100):
+        limiter.acquire()
+
+    assert time.perf_counter() - start < 0.05
+
+
+def test_distribution_statistics():
+    stats = distribution([1.0, 2.0, 3.0, 4.0])
+
+    assert stats["n"] == 4 and stats["mean"] == 2.5 and stats["min"] == 1.0 and stats["max"] == 4.0
+    assert stats["p50"] == 2.5 and stats["std"] == pytest.approx(1.2910, abs=1e-4)
+    assert distribution([]) == {"n": 0}
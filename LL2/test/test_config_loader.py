@@ -0,0 +1,144 @@
+"""
+Tests for ConfigLoader's sharded config directories
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src import config_loader
+from src.config_loader import ConfigLoader
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding='utf-8')
+
+
+@pytest.mark.parametrize("max_workers", [1, None])
+def test_every_malformed_shard_is_reported(tmp_path, max_workers):
+    write(tmp_path / "agents" / "good.yaml", "good_agent:\n  role: Writer\n")
+    write(tmp_path / "agents" / "broken.yaml", "a: 1\nb: [\n")
+    write(tmp_path / "agents" / "listed.yaml", "- not_a_mapping\n")
+
+    with pytest.raises(ValueError) as error:
+        ConfigLoader(str(tmp_path), use_cache=False, max_workers=max_workers)
+
+    message = str(error.value)
+    assert f"{tmp_path / 'agents' / 'broken.yaml'}: " in message
+    assert message.count("broken.yaml") >= 2  # the YAML error names the file too
+    assert f"{tmp_path / 'agents' / 'listed.yaml'}: expected a mapping of agents, got list" in message
+
+
+def test_valid_shards_load(tmp_path):
+    write(tmp_path / "agents" / "good.yaml", "good_agent:\n  role: Writer\n")
+
+    loader = ConfigLoader(str(tmp_path), use_cache=False)
+
+    assert loader.get_agent_config("good_agent") == {"role": "Writer"}
+
+
+def test_reload_without_changes_does_not_remerge(tmp_path):
+    write(tmp_path / "agents" / "a.yaml", "a_agent:\n  role: Writer\n")
+    loader = ConfigLoader(str(tmp_path), use_cache=False)
+    agents = loader.agents_config
+
+    assert not loader.reload_configs()
+    assert loader.agents_config is agents
+
+
+def test_reload_replaces_only_changed_shards(tmp_path):
+    write(tmp_path / "agents" / "a.yaml", "a_agent:\n  role: Writer\n")
+    write(tmp_path / "agents" / "b.yaml", "b_agent:\n  role: Editor\n")
+    write(tmp_path / "agents" / "c.yaml", "c_agent:\n  role: Critic\n")
+    loader = ConfigLoader(str(tmp_path), use_cache=False)
+    kept = loader.agents_config["a_agent"]
+
+    write(tmp_path / "agents" / "b.yaml", "b_agent:\n  role: Senior Editor\n")
+    (tmp_path / "agents" / "c.yaml").unlink()
+    changes = loader.reload_configs()
+
+    assert changes.agents == {"b_agent", "c_agent"}
+    assert list(loader.agents_config) == ["a_agent", "b_agent"]
+    assert loader.agents_config["a_agent"] is kept
+    assert loader.get_agent_config("b_agent") == {"role": "Senior Editor"}
+
+
+def test_reload_rejects_duplicate_from_changed_shard(tmp_path):
+    write(tmp_path / "agents" / "a.yaml", "a_agent:\n  role: Writer\n")
+    write(tmp_path / "agents" / "b.yaml", "b_agent:\n  role: Editor\n")
+    loader = ConfigLoader(str(tmp_path), use_cache=False)
+
+    write(tmp_path / "agents" / "b.yaml", "a_agent:\n  role: Editor\n")
+    with pytest.raises(ValueError, match="Duplicate agents entry 'a_agent'"):
+        loader.reload_configs()
+    assert loader.get_agent_config("a_agent") == {"role": "Writer"}
+
+
+def test_getters_hand_out_copies(tmp_path):
+    write(tmp_path / "agents" / "a.yaml", "a_agent:\n  role: Writer\n  tools: [search]\n")
+    loader = ConfigLoader(str(tmp_path), use_cache=False)
+
+    loader.get_agent_config("a_agent")["tools"].append("browse")
+    loader.get_all_agents()["a_agent"]["role"] = "Editor"
+
+    assert loader.get_agent_config("a_agent") == {"role": "Writer", "tools": ["search"]}
+    assert ConfigLoader(str(tmp_path), use_cache=False).get_agent_config("a_agent")["tools"] == ["search"]
+
+
+def test_unchanged_files_load_from_the_compiled_cache(tmp_path, monkeypatch):
+    write(tmp_path / "agents" / "a.yaml", "a_agent:\n  role: Writer\n")
+    ConfigLoader(str(tmp_path))
+    config_loader._compiled_configs.clear()  # a fresh process only has the on-disk cache
+
+    def no_parsing(*args, **kwargs):
+        raise AssertionError("YAML was parsed")
+
+    monkeypatch.setattr(config_loader.yaml, "load", no_parsing)
+
+    assert ConfigLoader(str(tmp_path)).get_agent_config("a_agent") == {"role": "Writer"}
+
+
+def test_reverse_indexes_follow_references(tmp_path):
+    write(tmp_path / "agents.yaml",
+          "marketing_writer:\n  role: Writer\nlegal_reviewer:\n  role: Reviewer\n"
+          "senior_marketing_lead:\n  role: Lead\n")
+    write(tmp_path / "tasks.yaml",
+          "draft_task:\n  agent: marketing_writer\nreview_task:\n  agent: legal_reviewer\n")
+    write(tmp_path / "crews.yaml",
+          "launch_crew:\n  agents: [marketing_writer, legal_reviewer]\n  tasks: [draft_task, review_task]\n"
+          "draft_crew:\n  agents: [marketing_writer]\n  tasks: [draft_task]\n")
+    loader = ConfigLoader(str(tmp_path), use_cache=False)
+
+    assert loader.get_tasks_by_agent("marketing_writer") == ["draft_task"]
+    assert loader.get_crews_by_agent("marketing_writer") == ["launch_crew", "draft_crew"]
+    assert loader.get_crews_by_task("review_task") == ["launch_crew"]
+    for agent_type in ("marketing", "market", "legal", "_lead", "writer", "x"):
+        expected = [name for name in loader.agents_config if agent_type in name.lower()]
+        assert loader.get_agents_by_type(agent_type) == expected
+
+    loader.save_config("tasks", "polish_task", {"agent": "senior_marketing_lead"})
+    assert loader.get_tasks_by_agent("senior_marketing_lead") == ["polish_task"]
+
+
+def test_prompt_file_change_reaches_dependent_entries(tmp_path):
+    prompt_file = tmp_path / "prompts.json"
+    write(prompt_file, '{"slices": {}}')
+    write(tmp_path / "agents.yaml", f"writer_agent:\n  role: Writer\n  prompt_file: {prompt_file}\n")
+    write(tmp_path / "tasks.yaml", "draft_task:\n  agent: writer_agent\n")
+    write(tmp_path / "crews.yaml", "draft_crew:\n  agents: [writer_agent]\n  tasks: [draft_task]\n")
+    loader = ConfigLoader(str(tmp_path), use_cache=False)
+    notified = []
+    loader.subscribe(notified.append)
+
+    stat = prompt_file.stat()
+    os.utime(prompt_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    loader.reload_configs()
+
+    assert len(notified) == 1
+    change = notified[0]
+    assert change.prompt_files == {str(prompt_file)}
+    assert (change.agents, change.tasks, change.crews) == ({"writer_agent"}, {"draft_task"}, {"draft_crew"})
@@ -0,0 +1,59 @@
+"""
+Tests for crew prompt_file slice validation
+"""
+
+import os
+import sys
+import json
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.prompt_slices import load_prompt_slices, validate_prompt_slices
+
+ROOT = os.path.join(os.path.dirname(__file__), '..', '..')
+
+
+def write_slices(tmp_path, slices):
+    path = tmp_path / "prompts.json"
+    path.write_text(json.dumps({"slices": slices}), encoding='utf-8')
+    return str(path)
+
+
+def test_literal_braces_in_replaced_slices_are_accepted(tmp_path):
+    prompt_file = write_slices(tmp_path, {
+        "role_playing": 'You are {role}. Reply as JSON like {"answer": "..."}. {goal}{backstory}',
+        "task": "Current task: {input} {customer_name}"
+    })
+
+    warnings = validate_prompt_slices(prompt_file)
+
+    assert any("{customer_name} as literal text" in warning for warning in warnings)
+
+
+def test_formatted_slices_must_be_fillable(tmp_path):
+    prompt_file = write_slices(tmp_path, {
+        "memory": "Memories: {memory} {",
+        "task_with_context": "{task} {context} {audience}"
+    })
+
+    with pytest.raises(ValueError) as error:
+        load_prompt_slices(prompt_file)
+
+    message = str(error.value)
+    assert "Slice 'memory'" in message and "literal braces must be doubled" in message
+    assert "undefined placeholder {audience}" in message
+
+
+def test_missing_content_placeholder_warns(tmp_path):
+    prompt_file = write_slices(tmp_path, {"memory": "Use what you remember."})
+
+    assert validate_prompt_slices(prompt_file) == [
+        f"Slice 'memory' in {prompt_file} omits {{memory}}, so CrewAI drops that content from prompts"
+    ]
+
+
+@pytest.mark.parametrize("prompt_file", ["LL2/prompts/custom_prompts.json", "LL3/prompts/custom_prompts.json"])
+def test_shipped_prompt_files_are_valid(prompt_file):
+    assert not load_prompt_slices(os.path.join(ROOT, prompt_file), strict=False).errors
@@ -0,0 +1,90 @@
+"""
+Tests for the TF-IDF, similarity and text feature math of the response analytics
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.response_analytics import ResponseAnalytics, extract_responses, load_analytics, persona_summary, text_features
+
+
+def test_tfidf_matches_smoothed_idf_by_hand():
+    analytics = ResponseAnalytics(keywords={"p": ["brand"]})
+    matrix, vocabulary = analytics.tfidf(["brand brand launch", "launch"])
+
+    assert vocabulary == ["brand", "launch"]
+    idf_brand = np.log(3 / 2) + 1
+    idf_launch = np.log(3 / 3) + 1
+    row = np.array([np.log1p(2) * idf_brand, np.log1p(1) * idf_launch])
+    np.testing.assert_allclose(matrix[0], row / np.linalg.norm(row), rtol=1e-6)
+    np.testing.assert_allclose(matrix[1], [0.0, 1.0], rtol=1e-6)
+
+
+def test_tfidf_rows_are_unit_length_and_empty_text_stays_zero():
+    matrix, _ = ResponseAnalytics().tfidf(["Our brand campaign", "Latency and security", ""])
+
+    np.testing.assert_allclose(np.linalg.norm(matrix[:2], axis=1), 1.0, rtol=1e-6)
+    assert not matrix[2].any()
+
+
+def test_vocabulary_keeps_keywords_within_max_features():
+    analytics = ResponseAnalytics(max_features=3, keywords={"p": ["gdpr"]})
+    _, vocabulary = analytics.tfidf(["alpha beta gamma", "alpha beta", "alpha"])
+
+    assert vocabulary == ["gdpr", "alpha", "beta"]
+
+
+def test_keyword_coverage_fraction_and_empty_keyword_list():
+    analytics = ResponseAnalytics(keywords={"legal": ["risk", "gdpr"], "none": []})
+    matrix, vocabulary = analytics.tfidf(["The gdpr risk", "Only risk here", "Nothing relevant"])
+
+    coverage = analytics.keyword_coverage(matrix, vocabulary)
+
+    np.testing.assert_allclose(coverage, [[1.0, 0.0], [0.5, 0.0], [0.0, 0.0]])
+
+
+def test_text_features_and_reading_ease():
+    features = text_features(["The cat sat. The dog ran!", ""])
+
+    assert (features[0]["chars"], features[0]["words"], features[0]["sentences"]) == (25, 6, 2)
+    assert features[0]["avg_word_length"] == pytest.approx(3.0)
+    assert features[0]["avg_sentence_words"] == pytest.approx(3.0)
+    assert features[0]["flesch_reading_ease"] == pytest.approx(206.835 - 1.015 * 3 - 84.6, rel=1e-5)
+    assert (features[1]["words"], features[1]["sentences"], features[1]["flesch_reading_ease"]) == (0, 0, 0.0)
+
+
+def test_extract_responses_skips_failed_kickoffs():
+    results = [{
+        "task": "t",
+        "persona_responses": {"marketing": "A brand story", "legal": "Error executing task: timeout"},
+        "default_response": "Error executing task: rate limit",
+        "persona_response": "Persona answer"
+    }]
+
+    assert extract_responses(results) == [
+        {"persona": "marketing", "task": "t", "response": "A brand story"},
+        {"persona": "persona", "task": "t", "response": "Persona answer"}
+    ]
+
+
+def test_analyze_writes_cosine_similarity_and_summary(tmp_path):
+    records = [
+        {"persona": "marketing", "task": "t", "response": "brand campaign audience"},
+        {"persona": "marketing", "task": "t", "response": "brand campaign engagement"},
+        {"persona": "legal", "task": "t", "response": "gdpr compliance risk"}
+    ]
+    analytics = ResponseAnalytics().analyze(records, str(tmp_path), block_size=2)
+
+    matrix = np.asarray(analytics["tfidf"])
+    np.testing.assert_allclose(analytics["similarity"], matrix @ matrix.T, atol=1e-3)
+    np.testing.assert_allclose(np.diag(analytics["similarity"]), 1.0, atol=1e-3)
+
+    summary = persona_summary(load_analytics(str(tmp_path)))
+    assert summary["marketing"]["similarity_within"] > summary["marketing"]["similarity_across"]
+    assert summary["legal"]["similarity_within"] == 1.0
+    assert summary["legal"]["coverage_legal"] == pytest.approx(3 / 7)
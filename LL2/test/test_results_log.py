@@ -0,0 +1,57 @@
+"""
+Tests for reading back the streaming results log
+"""
+
+import os
+import sys
+import gzip
+import json
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.results_log import ResultsLog, find_result_logs, iter_results
+
+
+def test_truncated_gzip_segment_is_skipped(tmp_path):
+    complete = tmp_path / "results_0001.jsonl.gz"
+    with gzip.open(complete, 'wt', encoding='utf-8') as f:
+        f.write(json.dumps({"turn": 1}) + "\n")
+    data = gzip.compress("".join(json.dumps({"turn": i}) + "\n" for i in range(2, 200)).encode())
+    (tmp_path / "results_0002.jsonl.gz").write_bytes(data[:len(data) // 2])
+    later = tmp_path / "results_0003.jsonl"
+    later.write_text(json.dumps({"turn": 200}) + "\n", encoding='utf-8')
+
+    results = list(iter_results(str(tmp_path / "results_*")))
+
+    assert results[0] == {"turn": 1}
+    assert results[-1] == {"turn": 200}
+
+
+def test_segments_are_read_in_numeric_order(tmp_path):
+    for index in (999, 1000, 2):
+        (tmp_path / f"log_run-{index:03d}.jsonl").write_text(json.dumps({"segment": index}) + "\n", encoding='utf-8')
+
+    assert [r["segment"] for r in iter_results(str(tmp_path / "log_run-*.jsonl"))] == [2, 999, 1000]
+    assert [os.path.basename(p) for p in find_result_logs(str(tmp_path), "log")] == [
+        "log_run-002.jsonl", "log_run-999.jsonl", "log_run-1000.jsonl"]
+
+
+def test_gzip_segment_is_complete_after_close(tmp_path):
+    log = ResultsLog(output_dir=str(tmp_path), prefix="demo", compress=True, flush_interval=3600)
+    for turn in range(100):
+        log.append({"turn": turn})
+    log.close()
+
+    assert log.paths[0].endswith(".jsonl.gz")
+    assert [r["turn"] for r in iter_results(log.paths)] == list(range(100))
+
+
+def test_export_json_contains_every_result(tmp_path):
+    log = ResultsLog(output_dir=str(tmp_path), prefix="demo", max_bytes=64)
+    for turn in range(20):
+        log.append({"turn": turn})
+    filename = log.export_json(str(tmp_path / f"{log.base_name}.json"))
+
+    assert len(log.paths) > 1
+    with open(filename, encoding='utf-8') as f:
+        assert [r["turn"] for r in json.load(f)] == list(range(20))
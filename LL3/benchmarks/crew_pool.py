@@ -0,0 +1,101 @@
+"""
+Lightning Lesson 3: Crew Pool Throughput Benchmark
+Concurrent chat throughput through CrewPool at several pool sizes, using crews that simulate LLM latency
+
+Usage:
+    python benchmarks/crew_pool.py
+    python benchmarks/crew_pool.py --requests 64 --clients 16 --latency 0.2 --sizes 1,2,4,8,16
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.crew_pool import CrewPool
+
+
+class SimulatedCrew:
+    """Stands in for a learning crew: kickoff waits like an LLM call and echoes its task"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.tasks = [SimpleNamespace(description="")]
+
+    def kickoff(self):
+        time.sleep(self.latency * random.uniform(0.8, 1.2))
+        return SimpleNamespace(raw=self.tasks[0].description)
+
+
+def run_chats(handle, requests: int, clients: int) -> dict:
+    """Send ``requests`` chats from ``clients`` threads; count replies meant for another chat"""
+    def chat(i):
+        return handle(f"customer message #{i}", f"session-{i % clients}") != f"customer message #{i}"
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        mixed_up = sum(executor.map(chat, range(requests)))
+    elapsed = time.perf_counter() - start
+    return {"seconds": round(elapsed, 3), "chats_per_second": round(requests / elapsed, 2), "mixed_up": mixed_up}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent chats through the learning crew pool")
+    parser.add_argument("--requests", type=int, default=32, help="Chats per measurement")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent browser sessions")
+    parser.add_argument("--latency", type=float, default=0.25, help="Simulated seconds per kickoff")
+    parser.add_argument("--sizes", default="1,2,4,8", help="Pool sizes to measure")
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = {"requests": args.requests, "clients": args.clients, "latency": args.latency, "runs": {}}
+
+    print(f"⏱️  CREW POOL BENCHMARK ({args.requests} chats from {args.clients} clients, "
+          f"{args.latency:.2f}s simulated kickoff)")
+    print("-" * 72)
+    print(f"{'Setup':<28} {'Seconds':>8} {'Chats/s':>9} {'Wrong replies':>14}")
+
+    # Before: one shared crew whose task description every request overwrites
+    shared = SimulatedCrew(args.latency)
+    def shared_handle(message, session_id):
+        shared.tasks[0].description = message
+        return shared.kickoff().raw
+
+    runs = {"shared crew (no lock)": shared_handle}
+
+    shared_lock = threading.Lock()
+    def serialized_handle(message, session_id):
+        with shared_lock:
+            return shared_handle(message, session_id)
+    runs["shared crew (serialized)"] = serialized_handle
+
+    for size in (int(size) for size in args.sizes.split(",")):
+        pool = CrewPool(lambda: SimulatedCrew(args.latency), size=size)
+        def pooled_handle(message, session_id, pool=pool):
+            with pool.checkout(session_id) as crew:
+                crew.tasks[0].description = message
+                return crew.kickoff().raw
+        runs[f"pool of {size}"] = pooled_handle
+
+    for label, handle in runs.items():
+        run = run_chats(handle, args.requests, args.clients)
+        results["runs"][label] = run
+        print(f"{label:<28} {run['seconds']:>8.2f} {run['chats_per_second']:>9.2f} {run['mixed_up']:>14}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results saved to: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,159 @@
+"""
+Lightning Lesson 3: Hybrid Retrieval Benchmark
+Recall and latency of vector-only, BM25-only and fused (hybrid) memory search
+
+Memories are synthetic support resolutions with order numbers and SKUs. The
+embedder hashes words into vectors and, like real embedding models, barely
+tells identifiers apart, so it sees "ORD-104233" and "ORD-104234" as the
+same text. Identifier queries ask about one order and count a hit when its
+memory is in the top results. Topic queries count the share of results
+about the asked-for topic.
+
+Usage:
+    python benchmarks/hybrid_retrieval.py
+    python benchmarks/hybrid_retrieval.py --sizes 10000,100000 --queries 200 --limit 5
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.lexical_index import is_identifier, tokenize
+from src.vector_store import VectorCollection, normalize_rows
+
+
+TOPICS = {
+    "delivery": "late delivery package courier delayed shipment arrive warehouse dispatch",
+    "billing": "charged twice invoice payment card refund billing statement overcharge",
+    "tracking": "tracking number status update carrier scan location parcel",
+    "returns": "return label exchange damaged item replacement box restock",
+    "account": "password login reset email locked account verification profile",
+    "subscription": "plan renewal cancel upgrade subscription monthly annual tier"
+}
+
+
+class HashedWordEmbedder:
+    """Bag-of-words embeddings from a fixed random vector per word, ignoring identifiers"""
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self._words = {}
+
+    def _word(self, word: str) -> np.ndarray:
+        vector = self._words.get(word)
+        if vector is None:
+            vector = self._words[word] = np.random.default_rng(zlib.crc32(word.encode())).normal(size=self.dim)
+        return vector
+
+    def __call__(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for token in tokenize(text):
+                if not is_identifier(token):
+                    vectors[i] += self._word(token)
+        return normalize_rows(vectors)
+
+
+def make_memories(rng, count: int):
+    topics = list(TOPICS)
+    labels = rng.integers(len(topics), size=count)
+    memories = []
+    for i, label in enumerate(labels):
+        words = rng.choice(TOPICS[topics[label]].split(), size=5)
+        memories.append(f"Customer with order ORD-{100000 + i} (SKU {topics[label][:3].upper()}-{i % 997:03d}) "
+                        f"reported {' '.join(words)}. Resolved by confirming the {topics[label]} details.")
+    return memories, labels
+
+
+def timed(search, queries):
+    times, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(search(query))
+        times.append((time.perf_counter() - start) * 1000)
+    return results, {"p50_ms": float(np.percentile(times, 50)), "p95_ms": float(np.percentile(times, 95))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hybrid BM25 + vector memory retrieval")
+    parser.add_argument("--sizes", default="10000,100000", help="Memories per collection")
+    parser.add_argument("--dim", type=int, default=256, help="Embedding dimensions")
+    parser.add_argument("--queries", type=int, default=100, help="Queries of each kind")
+    parser.add_argument("--limit", type=int, default=5, help="Results per query (CrewAI's default)")
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    embedder = HashedWordEmbedder(args.dim)
+    topics = list(TOPICS)
+    results = {"dim": args.dim, "queries": args.queries, "limit": args.limit, "sizes": {}}
+
+    print(f"⏱️  HYBRID RETRIEVAL BENCHMARK ({args.queries} identifier + {args.queries} topic queries, "
+          f"top {args.limit}; embedding time excluded)")
+    print("-" * 84)
+    print(f"{'Size':>9} {'Search':<10} {'Id recall':>10} {'Topic prec.':>12} {'Id p50 ms':>10} {'Topic p50 ms':>13}")
+
+    for size in (int(size) for size in args.sizes.split(",")):
+        memories, labels = make_memories(rng, size)
+        workdir = tempfile.mkdtemp(prefix="ll3-hybrid-bench-")
+        try:
+            collection = VectorCollection(workdir)
+            for start in range(0, size, 10_000):
+                batch = memories[start:start + 10_000]
+                collection.add([str(start + i) for i in range(len(batch))], batch, [None] * len(batch),
+                               embedder(batch))
+            start = time.perf_counter()
+            collection.sync_lexical()
+            index_seconds = time.perf_counter() - start
+
+            targets = rng.integers(size, size=args.queries)
+            id_queries = []
+            for target in targets:
+                text = f"Any update on my order ORD-{100000 + target}? The package is late."
+                id_queries.append((text, embedder([text])[0]))
+            asked = rng.integers(len(topics), size=args.queries)
+            topic_queries = []
+            for label in asked:
+                text = f"Question about {topics[label]}: {' '.join(rng.choice(TOPICS[topics[label]].split(), 3))}"
+                topic_queries.append((text, embedder([text])[0]))
+
+            searches = {
+                "vector": lambda q: [row for row, _ in collection.search(q[1], args.limit)[0]],
+                "bm25": lambda q: collection.lexical.search(tokenize(q[0]), args.limit)[0].tolist(),
+                "hybrid": lambda q: [row for row, _ in collection.hybrid_search(q[0], q[1], args.limit)]
+            }
+            runs = {}
+            for label, search in searches.items():
+                id_results, id_timing = timed(search, id_queries)
+                topic_results, topic_timing = timed(search, topic_queries)
+                id_recall = float(np.mean([target in found for target, found in zip(targets, id_results)]))
+                precision = float(np.mean([np.mean(labels[found] == topic) if found else 0.0
+                                           for topic, found in zip(asked, topic_results)]))
+                runs[label] = {"identifier_recall": id_recall, "topic_precision": precision,
+                               "identifier_latency": id_timing, "topic_latency": topic_timing}
+                print(f"{size:>9,} {label:<10} {id_recall:>10.3f} {precision:>12.3f} "
+                      f"{id_timing['p50_ms']:>10.2f} {topic_timing['p50_ms']:>13.2f}")
+            results["sizes"][size] = {"bm25_index_seconds": index_seconds, "runs": runs}
+            print(f"{'':>9} BM25 index built in {index_seconds:.2f}s ({collection.lexical.term_count:,} terms)")
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results saved to: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
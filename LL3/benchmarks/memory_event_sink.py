@@ -0,0 +1,107 @@
+"""
+Lightning Lesson 3: Memory Event Handler Benchmark
+Per-event cost on the agent thread of printing memory events inline vs queueing them to MemoryEventSink
+
+Usage:
+    python benchmarks/memory_event_sink.py
+    python benchmarks/memory_event_sink.py --events 50000 --jsonl artifacts/benchmarks/memory_events.jsonl
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import contextlib
+from types import SimpleNamespace
+from statistics import median
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.memory_event_sink import MemoryEventSink, build_memory_event
+from src.memory_stats import EventRing
+
+
+def sample_events(count: int):
+    """A realistic mix of the six memory event types, as (type, event) pairs"""
+    query = "Customer says their delivery is 3 days late and wants a refund or a discount"
+    value = "Late deliveries: apologize, share the tracking link and offer a 10% discount code"
+    cycle = [
+        ("MEMORY_RETRIEVAL_STARTED", SimpleNamespace(task_id="4f0c2a")),
+        ("MEMORY_QUERY_STARTED", SimpleNamespace(query=query, limit=5, score_threshold=0.35)),
+        ("MEMORY_QUERY_COMPLETED", SimpleNamespace(query=query, results=[{}] * 3, query_time_ms=41.7)),
+        ("MEMORY_RETRIEVAL_COMPLETED", SimpleNamespace(task_id="4f0c2a", memory_content=value * 3,
+                                                       retrieval_time_ms=58.2)),
+        ("MEMORY_SAVE_STARTED", SimpleNamespace(value=value, agent_role="Customer Support Specialist")),
+        ("MEMORY_SAVE_COMPLETED", SimpleNamespace(value=value, agent_role="Customer Support Specialist",
+                                                  save_time_ms=212.9))
+    ]
+    return [cycle[i % len(cycle)] for i in range(count)]
+
+
+def inline_handler(events: list):
+    """The previous handlers: build the dict, format and print on the calling thread"""
+    def handle(event_type, event):
+        event_data = build_memory_event(len(events) + 1, event_type, time.time(), event)
+        events.append(event_data)
+        print(event_data["message"])
+    return handle
+
+
+def run(events, handle) -> float:
+    start = time.perf_counter()
+    for event_type, event in events:
+        handle(event_type, event)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark memory event handling on the agent thread")
+    parser.add_argument("--events", type=int, default=20000, help="Events per measurement")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (median reported)")
+    parser.add_argument("--jsonl", help="Also write events to this JSONL file in the sink runs")
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    events = sample_events(args.events)
+    timings = {"inline": [], "sink_emit": [], "sink_drain": []}
+
+    # Console output goes to the null device so terminal speed does not dominate
+    with open(os.devnull, 'w') as devnull:
+        for _ in range(args.repeat):
+            with contextlib.redirect_stdout(devnull):
+                timings["inline"].append(run(events, inline_handler([])))
+
+                ring = EventRing(1000)
+                def on_event(record, seq=iter(range(1, 1 << 62))):
+                    event_data = build_memory_event(next(seq), *record)
+                    ring.append(event_data)
+                    return event_data
+                sink = MemoryEventSink(on_event, console=True, jsonl_path=args.jsonl)
+                timings["sink_emit"].append(run(events, sink.emit))
+                start = time.perf_counter()
+                sink.flush(timeout=None)
+                timings["sink_drain"].append(timings["sink_emit"][-1] + time.perf_counter() - start)
+                sink.close()
+                assert ring.total == args.events
+
+    results = {"events": args.events,
+               **{f"{name}_us_per_event": round(median(values) / args.events * 1e6, 3)
+                  for name, values in timings.items()}}
+
+    print(f"⏱️  MEMORY EVENT HANDLER BENCHMARK ({args.events:,} events, median of {args.repeat})")
+    print("-" * 70)
+    print(f"{'Inline format + print (before)':<44} {results['inline_us_per_event']:>8.2f} µs/event")
+    print(f"{'Sink emit on agent thread (after)':<44} {results['sink_emit_us_per_event']:>8.2f} µs/event")
+    print(f"{'Sink emit + background drain':<44} {results['sink_drain_us_per_event']:>8.2f} µs/event")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results saved to: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,129 @@
+"""
+Lightning Lesson 3: Write-Behind Memory Save Benchmark
+Time chat turns spend saving memories, synchronously versus through the write-behind queue
+
+Each simulated turn saves one short-term memory and ``--entities`` entity
+memories, as CrewAI does after a task, into memory-mapped collections. The
+embedder sleeps like an embedding API call (``--embed-ms`` per call plus
+a little per text). After ``--think-ms`` the next turn searches for the
+previous turn's short-term memory; it counts as visible when it is the top
+result. Search time includes any wait for queued saves.
+
+Usage:
+    python benchmarks/memory_write_behind.py
+    python benchmarks/memory_write_behind.py --turns 50 --entities 8 --think-ms 20
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.vector_store import MmapRAGStorage, normalize_rows
+from src.memory_query_cache import CachedQueryStorage, MemoryQueryCache
+from src.memory_write_behind import EVENTUAL, READ_YOUR_WRITES, WriteBehindQueue, WriteBehindStorage
+
+
+class SimulatedEmbedder:
+    """A fixed random unit vector per text, returned after a simulated API round trip"""
+
+    def __init__(self, dim: int, call_ms: float, text_ms: float = 0.2):
+        self.dim = dim
+        self.call_ms = call_ms
+        self.text_ms = text_ms
+        self.calls = 0
+
+    def __call__(self, texts):
+        self.calls += 1
+        time.sleep((self.call_ms + self.text_ms * len(texts)) / 1000)
+        return normalize_rows(np.stack([np.random.default_rng(zlib.crc32(text.encode())).normal(size=self.dim)
+                                        for text in texts]).astype(np.float32))
+
+
+class Role:
+    role = "Customer Support Specialist"
+
+
+def run_turns(args, mode: str, directory: str):
+    embedder = SimulatedEmbedder(args.dim, args.embed_ms)
+    cache = MemoryQueryCache()
+    queue = WriteBehindQueue(on_write=cache.invalidate, consistency=mode) if mode != "sync" else None
+    storages = []
+    for type in ("short_term", "entities"):
+        storage = MmapRAGStorage(type, embedder, agents=[Role()], path=directory)
+        if queue:
+            storage = WriteBehindStorage(storage, queue)
+        storages.append(CachedQueryStorage(storage, cache))
+    short_term, entities = storages
+
+    save_ms, search_ms, visible = [], [], 0
+    previous = None
+    for turn in range(args.turns):
+        if previous is not None:
+            start = time.perf_counter()
+            found = short_term.search(previous, limit=5, score_threshold=0.6)
+            search_ms.append((time.perf_counter() - start) * 1000)
+            visible += bool(found) and found[0]["content"] == previous
+        start = time.perf_counter()
+        previous = f"Turn {turn}: customer asked about order ORD-{100000 + turn}; offered a refund."
+        short_term.save(previous, {"observation": f"turn {turn}"})
+        for entity in range(args.entities):
+            entities.save(f"Entity {turn}-{entity}(customer): mentioned in turn {turn}", {"turn": turn})
+        save_ms.append((time.perf_counter() - start) * 1000)
+        time.sleep(args.think_ms / 1000)
+    if queue:
+        queue.flush()
+    return {
+        "save_p50_ms": float(np.percentile(save_ms, 50)),
+        "search_p50_ms": float(np.percentile(search_ms, 50)),
+        "search_p95_ms": float(np.percentile(search_ms, 95)),
+        "visible": visible / (args.turns - 1),
+        "embedding_calls": embedder.calls,
+        "avg_batch_size": queue.stats()["avg_batch_size"] if queue else 1.0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark synchronous versus write-behind memory saves")
+    parser.add_argument("--turns", type=int, default=20, help="Chat turns to simulate")
+    parser.add_argument("--entities", type=int, default=4, help="Entity memories saved per turn")
+    parser.add_argument("--embed-ms", type=float, default=120.0, help="Embedding API latency per call")
+    parser.add_argument("--think-ms", type=float, default=100.0, help="Time between a reply and the next message")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimensions")
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    print(f"⏱️  WRITE-BEHIND BENCHMARK ({args.turns} turns, 1 + {args.entities} saves per turn, "
+          f"embed {args.embed_ms:g} ms, {args.think_ms:g} ms between turns)")
+    print("-" * 92)
+    print(f"{'Mode':<18} {'Save p50 ms':>12} {'Search p50 ms':>14} {'p95 ms':>8} {'Visible':>8} "
+          f"{'Embed calls':>12} {'Batch':>6}")
+    results = {"turns": args.turns, "entities": args.entities, "embed_ms": args.embed_ms,
+               "think_ms": args.think_ms, "runs": {}}
+    for mode in ("sync", EVENTUAL, READ_YOUR_WRITES):
+        directory = tempfile.mkdtemp(prefix="ll3-write-behind-bench-")
+        try:
+            run = results["runs"][mode] = run_turns(args, mode, directory)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+        print(f"{mode:<18} {run['save_p50_ms']:>12.1f} {run['search_p50_ms']:>14.1f} {run['search_p95_ms']:>8.1f} "
+              f"{run['visible']:>8.0%} {run['embedding_calls']:>12} {run['avg_batch_size']:>6.1f}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results saved to: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,184 @@
+"""
+Lightning Lesson 3: Vector Store Benchmark
+Insert time, query latency and recall of the memory-mapped vector store (flat and IVF) versus ChromaDB
+
+Synthetic clustered unit vectors stand in for memory embeddings. Recall is
+measured against exact float32 search. Quantized collections are measured
+with and without full-precision re-ranking. ChromaDB is benchmarked when
+it is installed.
+
+Usage:
+    python benchmarks/vector_store.py
+    python benchmarks/vector_store.py --sizes 10000,100000 --dim 1536 --queries 200
+    python benchmarks/vector_store.py --dtypes float32,int8
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.vector_store import VectorCollection, IVFIndex, VECTOR_DTYPES, normalize_rows
+
+
+INSERT_BATCH = 10_000
+
+
+def synthetic_vectors(rng, centers: np.ndarray, count: int, noise: float = 1.0) -> np.ndarray:
+    """Unit vectors scattered around random topic centers"""
+    labels = rng.integers(len(centers), size=count)
+    vectors = centers[labels] + rng.normal(scale=noise / np.sqrt(centers.shape[1]),
+                                           size=(count, centers.shape[1])).astype(np.float32)
+    return normalize_rows(vectors)
+
+
+def latency(search, queries):
+    times = []
+    results = []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(search(query))
+        times.append((time.perf_counter() - start) * 1000)
+    return {"p50_ms": float(np.percentile(times, 50)), "p95_ms": float(np.percentile(times, 95))}, results
+
+
+def recall(results, truth) -> float:
+    hits = sum(len(set(result) & set(expected)) for result, expected in zip(results, truth))
+    return hits / sum(len(expected) for expected in truth)
+
+
+def bench_chroma(path, vectors_batches, queries, limit):
+    import chromadb
+    client = chromadb.PersistentClient(path=path)
+    # CrewAI creates memory collections in cosine space
+    collection = client.create_collection("benchmark", metadata={"hnsw:space": "cosine"})
+    batch_size = client.get_max_batch_size()
+
+    start = time.perf_counter()
+    offset = 0
+    for vectors in vectors_batches():
+        for begin in range(0, len(vectors), batch_size):
+            chunk = vectors[begin:begin + batch_size]
+            collection.add(ids=[str(offset + begin + i) for i in range(len(chunk))],
+                           embeddings=chunk.tolist(),
+                           documents=[f"memory {offset + begin + i}" for i in range(len(chunk))])
+        offset += len(vectors)
+    insert_seconds = time.perf_counter() - start
+
+    timing, results = latency(
+        lambda query: [int(id_) for id_ in collection.query(query_embeddings=[query.tolist()],
+                                                            n_results=limit)["ids"][0]],
+        queries)
+    return insert_seconds, timing, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the memory-mapped vector store against ChromaDB")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Collection sizes to measure")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimensions")
+    parser.add_argument("--queries", type=int, default=100, help="Queries per measurement")
+    parser.add_argument("--limit", type=int, default=5, help="Results per query (CrewAI's default)")
+    parser.add_argument("--nprobe", type=int, help="IVF lists probed per query (default: nlist / 16)")
+    parser.add_argument("--dtypes", default=",".join(VECTOR_DTYPES), help="Vector representations to measure")
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    try:
+        import chromadb  # noqa: F401
+        has_chroma = True
+    except ImportError:
+        has_chroma = False
+
+    rng = np.random.default_rng(42)
+    results = {"dim": args.dim, "queries": args.queries, "limit": args.limit, "sizes": {}}
+
+    print(f"⏱️  VECTOR STORE BENCHMARK ({args.dim} dims, {args.queries} queries, top {args.limit})")
+    if not has_chroma:
+        print("ℹ️  chromadb is not installed; skipping the ChromaDB comparison")
+    # float32 flat search is the ground truth, so it always runs first
+    dtypes = ["float32"] + [dtype for dtype in args.dtypes.split(",") if dtype != "float32"]
+    print("-" * 96)
+    print(f"{'Size':>9} {'Backend':<24} {'Scan MB':>8} {'Insert s':>9} {'Build s':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'Recall':>7}")
+
+    for size in (int(size) for size in args.sizes.split(",")):
+        centers = normalize_rows(rng.normal(size=(max(16, int(np.sqrt(size))), args.dim)))
+        seed = int(rng.integers(1 << 31))
+
+        def vectors_batches():
+            batch_rng = np.random.default_rng(seed)
+            for start in range(0, size, INSERT_BATCH):
+                yield synthetic_vectors(batch_rng, centers, min(INSERT_BATCH, size - start))
+
+        queries = synthetic_vectors(rng, centers, args.queries)
+        runs = {}
+        workdir = tempfile.mkdtemp(prefix="ll3-vector-bench-")
+        exact_results = None
+        try:
+            for dtype in dtypes:
+                collection = VectorCollection(os.path.join(workdir, dtype), dtype=dtype, nprobe=args.nprobe)
+                start = time.perf_counter()
+                offset = 0
+                for vectors in vectors_batches():
+                    collection.add([str(offset + i) for i in range(len(vectors))],
+                                   [f"memory {offset + i}" for i in range(len(vectors))],
+                                   [None] * len(vectors), vectors)
+                    offset += len(vectors)
+                insert_seconds = time.perf_counter() - start
+                scan_mb = size * collection.stats()["scan_bytes_per_vector"] / 1e6
+
+                def measure(label, build_seconds=0.0, exact=False, **extra):
+                    timing, found = latency(
+                        lambda query: [row for row, _ in collection.search(query, args.limit, exact=exact)[0]],
+                        queries)
+                    runs[label] = {"scan_mb": scan_mb, "insert_seconds": insert_seconds,
+                                   "build_seconds": build_seconds, **timing,
+                                   "recall": recall(found, exact_results) if exact_results else 1.0, **extra}
+                    return found
+
+                flat_results = measure(f"{dtype} flat", exact=True)
+                if dtype == "float32":
+                    exact_results = flat_results
+                else:
+                    collection.rerank = False
+                    measure(f"{dtype} flat, no rerank", exact=True)
+                    collection.rerank = True
+
+                start = time.perf_counter()
+                index = collection.build_index()
+                build_seconds = time.perf_counter() - start
+                collection.ivf_threshold = 0
+                measure(f"{dtype} ivf", build_seconds, nlist=index.nlist,
+                        nprobe=args.nprobe or IVFIndex.default_nprobe(index.nlist))
+                collection.reset()
+
+            if has_chroma:
+                chroma_insert, chroma_timing, chroma_results = bench_chroma(
+                    os.path.join(workdir, "chroma"), vectors_batches, queries, args.limit)
+                runs["chromadb hnsw"] = {"scan_mb": 0.0, "insert_seconds": chroma_insert, "build_seconds": 0.0,
+                                         **chroma_timing, "recall": recall(chroma_results, exact_results)}
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        results["sizes"][size] = runs
+        for label, run in runs.items():
+            print(f"{size:>9,} {label:<24} {run['scan_mb']:>8.1f} {run['insert_seconds']:>9.2f} "
+                  f"{run['build_seconds']:>8.2f} {run['p50_ms']:>8.2f} {run['p95_ms']:>8.2f} {run['recall']:>7.3f}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results saved to: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -9,6 +9,7 @@ Usage:
     python run_demo.py --demo 2                  # Learning agents with memory events
     python run_demo.py --demo 3                  # Performance comparison
     python run_demo.py --demo 1 --ports 8000,8001 # Custom ports for comparison
+    python run_demo.py --demo 2 --events-log artifacts/memory_events.jsonl  # Also log memory events
     python run_demo.py --list-demos              # List available demos
     python run_demo.py --validate                # Validate configurations
     python run_demo.py --setup                   # Setup all demo environments
@@ -37,6 +38,10 @@ def main():
                        help='Custom ports for demo 1 (format: 8000,8001)')
     parser.add_argument('--customers', type=int, default=3,
                        help='Number of customer scenarios for demo 2')
+    parser.add_argument('--events-log', type=str,
+                       help='Append memory events to this JSONL file (demo 2)')
+    parser.add_argument('--sync-events', action='store_true',
+                       help='Print memory events inline instead of from a background thread (demo 2)')
     # Deprecated: performance demo removed
     parser.add_argument('--list-demos', action='store_true',
                        help='List available demos')
@@ -50,6 +55,12 @@ def main():
     # Load environment variables
     load_dotenv()
     
+    # Memory event sink settings are read when the demo module is imported
+    if args.events_log:
+        os.environ["LL3_MEMORY_EVENTS_LOG"] = args.events_log
+    if args.sync_events:
+        os.environ["LL3_MEMORY_EVENTS_SYNC"] = "1"
+    
     # Check for required environment variables
     if not os.getenv("OPENAI_API_KEY"):
         print("❌ Error: OPENAI_API_KEY not found in environment variables")
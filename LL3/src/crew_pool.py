@@ -0,0 +1,106 @@
+"""
+Lightning Lesson 3: Learning Crew Pool
+Pre-built crews checked out one request at a time, with customer sessions kept on the same crew
+"""
+
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+
+DEFAULT_POOL_SIZE = 4
+
+# Customer sessions remembered for crew affinity
+MAX_TRACKED_SESSIONS = 1024
+
+
+class CrewPool:
+    """A fixed-size pool of crews built by ``build_crew``.
+
+    A crew's task and agent state belong to one request while it is
+    checked out, so concurrent chats never overwrite each other's task
+    description. Crews are built lazily up to ``size``; a checkout waits
+    when every crew is busy. A session is handed the crew it used last if
+    that crew is free, which keeps its short-term memory context together.
+    Anything passed to ``build_crew`` by the caller (e.g. one LongTermMemory)
+    is shared by every crew.
+    """
+
+    def __init__(self, build_crew: Callable[[], Any], size: int = DEFAULT_POOL_SIZE, prebuild: int = 1):
+        self.build_crew = build_crew
+        self.size = max(1, size)
+        self._crews: List[Any] = []
+        self._free: List[int] = []
+        self._sessions: "OrderedDict[str, int]" = OrderedDict()
+        self._building = 0
+        self._condition = threading.Condition()
+        self.checkouts = 0
+        self.waits = 0
+        for _ in range(min(max(0, prebuild), self.size)):
+            self._free.append(self._add(self.build_crew()))
+
+    def _add(self, crew) -> int:
+        self._crews.append(crew)
+        return len(self._crews) - 1
+
+    def _acquire(self, session_id: Optional[str]) -> int:
+        with self._condition:
+            self.checkouts += 1
+            waited = False
+            while True:
+                preferred = self._sessions.get(session_id) if session_id else None
+                if preferred is not None and preferred in self._free:
+                    self._free.remove(preferred)
+                    return preferred
+                if self._free:
+                    return self._free.pop()
+                if len(self._crews) + self._building < self.size:
+                    self._building += 1
+                    break
+                if not waited:
+                    self.waits += 1
+                    waited = True
+                self._condition.wait()
+
+        # Build outside the lock; building a crew sets up its memory storage
+        try:
+            crew = self.build_crew()
+        except Exception:
+            with self._condition:
+                self._building -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._building -= 1
+            return self._add(crew)
+
+    def _release(self, index: int, session_id: Optional[str]):
+        with self._condition:
+            if session_id:
+                self._sessions[session_id] = index
+                self._sessions.move_to_end(session_id)
+                while len(self._sessions) > MAX_TRACKED_SESSIONS:
+                    self._sessions.popitem(last=False)
+            self._free.append(index)
+            self._condition.notify()
+
+    @contextmanager
+    def checkout(self, session_id: Optional[str] = None):
+        """Use a crew exclusively for the duration of a ``with`` block"""
+        index = self._acquire(session_id)
+        try:
+            yield self._crews[index]
+        finally:
+            self._release(index, session_id)
+
+    def stats(self) -> Dict[str, int]:
+        with self._condition:
+            return {
+                "size": self.size,
+                "built": len(self._crews),
+                "busy": len(self._crews) - len(self._free),
+                "sessions": len(self._sessions),
+                "checkouts": self.checkouts,
+                "waits": self.waits
+            }
@@ -33,7 +33,8 @@ else:
 import yaml
 import time
 import json
-from flask import Flask, render_template, request, jsonify
+import threading
+from flask import Flask, Response, render_template, request, jsonify
 from crewai import Crew, Agent, Task, Process
 from crewai.memory import ShortTermMemory, LongTermMemory, EntityMemory
 from crewai.events import (
@@ -54,138 +55,154 @@ load_dotenv()
 # Add current directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from src.prompt_slices import validate_prompt_slices
+from src.memory_stats import EventRing, StreamingStats, MEMORY_EVENTS_CAPACITY
+from src.memory_event_sink import MemoryEventSink, build_memory_event
+from src.memory_event_stream import MemoryEventBroadcaster, parse_cursor
+from src.crew_pool import CrewPool, DEFAULT_POOL_SIZE
+from src.storage_stats import StorageStats, DEFAULT_REFRESH_INTERVAL
+from src.embedding_cache import (
+    EMBEDDING_CACHE_FILE, crew_embedder_config, get_cached_embedder, get_embedding_cache, openai_embedder
+)
+from src.vector_store import MmapRAGStorage, collection_stats
+from src.memory_query_cache import CachedQueryStorage, MemoryQueryCache, DEFAULT_TTL_SECONDS
+from src.memory_prefetch import MemoryPrefetcher, contextual_memory_query
+from src.memory_write_behind import WriteBehindQueue, WriteBehindStorage, CONSISTENCY_MODES, READ_YOUR_WRITES
+
 class MemoryLearningListener(BaseEventListener):
     """Real CrewAI Memory Event Listener for Learning Demo"""
     
-    def __init__(self):
-        super().__init__()
-        self.events = []
-        self.query_times = []
-        self.save_times = []
-        self.retrieval_times = []
+    def __init__(self, max_events=MEMORY_EVENTS_CAPACITY):
+        # Bounded: a long-running demo keeps constant memory
+        self.events = EventRing(max_events)
+        self.query_times = StreamingStats()
+        self.save_times = StreamingStats()
+        self.retrieval_times = StreamingStats()
         self._event_seq = 0  # monotonically increasing event id
+        # With a synchronous sink, agent threads record events concurrently
+        self._event_lock = threading.Lock()
+        self._timings = {
+            "MEMORY_QUERY_COMPLETED": (self.query_times, "query_time_ms"),
+            "MEMORY_SAVE_COMPLETED": (self.save_times, "save_time_ms"),
+            "MEMORY_RETRIEVAL_COMPLETED": (self.retrieval_times, "retrieval_time_ms")
+        }
+        # Repeated short-term / entity searches within a conversation, shared by the crew pool
+        self.query_cache = MemoryQueryCache(
+            ttl=float(os.getenv("LL3_MEMORY_QUERY_CACHE_TTL", DEFAULT_TTL_SECONDS))
+        )
+        # Live fan-out to /memory-events/stream clients, fed from the sink's thread
+        self.broadcaster = MemoryEventBroadcaster()
+        # Handlers only enqueue; formatting and printing happen on the sink's thread
+        self.sink = MemoryEventSink(
+            self._record_event,
+            console=os.getenv("LL3_MEMORY_EVENTS_CONSOLE", "1") != "0",
+            jsonl_path=os.getenv("LL3_MEMORY_EVENTS_LOG") or None,
+            synchronous=os.getenv("LL3_MEMORY_EVENTS_SYNC", "0") == "1"
+        )
+        super().__init__()
+    
+    def _record_event(self, record):
+        """Build the event dict for a queued record and update the statistics"""
+        event_type, timestamp, event = record
+        with self._event_lock:
+            # Ids, the ring and the stream stay in the same order, so stream cursors skip nothing
+            self._event_seq += 1
+            event_data = build_memory_event(self._event_seq, event_type, timestamp, event)
+            timing = self._timings.get(event_type)
+            if timing:
+                stats, field = timing
+                stats.add(event_data[field])
+            self.events.append(event_data)
+            self.broadcaster.publish(event_data)
+        return event_data
     
     def setup_listeners(self, crewai_event_bus):
         @crewai_event_bus.on(MemoryQueryStartedEvent)
         def on_memory_query_started(source, event: MemoryQueryStartedEvent):
-            self._event_seq += 1
-            event_data = {
-                "id": self._event_seq,
-                "timestamp": time.time(),
-                "type": "MEMORY_QUERY_STARTED",
-                "query": event.query,
-                "limit": event.limit,
-                "score_threshold": event.score_threshold,
-                "message": f"🔍 MEMORY QUERY STARTED: '{event.query[:30]}...'"
-            }
-            self.events.append(event_data)
-            print(f"🔍 MEMORY QUERY STARTED: '{event.query[:30]}...'")
+            self.sink.emit("MEMORY_QUERY_STARTED", event)
         
         @crewai_event_bus.on(MemoryQueryCompletedEvent)
         def on_memory_query_completed(source, event: MemoryQueryCompletedEvent):
-            self.query_times.append(event.query_time_ms)
-            self._event_seq += 1
-            event_data = {
-                "id": self._event_seq,
-                "timestamp": time.time(),
-                "type": "MEMORY_QUERY_COMPLETED",
-                "query": event.query,
-                "results_count": len(event.results) if hasattr(event.results, "__len__") else 0,
-                "query_time_ms": event.query_time_ms,
-                "message": f"🔍 MEMORY QUERY COMPLETED: Found {len(event.results) if hasattr(event.results, '__len__') else 0} similar memories in {event.query_time_ms:.2f}ms"
-            }
-            self.events.append(event_data)
-            print(f"🔍 MEMORY QUERY COMPLETED: Found {len(event.results) if hasattr(event.results, '__len__') else 0} similar memories in {event.query_time_ms:.2f}ms")
+            self.sink.emit("MEMORY_QUERY_COMPLETED", event)
         
         @crewai_event_bus.on(MemorySaveStartedEvent)
         def on_memory_save_started(source, event: MemorySaveStartedEvent):
-            self._event_seq += 1
-            event_data = {
-                "id": self._event_seq,
-                "timestamp": time.time(),
-                "type": "MEMORY_SAVE_STARTED",
-                "value": event.value[:50] + "..." if len(event.value) > 50 else event.value,
-                "agent_role": event.agent_role,
-                "message": f"🧠 MEMORY SAVE STARTED: Agent '{event.agent_role}' learning '{event.value[:30]}...'"
-            }
-            self.events.append(event_data)
-            print(f"🧠 MEMORY SAVE STARTED: Agent '{event.agent_role}' learning '{event.value[:30]}...'")
+            self.sink.emit("MEMORY_SAVE_STARTED", event)
         
         @crewai_event_bus.on(MemorySaveCompletedEvent)
         def on_memory_save_completed(source, event: MemorySaveCompletedEvent):
-            self.save_times.append(event.save_time_ms)
-            self._event_seq += 1
-            event_data = {
-                "id": self._event_seq,
-                "timestamp": time.time(),
-                "type": "MEMORY_SAVE_COMPLETED",
-                "value": event.value[:50] + "..." if len(event.value) > 50 else event.value,
-                "agent_role": event.agent_role,
-                "save_time_ms": event.save_time_ms,
-                "message": f"🧠 MEMORY SAVE COMPLETED: Agent '{event.agent_role}' learned '{event.value[:30]}...' in {event.save_time_ms:.2f}ms"
-            }
-            self.events.append(event_data)
-            print(f"🧠 MEMORY SAVE COMPLETED: Agent '{event.agent_role}' learned '{event.value[:30]}...' in {event.save_time_ms:.2f}ms")
+            # Hybrid memory storage indexes the saved text now, on the agent thread
+            sync_lexical_index = getattr(getattr(source, "storage", None), "sync_lexical_index", None)
+            if sync_lexical_index:
+                sync_lexical_index()
+            self.sink.emit("MEMORY_SAVE_COMPLETED", event)
         
         @crewai_event_bus.on(MemoryRetrievalStartedEvent)
         def on_memory_retrieval_started(source, event: MemoryRetrievalStartedEvent):
-            self._event_seq += 1
-            event_data = {
-                "id": self._event_seq,
-                "timestamp": time.time(),
-                "type": "MEMORY_RETRIEVAL_STARTED",
-                "task_id": event.task_id,
-                "message": f"📖 MEMORY RETRIEVAL STARTED: Task {event.task_id}"
-            }
-            self.events.append(event_data)
-            print(f"📖 MEMORY RETRIEVAL STARTED: Task {event.task_id}")
+            self.sink.emit("MEMORY_RETRIEVAL_STARTED", event)
         
         @crewai_event_bus.on(MemoryRetrievalCompletedEvent)
         def on_memory_retrieval_completed(source, event: MemoryRetrievalCompletedEvent):
-            self.retrieval_times.append(event.retrieval_time_ms)
-            self._event_seq += 1
-            event_data = {
-                "id": self._event_seq,
-                "timestamp": time.time(),
-                "type": "MEMORY_RETRIEVAL_COMPLETED",
-                "task_id": event.task_id,
-                "memory_content": event.memory_content[:50] + "..." if len(event.memory_content) > 50 else event.memory_content,
-                "retrieval_time_ms": event.retrieval_time_ms,
-                "message": f"📖 MEMORY RETRIEVAL COMPLETED: Applied learned pattern in {event.retrieval_time_ms:.2f}ms"
-            }
-            self.events.append(event_data)
-            print(f"📖 MEMORY RETRIEVAL COMPLETED: Applied learned pattern in {event.retrieval_time_ms:.2f}ms")
+            self.sink.emit("MEMORY_RETRIEVAL_COMPLETED", event)
     
     def get_recent_events(self, limit=10):
-        """Get recent memory events for UI display"""
-        return self.events[-limit:] if self.events else []
+        """Get recent memory events for UI display (events still queued on the sink appear on a later call)"""
+        return self.events.recent(limit)
+    
+    def get_events_since(self, event_id):
+        """Get retained events newer than an event id (a client's resume cursor)"""
+        return self.events.since(event_id)
+    
+    def stream_events(self, cursor=None, replay_limit=20):
+        """Server-Sent Events: events after ``cursor`` (or the latest few), then live ones"""
+        def replay(cursor):
+            if cursor is None:
+                return self.get_recent_events(replay_limit)
+            return self.get_events_since(cursor)
+        return self.broadcaster.stream(replay, cursor)
     
     def get_performance_stats(self):
-        """Get performance statistics"""
+        """Get performance statistics (averages and p50/p95/p99 in ms, constant time)"""
         return {
-            "avg_query_time": sum(self.query_times) / len(self.query_times) if self.query_times else 0,
-            "avg_save_time": sum(self.save_times) / len(self.save_times) if self.save_times else 0,
-            "avg_retrieval_time": sum(self.retrieval_times) / len(self.retrieval_times) if self.retrieval_times else 0,
-            "total_events": len(self.events)
+            "avg_query_time": self.query_times.mean,
+            "avg_save_time": self.save_times.mean,
+            "avg_retrieval_time": self.retrieval_times.mean,
+            "query_time_ms": self.query_times.summary(),
+            "save_time_ms": self.save_times.summary(),
+            "retrieval_time_ms": self.retrieval_times.summary(),
+            "total_events": self.events.total,
+            "retained_events": len(self.events),
+            "dropped_events": self.sink.dropped,
+            "query_cache": self.query_cache.stats()
         }
     
-    def check_storage_files(self):
-        """Check if memory files are being created in storage directory"""
-        storage_path = os.environ.get('CREWAI_STORAGE_DIR', './storage')
-        if os.path.exists(storage_path):
-            files = os.listdir(storage_path)
-            print(f"📁 Storage directory contents: {files}")
-            return files
-        else:
-            print(f"❌ Storage directory not found: {storage_path}")
-            return []
+    def reset(self):
+        """Forget all events and timings"""
+        self.sink.flush()
+        self.events.clear()
+        self.query_times.reset()
+        self.save_times.reset()
+        self.retrieval_times.reset()
+        self.query_cache.clear()
 
 class LearningAgentDemo:
+    # Marks the customer's message in a chat task description; memory is searched with that message alone
+    CUSTOMER_MESSAGE_LABEL = "Current customer message:"
+    CUSTOMER_MESSAGE_END = "\n\nInstructions:"
+    
     def __init__(self, port=8002, company_name="TechCorp"):
         self.port = port
         self.company_name = company_name
-        self.learning_crew = None
+        self.crew_pool = None
+        self.memory_prefetcher = None
+        self.memory_write_queue = None
         self.memory_listener = MemoryLearningListener()
+        self._state_lock = threading.Lock()  # guards the counters shared by concurrent chats
+        # Storage file counts/sizes, rescanned in the background instead of on every chat
+        self.storage_stats = StorageStats(
+            os.environ.get('CREWAI_STORAGE_DIR', './storage'),
+            interval=float(os.getenv("LL3_STORAGE_STATS_INTERVAL", DEFAULT_REFRESH_INTERVAL))
+        )
         self.customer_scenarios = [
             "My delivery is 3 days late, this is unacceptable!",
             "My package hasn't arrived yet, I'm frustrated",
@@ -212,17 +229,74 @@ class LearningAgentDemo:
             self.tasks_config = yaml.safe_load(f)
     
     def setup_learning_crew(self):
-        """Setup learning agent with basic CrewAI memory capabilities"""
+        """Setup a pool of learning crews that share one Long-Term Memory"""
         
         # Initialize LLM using CrewAI's LLM wrapper 
-        llm = LLM(model="gpt-4o-mini")
+        self.llm = LLM(model="gpt-4o-mini")
+        
+        # Check custom prompt slices up front so a bad placeholder fails here, not mid-chat
+        for warning in validate_prompt_slices("prompts/custom_prompts.json"):
+            print(f"⚠️  {warning}")
+        
+        # Every pooled crew learns into and recalls from the same Long-Term Memory
+        self.long_term_memory = LongTermMemory()
+        
+        # Short-term and entity memory embeddings go through one persistent cache,
+        # so repeated customer phrases are embedded once
+        storage_path = os.environ.get('CREWAI_STORAGE_DIR', './storage')
+        self.embedder_config = None
+        if os.getenv("LL3_EMBEDDING_CACHE", "1") != "0":
+            self.embedder_config = crew_embedder_config(os.path.join(storage_path, EMBEDDING_CACHE_FILE))
+        
+        # "mmap" keeps short-term and entity memory in in-process vector stores instead of ChromaDB
+        self.memory_backend = os.getenv("LL3_MEMORY_BACKEND", "chroma")
+        if self.memory_backend == "mmap":
+            self.memory_embedder = (
+                get_cached_embedder(self.embedder_config["config"]["cache_path"])
+                if self.embedder_config else openai_embedder()
+            )
+            # float16 / int8 shrink the scanned matrix to a half / a quarter (new collections only)
+            self.memory_vector_options = {
+                "dtype": os.getenv("LL3_VECTOR_DTYPE", "float32"),
+                "rerank": os.getenv("LL3_VECTOR_RERANK", "1") != "0",
+                # BM25 + vector fusion, so order numbers and SKUs are matched exactly
+                "hybrid": os.getenv("LL3_MEMORY_HYBRID", "1") != "0"
+            }
+            print(f"🧮 Memory backend: memory-mapped {self.memory_vector_options['dtype']} vector store "
+                  f"in {storage_path}")
+        elif self.memory_backend != "chroma":
+            print(f"⚠️  Unknown LL3_MEMORY_BACKEND '{self.memory_backend}', using chroma")
+            self.memory_backend = "chroma"
+        
+        # Short-term / entity saves leave the chat path and are embedded and inserted in batches
+        if os.getenv("LL3_MEMORY_WRITE_BEHIND", "1") != "0":
+            consistency = os.getenv("LL3_MEMORY_WRITE_CONSISTENCY", READ_YOUR_WRITES)
+            if consistency not in CONSISTENCY_MODES:
+                print(f"⚠️  Unknown LL3_MEMORY_WRITE_CONSISTENCY '{consistency}', using {READ_YOUR_WRITES}")
+                consistency = READ_YOUR_WRITES
+            query_cache = self.memory_listener.query_cache
+            self.memory_write_queue = WriteBehindQueue(
+                on_write=query_cache.invalidate if query_cache.enabled else None,
+                consistency=consistency
+            )
+            print(f"📝 Write-behind memory saves ({consistency})")
+        
+        pool_size = int(os.getenv("LL3_CREW_POOL_SIZE", DEFAULT_POOL_SIZE))
+        # A chat's memory searches start before its crew is checked out; the query cache hands them over
+        if os.getenv("LL3_MEMORY_PREFETCH", "1") != "0" and self.memory_listener.query_cache.enabled:
+            self.memory_prefetcher = MemoryPrefetcher(max_workers=2 * max(1, pool_size))
+        self.crew_pool = CrewPool(self.build_learning_crew, size=pool_size)
+        print(f"👥 Learning crew pool: up to {self.crew_pool.size} concurrent chats")
+    
+    def build_learning_crew(self):
+        """Build one learning crew with basic CrewAI memory capabilities"""
         
         # Learning Agent (With Basic Memory and Custom Templates)
         learning_agent = Agent(
             role=self.agents_config['agents']['learning_agent']['role'],
             goal=self.agents_config['agents']['learning_agent']['goal'],
             backstory=self.agents_config['agents']['learning_agent']['backstory'],
-            llm=llm,
+            llm=self.llm,
             verbose=False,
             allow_delegation=False,
             max_iter=5,
@@ -243,32 +317,77 @@ class LearningAgentDemo:
             human_input=self.tasks_config['tasks']['learn_resolution_pattern'].get('human_input', False)
         )
         
+        memory_storage = {}
+        if self.memory_backend == "mmap":
+            # Pooled crews open the same collections, so they share what they learn
+            memory_storage = {
+                "short_term_memory": ShortTermMemory(storage=MmapRAGStorage(
+                    "short_term", embedder=self.memory_embedder, agents=[learning_agent],
+                    **self.memory_vector_options)),
+                "entity_memory": EntityMemory(storage=MmapRAGStorage(
+                    "entities", embedder=self.memory_embedder, agents=[learning_agent],
+                    **self.memory_vector_options))
+            }
+        
         # Create learning crew with real memory, event listener, and custom prompts
-        self.learning_crew = Crew(
+        crew = Crew(
             agents=[learning_agent],
             tasks=[learning_task],
             process=Process.sequential,
             memory=True,  # Enable CrewAI memory
+            long_term_memory=self.long_term_memory,  # Shared across the pool
+            embedder=self.embedder_config,  # Cached embeddings (None: CrewAI default)
+            **memory_storage,  # In-process vector stores (empty: CrewAI's ChromaDB storage)
             verbose=True,
             event_listeners=[self.memory_listener],  # Add memory event listener
             prompt_file="prompts/custom_prompts.json"  # Use custom prompts for chat behavior
         )
+        
+        for memory in (getattr(crew, "_short_term_memory", None), getattr(crew, "_entity_memory", None)):
+            if memory is None:
+                continue
+            # Saves return at once; the shared queue writes them in the background
+            if self.memory_write_queue:
+                memory.storage = WriteBehindStorage(memory.storage, self.memory_write_queue)
+            # Serve repeated memory searches from the listener's cache until their collection changes
+            if self.memory_listener.query_cache.enabled:
+                memory.storage = CachedQueryStorage(memory.storage, self.memory_listener.query_cache,
+                                                    search_query=self.memory_search_query)
+                if self.memory_prefetcher:
+                    self.memory_prefetcher.add_storage(memory.storage)
+        return crew
     
-    def process_customer_message(self, message):
+    @classmethod
+    def memory_search_query(cls, query):
+        """The customer message of a chat task's memory query, without the instructions and learning counters.
+
+        The counters change every turn, so searching (and caching) on the whole
+        description would never repeat; other queries are searched as they are.
+        """
+        _, label, rest = query.partition(cls.CUSTOMER_MESSAGE_LABEL)
+        if not label:
+            return query
+        return " ".join(rest.partition(cls.CUSTOMER_MESSAGE_END)[0].split()) or query
+    
+    def process_customer_message(self, message, session_id=None):
         """Process customer message through learning agent with Long-Term Memory focus"""
-        try:
+        with self._state_lock:
             # Track learning progress based on message type
             self.track_learning_progress(message)
             self.conversation_count += 1
+            conversation_count = self.conversation_count
+            learning_progress = dict(self.learning_progress)
             
             # Get learning context for Long-Term Memory demonstration
             learning_context = self.get_learning_context()
+        
+        try:
 
             task_description = f"""Handle customer support inquiry using Long-Term Memory to improve responses.
 
 LEARNING PROGRESS: {learning_context}
 
-Current customer message: {message}
+{self.CUSTOMER_MESSAGE_LABEL} {message}
 
 Instructions:
 1. Provide a helpful and professional response to the customer's inquiry
@@ -279,13 +398,20 @@ Instructions:
 
 Focus on showing how Long-Term Memory helps you provide better customer service over time."""
             
-            self.learning_crew.tasks[0].description = task_description
+            # Embed and search short-term / entity memory while waiting for a crew; its
+            # ContextualMemory makes the same searches and gets these results from the query cache
+            if self.memory_prefetcher:
+                self.memory_prefetcher.prefetch(contextual_memory_query(task_description))
             
-            # Execute crew with real memory events automatically tracked
-            result = self.learning_crew.kickoff()
+            # The checked-out crew's task belongs to this chat until it is returned
+            with self.crew_pool.checkout(session_id) as crew:
+                crew.tasks[0].description = task_description
+                
+                # Execute crew with real memory events automatically tracked
+                result = crew.kickoff()
             
-            # Check if memory files were created
-            self.memory_listener.check_storage_files()
+            # Memory files may have changed; rescan soon (no file system access here)
+            self.storage_stats.request_refresh()
             
             # Handle different result formats
             if hasattr(result, 'raw'):
@@ -300,8 +426,8 @@ Focus on showing how Long-Term Memory helps you provide better customer service
                 "memory_used": True,
                 "learning_events": self.memory_listener.get_recent_events(5),
                 "performance_stats": self.memory_listener.get_performance_stats(),
-                "conversation_count": self.conversation_count,
-                "learning_progress": self.learning_progress,
+                "conversation_count": conversation_count,
+                "learning_progress": learning_progress,
                 "timestamp": time.time()
             }
         except Exception as e:
@@ -310,8 +436,8 @@ Focus on showing how Long-Term Memory helps you provide better customer service
                 "memory_used": True,
                 "learning_events": self.memory_listener.get_recent_events(5),
                 "performance_stats": self.memory_listener.get_performance_stats(),
-                "conversation_count": self.conversation_count,
-                "learning_progress": self.learning_progress,
+                "conversation_count": conversation_count,
+                "learning_progress": learning_progress,
                 "timestamp": time.time(),
                 "error": True
             }
@@ -328,6 +454,24 @@ Focus on showing how Long-Term Memory helps you provide better customer service
         
         self.learning_progress["total_conversations"] += 1
     
+    def get_embedding_cache_stats(self):
+        """Hit rate and embedding time saved by the embedding cache"""
+        if not self.embedder_config:
+            return {"enabled": False}
+        return {"enabled": True, **get_embedding_cache(self.embedder_config["config"]["cache_path"]).stats()}
+    
+    def get_memory_prefetch_stats(self):
+        """Memory searches started ahead of the crew (the crew's hits show in query_cache)"""
+        if not self.memory_prefetcher:
+            return {"enabled": False}
+        return {"enabled": True, **self.memory_prefetcher.stats()}
+    
+    def get_memory_write_stats(self):
+        """Queued, written and batched short-term / entity memory saves"""
+        if not self.memory_write_queue:
+            return {"enabled": False}
+        return {"enabled": True, **self.memory_write_queue.stats()}
+    
     def get_learning_context(self):
         """Get learning progress context for Long-Term Memory demonstration"""
         return f"""Learning Progress Summary:
@@ -362,18 +506,18 @@ Use your Long-Term Memory to retrieve insights from previous similar conversatio
     def reset_scenarios(self):
         """Reset scenarios for new demo run"""
         self.current_scenario = 0
-        self.conversation_count = 0
-        self.learning_progress = {
-            "delivery_issues": 0,
-            "billing_issues": 0,
-            "tracking_issues": 0,
-            "total_conversations": 0
-        }
+        with self._state_lock:
+            self.conversation_count = 0
+            self.learning_progress = {
+                "delivery_issues": 0,
+                "billing_issues": 0,
+                "tracking_issues": 0,
+                "total_conversations": 0
+            }
         # Reset memory listener events
-        self.memory_listener.events = []
-        self.memory_listener.query_times = []
-        self.memory_listener.save_times = []
-        self.memory_listener.retrieval_times = []
+        self.memory_listener.reset()
+        if self.memory_prefetcher:
+            self.memory_prefetcher.reset()
 
 # Create Flask app for Learning Agent Demo
 app = Flask(__name__, template_folder='../templates')
@@ -387,7 +531,7 @@ def index():
 def chat():
     data = request.json
     message = data.get('message', '')
-    response = demo.process_customer_message(message)
+    response = demo.process_customer_message(message, session_id=data.get('session_id'))
     return jsonify(response)
 
 @app.route('/next-scenario', methods=['POST'])
@@ -412,22 +556,43 @@ def reset_demo():
 
 @app.route('/memory-events')
 def memory_events():
+    since = parse_cursor(request.args.get('since'))
+    if since is not None:
+        return jsonify(demo.memory_listener.get_events_since(since))
     return jsonify(demo.memory_listener.get_recent_events(20))
 
+@app.route('/memory-events/stream')
+def memory_events_stream():
+    """Push memory events as they happen; reconnecting browsers resume from Last-Event-ID"""
+    cursor = parse_cursor(request.headers.get('Last-Event-ID'))
+    if cursor is None:
+        cursor = parse_cursor(request.args.get('since'))
+    return Response(
+        demo.memory_listener.stream_events(cursor),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/performance-stats')
 def performance_stats():
-    return jsonify(demo.memory_listener.get_performance_stats())
+    return jsonify({
+        **demo.memory_listener.get_performance_stats(),
+        "crew_pool": demo.crew_pool.stats(),
+        "embedding_cache": demo.get_embedding_cache_stats(),
+        "memory_prefetch": demo.get_memory_prefetch_stats(),
+        "memory_writes": demo.get_memory_write_stats()
+    })
 
 @app.route('/storage-info')
 def storage_info():
     """Display storage location information for demo transparency"""
-    from crewai.utilities.paths import db_storage_path
-    storage_path = db_storage_path()
+    stats = demo.storage_stats.snapshot()
     return jsonify({
-        "storage_path": str(storage_path),
+        "storage_path": stats["storage_path"],
         "custom_storage_dir": os.environ.get('CREWAI_STORAGE_DIR'),
-        "storage_exists": os.path.exists(storage_path),
-        "storage_contents": list(os.listdir(storage_path)) if os.path.exists(storage_path) else []
+        "storage_exists": stats["exists"],
+        "storage_contents": list(stats["entries"]),
+        "storage_stats": stats
     })
 
 @app.route('/memory-inspect', methods=['GET'])
@@ -439,12 +604,14 @@ def memory_inspect():
         "long_term_memory": {},
         "task_outputs": {},
         "chromadb_collections": [],
+        "vector_collections": collection_stats(),
+        "storage": demo.storage_stats.snapshot(),
         "errors": []
     }
     
     # Inspect Long-term Memory SQLite database
     ltm_db_path = os.path.join(storage_path, "long_term_memory_storage.db")
-    if os.path.exists(ltm_db_path):
+    if demo.storage_stats.has_file("long_term_memory_storage.db"):
         try:
             import sqlite3
             conn = sqlite3.connect(ltm_db_path)
@@ -464,7 +631,7 @@ def memory_inspect():
     
     # Inspect Task Outputs SQLite database
     task_db_path = os.path.join(storage_path, "latest_kickoff_task_outputs.db")
-    if os.path.exists(task_db_path):
+    if demo.storage_stats.has_file("latest_kickoff_task_outputs.db"):
         try:
             import sqlite3
             conn = sqlite3.connect(task_db_path)
@@ -613,7 +780,8 @@ def run_demo():
     print("\nPress Ctrl+C to stop the demo")
     
     try:
-        app.run(host='0.0.0.0', port=demo.port, debug=False)
+        # One thread per request; concurrent chats are bounded by the crew pool
+        app.run(host='0.0.0.0', port=demo.port, debug=False, threaded=True)
     except KeyboardInterrupt:
         print("\n\n🛑 Demo stopped by user")
         print("✅ Thank you for trying Lightning Lesson 3 - Demo 2!")
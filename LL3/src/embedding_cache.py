@@ -0,0 +1,256 @@
+"""
+Lightning Lesson 3: Persistent Embedding Cache
+Serves repeated memory texts from an SQLite-backed LRU cache instead of re-embedding them
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from crewai.rag.embeddings.providers.custom.embedding_callable import CustomEmbeddingFunction
+except ImportError:  # the cache itself works without CrewAI (e.g. in benchmarks)
+    CustomEmbeddingFunction = object
+
+
+# CrewAI's default memory embedder (crewai/rag/chromadb/config.py)
+DEFAULT_EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_CACHE_FILE = "embedding_cache.db"
+
+# Vectors kept on disk / in memory before least recently used ones are evicted
+MAX_DISK_ENTRIES = 100_000
+MAX_MEMORY_ENTRIES = 4096
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so re-wrapped copies of a phrase share one embedding"""
+    return " ".join(str(text).split())
+
+
+def cache_key(model_name: str, normalized_text: str) -> str:
+    return hashlib.sha256(f"{model_name}\n{normalized_text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Embeddings keyed by model and normalized text, in SQLite with an in-memory LRU in front.
+
+    A hit refreshes the entry's ``last_used`` time, and inserts beyond
+    ``max_entries`` evict the least recently used rows, so the file stays
+    bounded. Memory hits do not touch the database themselves: their times
+    are written in one batch with the next lookup that reaches SQLite, the
+    next insert (before it evicts anything) or ``close``. Hit, miss and embedding
+    latency counters make the savings visible.
+    """
+
+    def __init__(self, path: str, max_entries: int = MAX_DISK_ENTRIES, memory_entries: int = MAX_MEMORY_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, model TEXT NOT NULL, dim INTEGER NOT NULL, "
+            "vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self._db.commit()
+        self._disk_entries = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        # Memory hits whose last_used update has not been written yet
+        self._touched: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.embedded_texts = 0
+        self.embed_seconds = 0.0
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _write_touches(self, touched: Dict[str, float]):
+        """Refresh last_used for the given keys (call with the lock held; commit is left to the caller)"""
+        if touched:
+            self._db.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?",
+                                 [(used, key) for key, used in touched.items()])
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Cached vectors for the keys that have one"""
+        found: Dict[str, np.ndarray] = {}
+        now = time.time()
+        with self._lock:
+            pending = []
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is None:
+                    pending.append(key)
+                else:
+                    self._memory.move_to_end(key)
+                    self._touched[key] = now
+                    found[key] = vector
+            self.memory_hits += len(found)
+
+            if pending:
+                rows = []
+                for start in range(0, len(pending), 500):  # SQLite variable limit
+                    chunk = pending[start:start + 500]
+                    rows.extend(self._db.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                    ).fetchall())
+                self._touched.update((key, now) for key, _ in rows)
+                self._write_touches(self._touched)
+                self._touched.clear()
+                self._db.commit()
+                for key, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32)
+                    self._remember(key, vector)
+                    found[key] = vector
+                self.disk_hits += len(rows)
+                self.misses += len(pending) - len(rows)
+        return found
+
+    def put_many(self, model_name: str, items: Sequence[Tuple[str, np.ndarray]], embed_seconds: float = 0.0):
+        """Store freshly embedded vectors and account for the time it took to embed them"""
+        if not items:
+            return
+        now = time.time()
+        rows = []
+        with self._lock:
+            for key, vector in items:
+                vector = np.ascontiguousarray(vector, dtype=np.float32)
+                self._remember(key, vector)
+                rows.append((key, model_name, int(vector.size), vector.tobytes(), now))
+            self._write_touches(self._touched)
+            self._touched.clear()
+            before = self._db.total_changes
+            self._db.executemany("INSERT OR IGNORE INTO embeddings VALUES (?, ?, ?, ?, ?)", rows)
+            self._disk_entries += self._db.total_changes - before
+            excess = self._disk_entries - self.max_entries
+            if excess > 0:
+                self._db.execute("DELETE FROM embeddings WHERE key IN "
+                                 "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)", (excess,))
+                self._disk_entries -= excess
+            self._db.commit()
+            self.embedded_texts += len(items)
+            self.embed_seconds += embed_seconds
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            avg_embed_ms = self.embed_seconds / self.embedded_texts * 1000 if self.embedded_texts else 0.0
+            return {
+                "memory_entries": len(self._memory),
+                "disk_entries": self._disk_entries,
+                "hits": hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "avg_embed_ms": avg_embed_ms,
+                # Each hit skipped one embedding of average cost
+                "saved_embed_ms": hits * avg_embed_ms
+            }
+
+    def close(self):
+        with self._lock:
+            self._write_touches(self._touched)
+            self._touched.clear()
+            self._db.commit()
+            self._db.close()
+
+
+class CachedEmbedder:
+    """Wraps a batch embedding function; only texts missing from the cache reach it"""
+
+    def __init__(self, embed: Callable[[List[str]], Sequence], model_name: str, cache: EmbeddingCache):
+        self.embed = embed
+        self.model_name = model_name
+        self.cache = cache
+
+    def __call__(self, texts: Sequence[str]) -> List[np.ndarray]:
+        normalized = [normalize_text(text) for text in texts]
+        keys = [cache_key(self.model_name, text) for text in normalized]
+        found = self.cache.get_many(dict.fromkeys(keys))
+
+        missing = {key: text for key, text in zip(keys, normalized) if key not in found}
+        if missing:
+            start = time.perf_counter()
+            vectors = self.embed(list(missing.values()))
+            elapsed = time.perf_counter() - start
+            items = [(key, np.asarray(vector, dtype=np.float32)) for key, vector in zip(missing, vectors)]
+            self.cache.put_many(self.model_name, items, elapsed)
+            found.update(items)
+        return [found[key] for key in keys]
+
+
+_caches: Dict[str, EmbeddingCache] = {}
+_embedders: Dict[Tuple[str, str], CachedEmbedder] = {}
+_registry_lock = threading.Lock()
+
+
+def get_embedding_cache(path: str) -> EmbeddingCache:
+    """The process-wide cache for a database file"""
+    path = os.path.abspath(path)
+    with _registry_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = _caches[path] = EmbeddingCache(path)
+        return cache
+
+
+def openai_embedder(model_name: str = DEFAULT_EMBEDDING_MODEL) -> Callable[[List[str]], Sequence]:
+    """The uncached OpenAI embedding function CrewAI uses by default"""
+    from chromadb.utils.embedding_functions.openai_embedding_function import OpenAIEmbeddingFunction
+    return OpenAIEmbeddingFunction(api_key=os.getenv("OPENAI_API_KEY"), model_name=model_name)
+
+
+def get_cached_embedder(cache_path: str, model_name: str = DEFAULT_EMBEDDING_MODEL) -> CachedEmbedder:
+    """One cached OpenAI embedder per cache file and model, shared by every memory storage"""
+    key = (os.path.abspath(cache_path), model_name)
+    with _registry_lock:
+        embedder = _embedders.get(key)
+    if embedder is None:
+        embedder = CachedEmbedder(openai_embedder(model_name), model_name, get_embedding_cache(cache_path))
+        with _registry_lock:
+            embedder = _embedders.setdefault(key, embedder)
+    return embedder
+
+
+class CachedEmbeddingFunction(CustomEmbeddingFunction):
+    """CrewAI embedding function backed by the shared cache (see ``crew_embedder_config``)"""
+
+    def __init__(self, cache_path: str, model_name: str = DEFAULT_EMBEDDING_MODEL, **kwargs):
+        self._embedder = get_cached_embedder(cache_path, model_name)
+
+    def __call__(self, input):
+        return self._embedder(list(input))
+
+
+def crew_embedder_config(cache_path: str, model_name: str = DEFAULT_EMBEDDING_MODEL) -> Dict:
+    """A Crew ``embedder`` spec that sends short-term and entity memory embeddings through the cache.
+
+    CrewAI builds one embedding function per memory storage from this spec;
+    they all resolve to the same cache by path.
+    """
+    return {
+        "provider": "custom",
+        "config": {
+            "embedding_callable": CachedEmbeddingFunction,
+            "cache_path": os.path.abspath(cache_path),
+            "model_name": model_name
+        }
+    }
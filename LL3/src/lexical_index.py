@@ -0,0 +1,140 @@
+"""
+Lightning Lesson 3: Lexical Memory Index
+BM25 over saved memory text, so exact tokens like order numbers and SKUs are found
+"""
+
+import re
+import math
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# Words joined by -, _, ., / or # stay one token ("ord-48213"); their parts are indexed too
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-_./#][a-z0-9]+)*")
+TOKEN_SEPARATORS = re.compile(r"[-_./#]")
+
+# Too common to help ranking, and their postings would cover most rows
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have i in is it its me my of on or our so that the "
+    "their them they this to was we were will with you your".split()
+)
+
+# BM25 term frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Reciprocal-rank fusion constant (Cormack et al.): larger values flatten the top ranks
+RRF_K = 60
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for token in TOKEN_PATTERN.findall(str(text).lower()):
+        if token in STOPWORDS:
+            continue
+        tokens.append(token)
+        if not token.isalnum():
+            tokens.extend(part for part in TOKEN_SEPARATORS.split(token) if part and part not in STOPWORDS)
+    return tokens
+
+
+def is_identifier(token: str) -> bool:
+    """Order numbers, SKUs and the like: tokens of three or more characters with a digit and a letter.
+
+    Plain numbers ("100" in "Total Conversations: 100") are counters and
+    amounts far more often than ids; an id's digits still match its own
+    rows through BM25.
+    """
+    return len(token) >= 3 and any(char.isdigit() for char in token) and any(char.isalpha() for char in token)
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[int]], k: int = RRF_K) -> List[int]:
+    """Rows ordered by the sum of 1 / (k + rank) over the rankings they appear in"""
+    scores: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, row in enumerate(ranking, 1):
+            scores[row] = scores.get(row, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=scores.__getitem__, reverse=True)
+
+
+class BM25Index:
+    """An append-only inverted index over rows numbered 0, 1, 2, ...
+
+    Postings are compact ``array`` pairs of row numbers and term counts,
+    scored with NumPy. The owner adds rows in order as they are saved;
+    nothing is persisted because the text is already stored with the rows.
+    Not thread-safe: the owning collection serializes access.
+    """
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._lengths = np.zeros(1024, dtype=np.uint32)
+        self._count = 0
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def term_count(self) -> int:
+        return len(self._postings)
+
+    def add_many(self, texts: Iterable[str]):
+        for text in texts:
+            row = self._count
+            counts = Counter(tokenize(text))
+            for term, count in counts.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = (array('I'), array('H'))
+                postings[0].append(row)
+                postings[1].append(min(count, 0xFFFF))
+            if row == len(self._lengths):
+                self._lengths = np.concatenate([self._lengths, np.zeros_like(self._lengths)])
+            length = sum(counts.values())
+            self._lengths[row] = length
+            self._total_length += length
+            self._count += 1
+
+    def _posting_rows(self, term: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        postings = self._postings.get(term)
+        if postings is None:
+            return None
+        # Copies, so the arrays can keep growing
+        return (np.frombuffer(postings[0], dtype=np.uint32).copy(),
+                np.frombuffer(postings[1], dtype=np.uint16).astype(np.float32))
+
+    def search(self, tokens: Sequence[str], limit: int,
+               mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Best ``limit`` (rows, BM25 scores) for query tokens, highest first"""
+        if not self._count:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        scores = np.zeros(self._count, dtype=np.float32)
+        average_length = self._total_length / self._count or 1.0
+        for term in set(tokens):
+            posting = self._posting_rows(term)
+            if posting is None:
+                continue
+            rows, counts = posting
+            idf = math.log(1.0 + (self._count - len(rows) + 0.5) / (len(rows) + 0.5))
+            norm = self.k1 * (1.0 - self.b + self.b * self._lengths[rows] / average_length)
+            scores[rows] += idf * counts * (self.k1 + 1.0) / (counts + norm)
+        if mask is not None:
+            scores[~mask[:self._count]] = 0.0
+        matched = np.flatnonzero(scores)
+        if len(matched) > limit:
+            matched = matched[np.argpartition(-scores[matched], limit - 1)[:limit]]
+        matched = matched[np.argsort(-scores[matched], kind="stable")]
+        return matched, scores[matched]
+
+    def rows_with_any(self, terms: Iterable[str]) -> np.ndarray:
+        """Sorted rows containing at least one of ``terms``"""
+        found = [posting[0] for posting in map(self._posting_rows, set(terms)) if posting is not None]
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(found)).astype(np.int64)
@@ -0,0 +1,205 @@
+"""
+Lightning Lesson 3: Memory Event Sink
+Moves memory event formatting and output off CrewAI's event bus onto a background writer thread
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import threading
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+
+# Records written per console/JSONL write at most
+MAX_BATCH_SIZE = 256
+
+# A record is (event type, timestamp, CrewAI event); formatting happens later
+Record = Tuple[str, float, Any]
+
+
+def _clip(text, length: int) -> str:
+    text = text or ""
+    return text[:length] + "..." if len(text) > length else text
+
+
+def _results_count(event) -> int:
+    return len(event.results) if hasattr(event.results, "__len__") else 0
+
+
+def _query_started(event) -> Dict[str, Any]:
+    return {
+        "query": event.query,
+        "limit": event.limit,
+        "score_threshold": event.score_threshold,
+        "message": f"🔍 MEMORY QUERY STARTED: '{(event.query or '')[:30]}...'"
+    }
+
+
+def _query_completed(event) -> Dict[str, Any]:
+    results_count = _results_count(event)
+    return {
+        "query": event.query,
+        "results_count": results_count,
+        "query_time_ms": event.query_time_ms,
+        "message": f"🔍 MEMORY QUERY COMPLETED: Found {results_count} similar memories in {event.query_time_ms:.2f}ms"
+    }
+
+
+def _save_started(event) -> Dict[str, Any]:
+    return {
+        "value": _clip(event.value, 50),
+        "agent_role": event.agent_role,
+        "message": f"🧠 MEMORY SAVE STARTED: Agent '{event.agent_role}' learning '{(event.value or '')[:30]}...'"
+    }
+
+
+def _save_completed(event) -> Dict[str, Any]:
+    return {
+        "value": _clip(event.value, 50),
+        "agent_role": event.agent_role,
+        "save_time_ms": event.save_time_ms,
+        "message": f"🧠 MEMORY SAVE COMPLETED: Agent '{event.agent_role}' learned '{(event.value or '')[:30]}...' "
+                   f"in {event.save_time_ms:.2f}ms"
+    }
+
+
+def _retrieval_started(event) -> Dict[str, Any]:
+    return {
+        "task_id": event.task_id,
+        "message": f"📖 MEMORY RETRIEVAL STARTED: Task {event.task_id}"
+    }
+
+
+def _retrieval_completed(event) -> Dict[str, Any]:
+    return {
+        "task_id": event.task_id,
+        "memory_content": _clip(event.memory_content, 50),
+        "retrieval_time_ms": event.retrieval_time_ms,
+        "message": f"📖 MEMORY RETRIEVAL COMPLETED: Applied learned pattern in {event.retrieval_time_ms:.2f}ms"
+    }
+
+
+EVENT_FORMATTERS: Dict[str, Callable[[Any], Dict[str, Any]]] = {
+    "MEMORY_QUERY_STARTED": _query_started,
+    "MEMORY_QUERY_COMPLETED": _query_completed,
+    "MEMORY_SAVE_STARTED": _save_started,
+    "MEMORY_SAVE_COMPLETED": _save_completed,
+    "MEMORY_RETRIEVAL_STARTED": _retrieval_started,
+    "MEMORY_RETRIEVAL_COMPLETED": _retrieval_completed
+}
+
+
+def build_memory_event(event_id: int, event_type: str, timestamp: float, event) -> Dict[str, Any]:
+    """The UI/log dict for one memory event"""
+    return {"id": event_id, "timestamp": timestamp, "type": event_type, **EVENT_FORMATTERS[event_type](event)}
+
+
+class MemoryEventSink:
+    """Queue-backed writer for memory event records.
+
+    ``emit`` only appends a tuple to a ``queue.SimpleQueue`` (no Python-level
+    lock), so CrewAI's event bus callbacks return immediately. A daemon
+    thread drains the queue in batches, turns each record into an event dict
+    via ``on_event`` (which also receives the dict for bookkeeping), and
+    writes a batch to the console and/or a JSONL file in one call. With
+    ``synchronous`` every record is handled inline, in order with other
+    output, which helps when debugging.
+    """
+
+    def __init__(self, on_event: Callable[[Record], Dict[str, Any]], console: bool = True,
+                 jsonl_path: Optional[str] = None, synchronous: bool = False,
+                 max_batch_size: int = MAX_BATCH_SIZE):
+        self.on_event = on_event
+        self.console = console
+        self.jsonl_path = jsonl_path
+        self.synchronous = synchronous
+        self.max_batch_size = max(1, max_batch_size)
+        self.dropped = 0  # records whose formatting or output failed
+
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._jsonl_file = None
+        self._write_lock = threading.Lock()
+        self._thread = None
+        if jsonl_path:
+            os.makedirs(os.path.dirname(jsonl_path) or ".", exist_ok=True)
+            self._jsonl_file = open(jsonl_path, 'a', encoding='utf-8')
+        if not synchronous:
+            self._thread = threading.Thread(target=self._run, name="memory-event-sink", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def emit(self, event_type: str, event) -> None:
+        """Hot path: record an event for later formatting"""
+        if self.synchronous:
+            self._write_batch([(event_type, time.time(), event)])
+        else:
+            self._queue.put((event_type, time.time(), event))
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """Wait until every record emitted so far has been handled"""
+        if self._thread is None or not self._thread.is_alive():
+            return True
+        marker = threading.Event()
+        self._queue.put(marker)
+        return marker.wait(timeout)
+
+    def close(self):
+        """Drain the queue, stop the writer thread and close the JSONL file"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=5.0)
+        with self._write_lock:
+            if self._jsonl_file is not None:
+                self._jsonl_file.close()
+                self._jsonl_file = None
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch: List[Record] = []
+            markers = []
+            stop = False
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    markers.append(item)
+                else:
+                    batch.append(item)
+                if len(batch) >= self.max_batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                self._write_batch(batch)
+            for marker in markers:
+                marker.set()
+            if stop:
+                return
+
+    def _write_batch(self, batch: List[Record]):
+        events = []
+        for record in batch:
+            try:
+                events.append(self.on_event(record))
+            except Exception as e:
+                self.dropped += 1
+                print(f"⚠️ Could not format memory event {record[0]}: {e}")
+
+        with self._write_lock:
+            try:
+                if self.console and events:
+                    sys.stdout.write("".join(event["message"] + "\n" for event in events))
+                    sys.stdout.flush()
+                if self._jsonl_file is not None and events:
+                    self._jsonl_file.write("".join(json.dumps(event, ensure_ascii=False, default=str) + "\n"
+                                                   for event in events))
+                    self._jsonl_file.flush()
+            except Exception as e:
+                self.dropped += len(events)
+                print(f"⚠️ Could not write memory events: {e}")
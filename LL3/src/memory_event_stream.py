@@ -0,0 +1,110 @@
+"""
+Lightning Lesson 3: Memory Event Stream
+Fans memory events out to Server-Sent Events clients with resumable event-id cursors
+"""
+
+import json
+import queue
+import threading
+from typing import Dict, Any, Iterator, List, Optional
+
+
+# Events buffered per client before it is dropped (it reconnects and resumes from its cursor)
+CLIENT_QUEUE_SIZE = 500
+
+# Seconds between keep-alive comments on an idle stream
+KEEPALIVE_SECONDS = 15.0
+
+# Milliseconds browsers wait before reconnecting
+RECONNECT_MS = 2000
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """One Server-Sent Events message; the id becomes the browser's Last-Event-ID"""
+    return f"id: {event['id']}\ndata: {json.dumps(event, ensure_ascii=False, default=str)}\n\n"
+
+
+def parse_cursor(value) -> Optional[int]:
+    """An event id cursor from a query parameter or header, or None"""
+    try:
+        return int(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+class _Subscription:
+    __slots__ = ("queue", "dropped")
+
+    def __init__(self, size: int):
+        self.queue: "queue.Queue" = queue.Queue(maxsize=size)
+        self.dropped = False
+
+
+class MemoryEventBroadcaster:
+    """Publishes events to every connected stream without ever blocking.
+
+    ``publish`` is called from the memory event sink's thread. Each client
+    has a bounded queue filled with ``put_nowait``; a client that falls
+    too far behind is dropped instead of slowing everyone else down, and
+    its browser reconnects with ``Last-Event-ID`` to replay what it missed
+    from the listener's event buffer.
+    """
+
+    def __init__(self, client_queue_size: int = CLIENT_QUEUE_SIZE):
+        self.client_queue_size = client_queue_size
+        self._subscriptions: List[_Subscription] = []
+        self._lock = threading.Lock()
+
+    @property
+    def client_count(self) -> int:
+        return len(self._subscriptions)
+
+    def subscribe(self) -> _Subscription:
+        subscription = _Subscription(self.client_queue_size)
+        with self._lock:
+            self._subscriptions = self._subscriptions + [subscription]
+        return subscription
+
+    def unsubscribe(self, subscription: _Subscription):
+        with self._lock:
+            self._subscriptions = [s for s in self._subscriptions if s is not subscription]
+
+    def publish(self, event: Dict[str, Any]):
+        # Copy-on-write list: no lock needed to iterate
+        for subscription in self._subscriptions:
+            if subscription.dropped:
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+            except queue.Full:
+                # Its queue is full, so the stream wakes up and sees the flag
+                subscription.dropped = True
+
+    def stream(self, replay, cursor: Optional[int], keepalive: float = KEEPALIVE_SECONDS) -> Iterator[str]:
+        """SSE messages for one client: buffered events after ``cursor``, then live ones.
+
+        ``replay(cursor)`` returns the buffered events with a larger id. The
+        client subscribes before replaying, so an event published in between
+        is delivered once (duplicates are skipped by id).
+        """
+        subscription = self.subscribe()
+        try:
+            yield f"retry: {RECONNECT_MS}\n\n"
+            last_id = cursor or 0
+            for event in replay(cursor):
+                last_id = event["id"]
+                yield format_sse(event)
+            while True:
+                try:
+                    event = subscription.queue.get(timeout=keepalive)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                if subscription.dropped:
+                    return
+                if event["id"] <= last_id:
+                    continue
+                last_id = event["id"]
+                yield format_sse(event)
+        finally:
+            self.unsubscribe(subscription)
@@ -0,0 +1,81 @@
+"""
+Lightning Lesson 3: Memory Prefetch
+Start a chat's short-term and entity memory searches before its crew begins the task
+"""
+
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from src.memory_stats import StreamingStats
+
+
+# The limit and score threshold CrewAI's ContextualMemory searches with
+CONTEXT_SEARCH_LIMIT = 5
+CONTEXT_SCORE_THRESHOLD = 0.6
+
+DEFAULT_PREFETCH_WORKERS = 4
+
+
+def contextual_memory_query(task_description: str, context: str = "") -> str:
+    """The query ContextualMemory sends to short-term and entity memory for a task"""
+    return f"{task_description} {context}".strip()
+
+
+class MemoryPrefetcher:
+    """Runs the searches ContextualMemory is about to make, on background threads.
+
+    Storages are CachedQueryStorage wrappers sharing one MemoryQueryCache,
+    one per collection. A prefetch searches each of them with exactly the
+    query, limit and threshold the crew will use, so the crew's own search
+    is a cache hit, or joins the prefetch if it is still running. Embedding
+    the query happens inside the search, so it is warmed too. Failures are
+    counted and otherwise ignored: the crew simply searches itself.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_PREFETCH_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="memory-prefetch")
+        self._storages: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.search_times = StreamingStats()
+        self.prefetches = 0
+        self.failures = 0
+
+    def add_storage(self, storage):
+        """Prefetch from this storage's collection (the first storage seen per collection is used)"""
+        with self._lock:
+            self._storages.setdefault(storage.collection_key, storage)
+
+    def prefetch(self, query: str) -> List[Future]:
+        """Start searching every collection for ``query``; returns the searches' futures"""
+        with self._lock:
+            storages = list(self._storages.values())
+            self.prefetches += 1
+        return [self._executor.submit(self._search, storage, query) for storage in storages]
+
+    def _search(self, storage, query: str):
+        start = time.perf_counter()
+        try:
+            return storage.search(query, limit=CONTEXT_SEARCH_LIMIT, score_threshold=CONTEXT_SCORE_THRESHOLD)
+        except Exception:
+            with self._lock:
+                self.failures += 1
+            return None
+        finally:
+            self.search_times.add((time.perf_counter() - start) * 1000)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "collections": len(self._storages),
+                "prefetches": self.prefetches,
+                "failures": self.failures,
+                "search_time_ms": self.search_times.summary()
+            }
+
+    def reset(self):
+        """Forget counters (the storages stay registered)"""
+        with self._lock:
+            self.prefetches = self.failures = 0
+        self.search_times.reset()
@@ -0,0 +1,210 @@
+"""
+Lightning Lesson 3: Memory Query Cache
+Short-lived results of repeated memory searches, dropped as soon as their collection changes
+"""
+
+import json
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+# Seconds a cached search result stays valid (0 disables the cache)
+DEFAULT_TTL_SECONDS = 10.0
+
+# Cached searches kept before the least recently used ones are dropped
+MAX_CACHED_QUERIES = 1024
+
+
+def _copy_results(results: List[Any]) -> List[Any]:
+    """Callers may modify result dicts, so each one gets its own"""
+    return [dict(result) if isinstance(result, dict) else result for result in results]
+
+
+def collection_key(storage) -> str:
+    """Which collection a memory storage reads and writes, shared by every crew using it"""
+    collection = getattr(storage, "collection", None)
+    if collection is not None:
+        return collection.directory
+    agents = getattr(storage, "agents", "")
+    # RAGStorage's collection name
+    return f"memory_{storage.type}_{agents}" if agents else f"memory_{storage.type}"
+
+
+class MemoryQueryCache:
+    """Search results keyed by (collection, query, limit, score_threshold).
+
+    Each collection has a generation number that every save bumps. An entry
+    remembers the generation it was computed at and is only served while
+    that is still current and the entry is younger than ``ttl``. A search
+    that overlaps a save therefore never caches a result that misses the
+    save. Hits count the search time they saved, using the time the
+    original search took.
+
+    A miss for a search that is already running (at the same generation)
+    joins it instead of searching again; ``joined`` counts those. This is
+    how a prefetched search hands its results to the crew that asked for
+    them before the prefetch finished.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL_SECONDS, max_entries: int = MAX_CACHED_QUERIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Tuple[int, float, float, List[Any]]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._inflight: Dict[Tuple, Tuple[int, Future]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.joined = 0
+        self.expired = 0
+        self.invalidations = 0
+        self.saved_ms = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def generation(self, collection: str) -> int:
+        with self._lock:
+            return self._generations.get(collection, 0)
+
+    def get(self, key: Tuple) -> Optional[List[Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                generation, stored_at, search_ms, results = entry
+                if generation == self._generations.get(key[0], 0) and time.monotonic() - stored_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    self.saved_ms += search_ms
+                    return _copy_results(results)
+                del self._entries[key]
+                self.expired += 1
+            self.misses += 1
+            return None
+
+    def put(self, key: Tuple, generation: int, results: List[Any], search_ms: float):
+        with self._lock:
+            if generation != self._generations.get(key[0], 0):
+                return  # a save landed while searching
+            self._entries[key] = (generation, time.monotonic(), search_ms, _copy_results(results))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def begin(self, key: Tuple, generation: int) -> Tuple[Future, bool]:
+        """The search running for ``key`` at ``generation``, and whether the caller has to run it"""
+        with self._lock:
+            flight = self._inflight.get(key)
+            if flight is not None and flight[0] == generation:
+                self.joined += 1
+                return flight[1], False
+            future = Future()
+            self._inflight[key] = (generation, future)
+            return future, True
+
+    def end(self, key: Tuple, future: Future):
+        with self._lock:
+            flight = self._inflight.get(key)
+            if flight is not None and flight[1] is future:
+                del self._inflight[key]
+
+    def invalidate(self, collection: str):
+        """Drop every cached search of a collection"""
+        with self._lock:
+            self._generations[collection] = self._generations.get(collection, 0) + 1
+            for key in [key for key in self._entries if key[0] == collection]:
+                del self._entries[key]
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "ttl_seconds": self.ttl,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "joined": self.joined,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "expired": self.expired,
+                "invalidations": self.invalidations,
+                "saved_ms": self.saved_ms
+            }
+
+    def clear(self):
+        """Forget cached searches and counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.joined = self.expired = self.invalidations = 0
+            self.saved_ms = 0.0
+
+
+class CachedQueryStorage:
+    """Memory storage wrapper that serves repeated searches from a shared MemoryQueryCache.
+
+    ``search_query`` turns the query CrewAI sends (the whole task
+    description) into the text that is searched and cached, e.g. just the
+    customer's message, so the parts of a description that change every
+    turn do not make each search unique. Saves and resets go straight to
+    the wrapped storage and then invalidate its collection, so the next
+    search sees them. Everything else is delegated, so the wrapper can
+    replace ``ShortTermMemory.storage`` or ``EntityMemory.storage`` for
+    either backend.
+    """
+
+    def __init__(self, storage, cache: MemoryQueryCache, search_query: Optional[Callable[[str], str]] = None):
+        self.storage = storage
+        self.cache = cache
+        self.search_query = search_query
+        self.collection_key = collection_key(storage)
+
+    def __getattr__(self, name):
+        return getattr(self.storage, name)
+
+    def save(self, value: Any, metadata: Dict[str, Any]) -> None:
+        try:
+            self.storage.save(value, metadata)
+        finally:
+            self.cache.invalidate(self.collection_key)
+
+    def search(self, query: str, limit: int = 5, filter: Optional[Dict[str, Any]] = None,
+               score_threshold: float = 0.6) -> List[Any]:
+        if self.search_query:
+            query = self.search_query(query)
+        key = (self.collection_key, query, limit, score_threshold,
+               json.dumps(filter, sort_keys=True, default=str) if filter else None)
+        results = self.cache.get(key)
+        if results is not None:
+            return results
+        generation = self.cache.generation(self.collection_key)
+        flight, leader = self.cache.begin(key, generation)
+        if not leader:
+            try:
+                return _copy_results(flight.result())
+            except Exception:
+                pass  # the running search failed; try again below
+        start = time.perf_counter()
+        try:
+            results = self.storage.search(query, limit=limit, filter=filter, score_threshold=score_threshold)
+            self.cache.put(key, generation, results, (time.perf_counter() - start) * 1000)
+            if leader:
+                flight.set_result(_copy_results(results))
+            return results
+        except BaseException as error:
+            if leader:
+                flight.set_exception(error)
+            raise
+        finally:
+            if leader:
+                self.cache.end(key, flight)
+
+    def reset(self) -> None:
+        try:
+            self.storage.reset()
+        finally:
+            self.cache.invalidate(self.collection_key)
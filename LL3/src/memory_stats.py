@@ -0,0 +1,163 @@
+"""
+Lightning Lesson 3: Streaming Memory Statistics
+Fixed-size event buffers and histogram-backed timing statistics for the memory event listener
+"""
+
+import math
+import threading
+from array import array
+from collections import deque
+from itertools import islice
+from typing import Dict, Any, List, Sequence
+
+
+# Memory events kept for the UI; older events are dropped
+MEMORY_EVENTS_CAPACITY = 1000
+
+# Timing histogram range (milliseconds) and resolution
+HISTOGRAM_MIN_MS = 0.01
+HISTOGRAM_MAX_MS = 1_000_000.0
+HISTOGRAM_BINS_PER_DECADE = 40
+
+DEFAULT_PERCENTILES = (50, 95, 99)
+
+
+class EventRing:
+    """The most recent ``capacity`` events, plus a count of every event seen.
+
+    Written by the memory event sink's thread and read by request threads,
+    so access is serialized.
+    """
+
+    def __init__(self, capacity: int = MEMORY_EVENTS_CAPACITY):
+        self._events = deque(maxlen=max(1, capacity))
+        self._lock = threading.Lock()
+        self.total = 0
+
+    def append(self, event: Dict[str, Any]):
+        with self._lock:
+            self._events.append(event)
+            self.total += 1
+
+    def recent(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """The last ``limit`` events, oldest first"""
+        if limit <= 0:
+            return []
+        with self._lock:
+            newest_first = list(islice(reversed(self._events), limit))
+        newest_first.reverse()
+        return newest_first
+
+    def since(self, event_id: int) -> List[Dict[str, Any]]:
+        """Retained events with an id greater than ``event_id``, oldest first"""
+        newer = []
+        with self._lock:
+            for event in reversed(self._events):
+                if event["id"] <= event_id:
+                    break
+                newer.append(event)
+        newer.reverse()
+        return newer
+
+    def clear(self):
+        with self._lock:
+            self._events.clear()
+            self.total = 0
+
+    def __len__(self):
+        return len(self._events)
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._events))
+
+
+class StreamingStats:
+    """Count, mean, min, max and percentiles of a timing stream in constant memory.
+
+    Samples are counted in a fixed log-spaced histogram (40 bins per decade
+    from 0.01ms to 1000s), so a percentile is accurate to about 3% of its
+    value and neither memory nor query cost grows with the number of samples.
+    Values outside the range are counted in the first or last bin; min and
+    max are exact.
+    """
+
+    def __init__(self, min_value: float = HISTOGRAM_MIN_MS, max_value: float = HISTOGRAM_MAX_MS,
+                 bins_per_decade: int = HISTOGRAM_BINS_PER_DECADE):
+        self.min_value = min_value
+        self.bins_per_decade = bins_per_decade
+        self._log_min = math.log10(min_value)
+        bins = math.ceil((math.log10(max_value) - self._log_min) * bins_per_decade)
+        self._counts = array('Q', bytes(8 * bins))
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _bin(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        index = int((math.log10(value) - self._log_min) * self.bins_per_decade)
+        return min(index, len(self._counts) - 1)
+
+    def _bin_value(self, index: int) -> float:
+        """Geometric midpoint of a bin"""
+        return 10 ** (self._log_min + (index + 0.5) / self.bins_per_decade)
+
+    def add(self, value: float):
+        if value is None or value != value:  # skip missing and NaN timings
+            return
+        with self._lock:
+            self._counts[self._bin(value)] += 1
+            self.count += 1
+            self.total += value
+            if value < self.min:
+                self.min = value
+            if value > self.max:
+                self.max = value
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentiles(self, percents: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, float]:
+        """Estimated percentiles keyed ``p50``, ``p95``, ... (0 when empty)"""
+        if not percents:
+            return {}
+        with self._lock:
+            if not self.count:
+                return {f"p{p:g}": 0.0 for p in percents}
+            ranks = sorted((max(1, math.ceil(p / 100 * self.count)), p) for p in percents)
+            result = {}
+            seen = 0
+            pending = iter(ranks)
+            rank, percent = next(pending)
+            for index, bin_count in enumerate(self._counts):
+                if not bin_count:
+                    continue
+                seen += bin_count
+                while seen >= rank:
+                    # Clamp to the exact extremes so small samples stay sensible
+                    result[f"p{percent:g}"] = min(max(self._bin_value(index), self.min), self.max)
+                    rank, percent = next(pending, (math.inf, None))
+                if rank == math.inf:
+                    break
+            return {f"p{p:g}": result[f"p{p:g}"] for p in percents}
+
+    def summary(self, percents: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "avg": self.mean,
+            "min": self.min if self.count else 0.0,
+            "max": self.max if self.count else 0.0,
+            **self.percentiles(percents)
+        }
+
+    def reset(self):
+        with self._lock:
+            self._counts = array('Q', bytes(8 * len(self._counts)))
+            self.count = 0
+            self.total = 0.0
+            self.min = math.inf
+            self.max = -math.inf
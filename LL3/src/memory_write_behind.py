@@ -0,0 +1,255 @@
+"""
+Lightning Lesson 3: Write-Behind Memory Saves
+Short-term and entity memory saves queued off the chat path and written in batches
+"""
+
+import time
+import atexit
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.memory_stats import StreamingStats
+from src.memory_query_cache import collection_key
+
+
+# Searches never wait; a save shows up once the writer has stored it
+EVENTUAL = "eventual"
+# Searches first wait for every save queued before them, so a turn sees the turns before it
+READ_YOUR_WRITES = "read-your-writes"
+CONSISTENCY_MODES = (EVENTUAL, READ_YOUR_WRITES)
+
+# Saves written per batch, and how long the writer lets a burst of saves build up
+DEFAULT_MAX_BATCH = 64
+DEFAULT_MAX_DELAY_SECONDS = 0.05
+
+# How long interpreter exit waits for queued saves to be written
+SHUTDOWN_FLUSH_TIMEOUT = 30.0
+
+# How long a read-your-writes search waits for queued saves before searching anyway
+SEARCH_FLUSH_TIMEOUT = 5.0
+
+
+def save_many(storage, values: Sequence[Any], metadatas: Sequence[Dict[str, Any]],
+              vectors: Optional[Sequence] = None):
+    """Store several memories in one collection with as few embedding calls as the storage allows"""
+    bulk_save = getattr(storage, "save_many", None)
+    if bulk_save is not None:
+        bulk_save(values, metadatas, vectors) if vectors is not None else bulk_save(values, metadatas)
+    elif hasattr(storage, "_get_client"):
+        # CrewAI's RAGStorage: one add_documents call embeds the whole batch
+        client = storage._get_client()
+        name = collection_key(storage)
+        client.get_or_create_collection(collection_name=name)
+        client.add_documents(collection_name=name, documents=[
+            {"content": value, "metadata": metadata} if metadata else {"content": value}
+            for value, metadata in zip(values, metadatas)
+        ])
+    else:
+        for value, metadata in zip(values, metadatas):
+            storage.save(value, metadata)
+
+
+class WriteBehindQueue:
+    """Memory saves written by one background thread, batched per collection.
+
+    ``put`` returns at once. The writer waits up to ``max_delay`` for more
+    saves (an entity batch arrives as one save per entity), then writes up
+    to ``max_batch`` of them, one ``save_many`` per collection, and calls
+    ``on_write`` with each collection's key (e.g. to drop cached searches).
+    Collections whose storages share an ``embedder`` (the in-process vector
+    store) are embedded together in one call.
+    ``flush`` waits until every save queued before the call is written;
+    ``consistency`` tells WriteBehindStorage whether searches flush first.
+    Queued saves are flushed when the interpreter exits.
+    """
+
+    def __init__(self, on_write: Optional[Callable[[str], None]] = None, consistency: str = READ_YOUR_WRITES,
+                 max_batch: int = DEFAULT_MAX_BATCH, max_delay: float = DEFAULT_MAX_DELAY_SECONDS):
+        if consistency not in CONSISTENCY_MODES:
+            raise ValueError(f"Unknown consistency mode '{consistency}' (expected one of {CONSISTENCY_MODES})")
+        self.on_write = on_write
+        self.consistency = consistency
+        self.max_batch = max(1, max_batch)
+        self.max_delay = max_delay
+        self._pending: List[Tuple[Any, Any, Dict[str, Any]]] = []
+        self._condition = threading.Condition()
+        self._queued = 0
+        self._done = 0
+        self._flushing = 0
+        self._thread: Optional[threading.Thread] = None
+        self.write_times = StreamingStats()
+        self.batches = 0
+        self.written = 0
+        self.failures = 0
+        self.flush_timeouts = 0
+        # Registered after the vector store's exit flush, so queued saves land before it runs
+        atexit.register(self._flush_at_exit)
+
+    @property
+    def read_your_writes(self) -> bool:
+        return self.consistency == READ_YOUR_WRITES
+
+    def put(self, storage, value: Any, metadata: Dict[str, Any]):
+        with self._condition:
+            self._pending.append((storage, value, metadata))
+            self._queued += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="memory-write-behind", daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every save queued so far is written; False if ``timeout`` ran out first"""
+        with self._condition:
+            target = self._queued
+            if self._done >= target:
+                return True
+            self._flushing += 1
+            self._condition.notify_all()
+            try:
+                flushed = self._condition.wait_for(lambda: self._done >= target, timeout)
+            finally:
+                self._flushing -= 1
+            if not flushed:
+                self.flush_timeouts += 1
+            return flushed
+
+    def discard(self, collection: str) -> int:
+        """Drop a collection's saves that have not been picked up by the writer yet"""
+        with self._condition:
+            kept = [item for item in self._pending if collection_key(item[0]) != collection]
+            dropped = len(self._pending) - len(kept)
+            self._pending = kept
+            self._done += dropped
+            self._condition.notify_all()
+            return dropped
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending)
+                deadline = time.monotonic() + self.max_delay
+                while len(self._pending) < self.max_batch and not self._flushing:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+            try:
+                self._write(batch)
+            except Exception as e:
+                # Keep the writer alive: searches in read-your-writes mode wait on it
+                print(f"⚠️  Write-behind writer error ({len(batch)} memories): {e}")
+            finally:
+                with self._condition:
+                    self._done += len(batch)
+                    self._condition.notify_all()
+
+    def _write(self, batch: List[Tuple[Any, Any, Dict[str, Any]]]):
+        # Pooled crews have their own storage objects for the same collection
+        groups: Dict[str, Tuple[Any, List[Any], List[Dict[str, Any]]]] = {}
+        for storage, value, metadata in batch:
+            group = groups.setdefault(collection_key(storage), (storage, [], []))
+            group[1].append(value)
+            group[2].append(metadata)
+        vectors = self._embed_shared(groups)
+        for key, (storage, values, metadatas) in groups.items():
+            start = time.perf_counter()
+            saved = False
+            try:
+                save_many(storage, values, metadatas, vectors.get(key))
+                sync_lexical_index = getattr(storage, "sync_lexical_index", None)
+                if sync_lexical_index:
+                    sync_lexical_index()
+                saved = True
+            except Exception as e:
+                print(f"⚠️  Write-behind save of {len(values)} memories to {key} failed: {e}")
+            finally:
+                with self._condition:
+                    if saved:
+                        self.written += len(values)
+                    else:
+                        self.failures += len(values)
+                    self.write_times.add((time.perf_counter() - start) * 1000)
+                    self.batches += 1
+                if self.on_write:
+                    self.on_write(key)
+
+    def _embed_shared(self, groups: Dict[str, Tuple[Any, List[Any], List[Dict[str, Any]]]]) -> Dict[str, Sequence]:
+        """Vectors for collections whose storages embed with the same function, one call per function"""
+        shared: Dict[int, Tuple[Callable, List[str]]] = {}
+        for key, (storage, _, _) in groups.items():
+            embedder = getattr(storage, "embedder", None)
+            if callable(embedder) and getattr(storage, "save_many", None) is not None:
+                shared.setdefault(id(embedder), (embedder, []))[1].append(key)
+        vectors: Dict[str, Sequence] = {}
+        for embedder, keys in shared.values():
+            if len(keys) < 2:
+                continue
+            try:
+                embedded = embedder([str(value) for key in keys for value in groups[key][1]])
+            except Exception:
+                continue  # each collection embeds its own saves instead
+            offset = 0
+            for key in keys:
+                count = len(groups[key][1])
+                vectors[key] = embedded[offset:offset + count]
+                offset += count
+        return vectors
+
+    def _flush_at_exit(self):
+        if not self.flush(SHUTDOWN_FLUSH_TIMEOUT):
+            print(f"⚠️  {self.stats()['pending']} memory saves were not written before exit")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                "consistency": self.consistency,
+                "queued": self._queued,
+                "pending": self._queued - self._done,
+                "written": self.written,
+                "failures": self.failures,
+                "flush_timeouts": self.flush_timeouts,
+                "batches": self.batches,
+                "avg_batch_size": (self.written + self.failures) / self.batches if self.batches else 0.0,
+                "write_time_ms": self.write_times.summary()
+            }
+
+
+class WriteBehindStorage:
+    """Memory storage wrapper whose saves go through a WriteBehindQueue.
+
+    Searches flush the queue first in read-your-writes mode. A reset drops
+    the collection's queued saves and waits for the one being written, so
+    nothing reappears after it. Everything else is delegated, so it can
+    wrap either backend's storage (and be wrapped by CachedQueryStorage).
+    """
+
+    def __init__(self, storage, queue: WriteBehindQueue):
+        self.storage = storage
+        self.queue = queue
+
+    def __getattr__(self, name):
+        return getattr(self.storage, name)
+
+    def save(self, value: Any, metadata: Dict[str, Any]) -> None:
+        self.queue.put(self.storage, value, metadata)
+
+    def search(self, query: str, limit: int = 5, filter: Optional[Dict[str, Any]] = None,
+               score_threshold: float = 0.6) -> List[Any]:
+        if self.queue.read_your_writes:
+            # A stuck write must not block every search; on a timeout (counted
+            # in flush_timeouts) this one may miss queued saves
+            self.queue.flush(SEARCH_FLUSH_TIMEOUT)
+        return self.storage.search(query, limit=limit, filter=filter, score_threshold=score_threshold)
+
+    def sync_lexical_index(self) -> int:
+        """Nothing to do on the saving thread: the writer indexes each batch once it is stored"""
+        return 0
+
+    def reset(self) -> None:
+        self.queue.discard(collection_key(self.storage))
+        self.queue.flush()
+        self.storage.reset()
+
@@ -0,0 +1,18 @@
+"""
+Lightning Lesson 3: Prompt Slice Validation
+Checks a crew prompt_file's slices with Lesson 2's validator, so both lessons share one table of CrewAI placeholders
+"""
+
+import os
+import importlib.util
+
+
+# Both lessons name their package "src", so Lesson 2's module (standard library only) is loaded by path
+LL2_PROMPT_SLICES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "LL2", "src", "prompt_slices.py")
+
+_spec = importlib.util.spec_from_file_location("ll2_prompt_slices", LL2_PROMPT_SLICES)
+_prompt_slices = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_prompt_slices)
+
+CREWAI_SLICE_PLACEHOLDERS = _prompt_slices.CREWAI_SLICE_PLACEHOLDERS
+validate_prompt_slices = _prompt_slices.validate_prompt_slices
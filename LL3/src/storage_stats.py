@@ -0,0 +1,107 @@
+"""
+Lightning Lesson 3: Cached Storage Statistics
+File counts and sizes of the memory storage directory, refreshed by a background thread
+"""
+
+import os
+import time
+import threading
+from typing import Dict, Any, Optional
+
+
+# Seconds between background rescans
+DEFAULT_REFRESH_INTERVAL = 5.0
+
+
+def scan_storage(storage_path: str) -> Dict[str, Any]:
+    """Walk the storage directory once and total files and bytes per top-level entry"""
+    start = time.perf_counter()
+    entries: Dict[str, Dict[str, Any]] = {}
+    file_count = dir_count = total_bytes = 0
+    exists = os.path.isdir(storage_path)
+    if exists:
+        for top in os.scandir(storage_path):
+            try:
+                if top.is_dir(follow_symlinks=False):
+                    files = dirs = size = 0
+                    stack = [top.path]
+                    while stack:
+                        for entry in os.scandir(stack.pop()):
+                            if entry.is_dir(follow_symlinks=False):
+                                dirs += 1
+                                stack.append(entry.path)
+                            else:
+                                files += 1
+                                size += entry.stat(follow_symlinks=False).st_size
+                    entries[top.name] = {"is_dir": True, "files": files, "bytes": size}
+                    dir_count += 1 + dirs
+                else:
+                    files, size = 1, top.stat(follow_symlinks=False).st_size
+                    entries[top.name] = {"is_dir": False, "files": 1, "bytes": size}
+            except OSError:
+                # Removed while scanning (e.g. a memory reset); picked up next time
+                continue
+            file_count += files
+            total_bytes += size
+    return {
+        "storage_path": storage_path,
+        "exists": exists,
+        "file_count": file_count,
+        "dir_count": dir_count,
+        "total_bytes": total_bytes,
+        "entries": dict(sorted(entries.items())),
+        "refreshed_at": time.time(),
+        "scan_ms": (time.perf_counter() - start) * 1000
+    }
+
+
+class StorageStats:
+    """Serves the latest storage scan from memory.
+
+    A daemon thread rescans every ``interval`` seconds, or sooner after
+    ``request_refresh`` (which only sets a flag, so it is safe to call from
+    the chat path). Readers get the cached snapshot and never touch the
+    file system.
+    """
+
+    def __init__(self, storage_path: str, interval: float = DEFAULT_REFRESH_INTERVAL, start: bool = True):
+        self.storage_path = storage_path
+        self.interval = interval
+        self._snapshot = scan_storage(storage_path)
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if start:
+            self._thread = threading.Thread(target=self._run, name="storage-stats", daemon=True)
+            self._thread.start()
+
+    def snapshot(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {**snapshot, "age_seconds": round(time.time() - snapshot["refreshed_at"], 3)}
+
+    def has_file(self, name: str) -> bool:
+        """Whether a top-level file or directory existed at the last scan"""
+        return name in self._snapshot["entries"]
+
+    def request_refresh(self):
+        self._wakeup.set()
+
+    def refresh(self) -> Dict[str, Any]:
+        """Rescan now, on the calling thread"""
+        self._snapshot = scan_storage(self.storage_path)
+        return self.snapshot()
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            if self._stopped.is_set():
+                return
+            try:
+                self._snapshot = scan_storage(self.storage_path)
+            except Exception as e:
+                print(f"⚠️ Storage scan failed: {e}")
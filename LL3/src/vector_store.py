@@ -0,0 +1,701 @@
+"""
+Lightning Lesson 3: Memory-Mapped Vector Store
+A CrewAI memory storage backend on an mmap'd float32 matrix, searched in-process with NumPy
+"""
+
+import os
+import json
+import math
+import atexit
+import hashlib
+import logging
+import threading
+import traceback
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.lexical_index import BM25Index, is_identifier, reciprocal_rank_fusion, tokenize
+
+try:
+    from crewai.rag.storage.base_rag_storage import BaseRAGStorage
+except ImportError:  # the collection itself works without CrewAI (e.g. in benchmarks)
+    BaseRAGStorage = object
+
+
+VECTORS_FILE = "vectors.f32"
+QUANTIZED_FILES = {"float16": "vectors.f16", "int8": "vectors.i8"}
+SCALES_FILE = "scales.f32"
+RECORDS_FILE = "records.jsonl"
+MANIFEST_FILE = "collection.json"
+INDEX_FILE = "ivf.npz"
+
+# Collections up to this many rows are searched exhaustively; larger ones through the IVF index
+IVF_THRESHOLD = 20_000
+
+# Rows the matrix file is created with; it doubles when full
+INITIAL_CAPACITY = 1024
+
+# Rows scored per matrix product in exhaustive search
+SEARCH_BLOCK_ROWS = 16_384
+
+# Searchable vector representations; quantized ones keep 2 or 1 bytes per dimension in the scanned matrix
+VECTOR_DTYPES = ("float32", "float16", "int8")
+
+# Candidates re-scored at full precision per requested result in a quantized collection
+RERANK_FACTOR = 8
+
+# Hybrid search: BM25 candidates fused with the vector results, and vector results per requested one
+LEXICAL_CANDIDATES = 50
+HYBRID_DEPTH_FACTOR = 4
+
+# Rows matching a query identifier, up to this many, replace the vector scan as the candidates
+PREFILTER_MAX_ROWS = 1000
+
+# k-means iterations and training rows per list when (re)building the IVF index
+IVF_TRAIN_ITERATIONS = 10
+IVF_TRAIN_ROWS_PER_LIST = 64
+
+
+def normalize_rows(vectors) -> np.ndarray:
+    """Unit-length float32 rows, so a dot product is the cosine similarity"""
+    vectors = np.array(vectors, dtype=np.float32, ndmin=2)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def similarity_to_score(similarities):
+    """CrewAI's relevance score for a cosine collection (crewai/rag/chromadb/utils.py).
+
+    Chroma reports cosine distance ``1 - cos`` and CrewAI scores it as
+    ``1 - 0.5 * distance``, so existing ``score_threshold`` values keep
+    their meaning with this backend.
+    """
+    return np.clip(0.5 + 0.5 * similarities, 0.0, 1.0)
+
+
+def record_id(content: str, metadata: Optional[Dict[str, Any]]) -> str:
+    """The document id CrewAI's Chroma client derives, so saving the same memory twice is an upsert"""
+    if metadata:
+        content = f"{content}|{json.dumps(metadata, sort_keys=True)}"
+    return hashlib.blake2b(content.encode(), digest_size=32).hexdigest()
+
+
+def quantize(vectors: np.ndarray, dtype: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Codes for unit float32 rows, plus a per-row scale for int8.
+
+    int8 maps each row's largest component to 127, so every row uses the
+    full code range regardless of how its values are spread.
+    """
+    if dtype == "float16":
+        return vectors.astype(np.float16), None
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    return np.rint(vectors / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+
+
+class _DequantizedRows:
+    """float32 rows of a quantized matrix, decoded as they are read"""
+
+    def __init__(self, codes: np.ndarray, scales: Optional[np.ndarray]):
+        self.codes = codes
+        self.scales = scales
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, index) -> np.ndarray:
+        rows = np.asarray(self.codes[index], dtype=np.float32)
+        if self.scales is not None:
+            rows *= np.asarray(self.scales[index])[..., None]
+        return rows
+
+    def dot(self, queries: np.ndarray, index) -> np.ndarray:
+        """``queries @ self[index].T``, scaling the products instead of every component"""
+        similarities = queries @ np.asarray(self.codes[index], dtype=np.float32).T
+        if self.scales is not None:
+            similarities *= np.asarray(self.scales[index])
+        return similarities
+
+
+def _matches(metadata: Dict[str, Any], where: Dict[str, Any]) -> bool:
+    return all(metadata.get(key) == value for key, value in where.items())
+
+
+class IVFIndex:
+    """Inverted-file index: rows grouped under their nearest k-means centroid.
+
+    A search scores the centroids, then only the rows in the ``nprobe``
+    closest lists. Rows added after training are assigned to a list as
+    they arrive; the collection retrains once it has grown well past the
+    size the centroids were fitted on.
+    """
+
+    def __init__(self, centroids: np.ndarray, assignments: np.ndarray, trained_rows: int):
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.trained_rows = trained_rows
+        self.nlist = len(self.centroids)
+        self._assignments = [np.asarray(assignments, dtype=np.int32)]
+        self._lists: List[np.ndarray] = []
+        self._pending: Dict[int, List[int]] = {}
+        self._group(self._assignments[0], 0)
+
+    @property
+    def rows(self) -> int:
+        return sum(len(chunk) for chunk in self._assignments)
+
+    @staticmethod
+    def default_nlist(rows: int) -> int:
+        return max(16, int(math.sqrt(rows)))
+
+    @staticmethod
+    def default_nprobe(nlist: int) -> int:
+        return min(nlist, max(8, nlist // 16))
+
+    @classmethod
+    def train(cls, matrix: np.ndarray, nlist: Optional[int] = None, seed: int = 0) -> "IVFIndex":
+        """Spherical k-means on a sample of ``matrix``, then assign every row"""
+        rows = len(matrix)
+        nlist = min(nlist or cls.default_nlist(rows), rows)
+        rng = np.random.default_rng(seed)
+        sample_size = min(rows, nlist * IVF_TRAIN_ROWS_PER_LIST)
+        sample = np.asarray(matrix[np.sort(rng.choice(rows, sample_size, replace=False))])
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+
+        for _ in range(IVF_TRAIN_ITERATIONS):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            empty = np.bincount(labels, minlength=nlist) == 0
+            # Re-seed empty lists with random sample rows
+            sums[empty] = sample[rng.choice(sample_size, int(empty.sum()))]
+            centroids = normalize_rows(sums)
+
+        return cls(centroids, cls._assign(centroids, matrix), rows)
+
+    @staticmethod
+    def _assign(centroids: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+        labels = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), SEARCH_BLOCK_ROWS):
+            block = np.asarray(vectors[start:start + SEARCH_BLOCK_ROWS])
+            labels[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        return labels
+
+    def _group(self, labels: np.ndarray, offset: int):
+        order = np.argsort(labels, kind="stable")
+        bounds = np.searchsorted(labels[order], np.arange(self.nlist + 1))
+        rows = (order + offset).astype(np.int64)
+        self._lists = [rows[bounds[i]:bounds[i + 1]] for i in range(self.nlist)]
+
+    def add(self, vectors: np.ndarray):
+        """Assign rows appended to the collection (in order)"""
+        start = self.rows
+        labels = self._assign(self.centroids, vectors)
+        self._assignments.append(labels)
+        for row, label in enumerate(labels.tolist(), start):
+            self._pending.setdefault(label, []).append(row)
+
+    def candidates(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        """Row numbers in the lists closest to a unit query vector"""
+        probe = np.argpartition(-(self.centroids @ query), min(nprobe, self.nlist) - 1)[:nprobe]
+        for label in probe.tolist():
+            pending = self._pending.pop(label, None)
+            if pending:
+                self._lists[label] = np.concatenate([self._lists[label], np.asarray(pending, dtype=np.int64)])
+        return np.sort(np.concatenate([self._lists[label] for label in probe.tolist()]))
+
+    def save(self, path: str):
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, centroids=self.centroids, assignments=np.concatenate(self._assignments),
+                 trained_rows=self.trained_rows)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "IVFIndex":
+        with np.load(path) as data:
+            return cls(data["centroids"], data["assignments"], int(data["trained_rows"]))
+
+
+class VectorCollection:
+    """One memory collection in a directory: vectors, records and an optional IVF index.
+
+    Vectors are unit-normalized float32 rows of a memory-mapped matrix file
+    that doubles in size when full, so the OS page cache (not the Python
+    heap) holds them and a restart maps the file instead of loading it.
+    Contents and metadata are appended to a JSON Lines file, one line per
+    write (the latest line for a row wins). Up to ``ivf_threshold`` rows a
+    search scores every row with blocked matrix products; beyond that it
+    goes through an IVF index that is trained on first use and saved next
+    to the matrix.
+
+    With a ``float16`` or ``int8`` dtype, searches scan a quantized copy of
+    the matrix, a half or a quarter of the size. The best ``RERANK_FACTOR``
+    candidates per result are then re-scored against the float32 matrix,
+    which is only read for those rows. Without ``rerank`` the float32
+    matrix is not kept at all, which also saves disk, and scores come from
+    the quantized vectors. A collection keeps the dtype it was created with.
+    """
+
+    def __init__(self, directory: str, dtype: str = "float32", rerank: bool = True,
+                 ivf_threshold: int = IVF_THRESHOLD, nprobe: Optional[int] = None):
+        if dtype not in VECTOR_DTYPES:
+            raise ValueError(f"Unsupported vector dtype '{dtype}', expected one of {', '.join(VECTOR_DTYPES)}")
+        self.directory = directory
+        self.dtype = dtype
+        self.rerank = rerank
+        self.ivf_threshold = ivf_threshold
+        self.nprobe = nprobe
+        self.dim: Optional[int] = None
+        self.count = 0
+        self._capacity = 0
+        self._matrix: Optional[np.memmap] = None
+        self._codes: Optional[np.memmap] = None
+        self._scales: Optional[np.memmap] = None
+        self._ids: Dict[str, int] = {}
+        self._row_ids: List[str] = []
+        self._contents: List[str] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._index: Optional[IVFIndex] = None
+        self._index_dirty = False
+        self.lexical: Optional[BM25Index] = None
+        self._lock = threading.RLock()
+        self._load()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _load(self):
+        manifest_path = self._path(MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            return
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        self.dim = manifest["dim"]
+        self.dtype = manifest.get("dtype", "float32")
+        self.rerank = manifest.get("rerank", True)
+
+        records: Dict[int, Dict[str, Any]] = {}
+        if os.path.exists(self._path(RECORDS_FILE)):
+            with open(self._path(RECORDS_FILE), 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # a line cut short by a crash
+                    records[record["row"]] = record
+        # Vectors are written before their record, so every recorded row is complete
+        self.count = len(records)
+        for row in range(self.count):
+            record = records[row]
+            self._ids[record["id"]] = row
+            self._row_ids.append(record["id"])
+            self._contents.append(record["content"])
+            self._metadatas.append(record.get("metadata") or {})
+        self._map(max(INITIAL_CAPACITY, self.count))
+
+        if os.path.exists(self._path(INDEX_FILE)):
+            try:
+                index = IVFIndex.load(self._path(INDEX_FILE))
+                if index.centroids.shape[1] == self.dim and index.rows <= self.count:
+                    index.add(self._rows()[index.rows:self.count])
+                    self._index = index
+            except Exception as e:
+                print(f"⚠️ Ignoring unreadable vector index in {self.directory}: {e}")
+
+    def _layout(self) -> List[Tuple[str, str, Any, Tuple[int, ...]]]:
+        """(attribute, file, dtype, row shape) of each memory-mapped array"""
+        layout = []
+        if self.dtype == "float32" or self.rerank:
+            layout.append(("_matrix", VECTORS_FILE, np.float32, (self.dim,)))
+        if self.dtype != "float32":
+            layout.append(("_codes", QUANTIZED_FILES[self.dtype], np.dtype(self.dtype), (self.dim,)))
+        if self.dtype == "int8":
+            layout.append(("_scales", SCALES_FILE, np.float32, ()))
+        return layout
+
+    def _map(self, capacity: int):
+        """(Re)map the matrix files with room for ``capacity`` rows"""
+        capacities = []
+        for attribute, name, dtype, row_shape in self._layout():
+            array = getattr(self, attribute)
+            if array is not None:
+                array.flush()
+                setattr(self, attribute, None)
+            path = self._path(name)
+            row_bytes = np.dtype(dtype).itemsize * int(np.prod(row_shape))
+            with open(path, 'ab') as f:
+                if f.tell() < capacity * row_bytes:
+                    f.truncate(capacity * row_bytes)
+            rows = os.path.getsize(path) // row_bytes
+            setattr(self, attribute, np.memmap(path, dtype=dtype, mode='r+', shape=(rows, *row_shape)))
+            capacities.append(rows)
+        self._capacity = min(capacities)
+
+    def _rows(self, count: Optional[int] = None):
+        """The first ``count`` rows of the searched matrix, as float32"""
+        count = self.count if count is None else count
+        if self._codes is None:
+            return self._matrix[:count]
+        return _DequantizedRows(self._codes[:count], self._scales[:count] if self._scales is not None else None)
+
+    def _dot(self, queries: np.ndarray, index) -> np.ndarray:
+        """Similarities of unit queries to the searched matrix rows at ``index``"""
+        if self._codes is None:
+            return queries @ np.asarray(self._matrix[index]).T
+        return self._rows().dot(queries, index)
+
+    def _create(self, dim: int):
+        os.makedirs(self.directory, exist_ok=True)
+        self.dim = dim
+        tmp_path = self._path(MANIFEST_FILE + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"dim": dim, "dtype": self.dtype, "rerank": self.rerank, "metric": "cosine"}, f)
+        os.replace(tmp_path, self._path(MANIFEST_FILE))
+        self._map(INITIAL_CAPACITY)
+
+    def add(self, ids: Sequence[str], contents: Sequence[str], metadatas: Sequence[Optional[Dict[str, Any]]],
+            vectors) -> int:
+        """Insert or replace rows by id; returns how many rows were appended"""
+        vectors = normalize_rows(vectors)
+        with self._lock:
+            if self.dim is None:
+                self._create(vectors.shape[1])
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Expected {self.dim}-dimensional vectors, got {vectors.shape[1]}")
+
+            # New ids only become visible once their vectors and records are written
+            rows = []
+            new_rows: Dict[str, int] = {}
+            new_count = self.count
+            for id_ in ids:
+                row = self._ids.get(id_, new_rows.get(id_))
+                if row is None:
+                    row = new_rows[id_] = new_count
+                    new_count += 1
+                rows.append(row)
+            if new_count > self._capacity:
+                capacity = self._capacity
+                while capacity < new_count:
+                    capacity *= 2
+                self._map(capacity)
+
+            rows_array = np.asarray(rows)
+            if self._matrix is not None:
+                self._matrix[rows_array] = vectors
+            if self._codes is not None:
+                codes, scales = quantize(vectors, self.dtype)
+                self._codes[rows_array] = codes
+                if scales is not None:
+                    self._scales[rows_array] = scales
+            records = [(row, id_, content, dict(metadata or {}))
+                       for row, id_, content, metadata in zip(rows, ids, contents, metadatas)]
+            lines = [json.dumps({"row": row, "id": id_, "content": content, "metadata": metadata},
+                                ensure_ascii=False, default=str) + "\n" for row, id_, content, metadata in records]
+            with open(self._path(RECORDS_FILE), 'a', encoding='utf-8') as f:
+                f.write("".join(lines))
+
+            for row, id_, content, metadata in records:
+                if row < len(self._contents):
+                    self._contents[row], self._metadatas[row] = content, metadata
+                else:
+                    self._row_ids.append(id_)
+                    self._contents.append(content)
+                    self._metadatas.append(metadata)
+            self._ids.update(new_rows)
+
+            appended = new_count - self.count
+            if self._index is not None and appended:
+                # Ids are content hashes, so a replaced row keeps its vector and list
+                self._index.add(self._rows(new_count)[self.count:new_count])
+                self._index_dirty = True
+            self.count = new_count
+            return appended
+
+    def build_index(self, nlist: Optional[int] = None) -> IVFIndex:
+        """Train the IVF index on the current rows and save it"""
+        with self._lock:
+            self._index = IVFIndex.train(self._rows(), nlist)
+            self._index.save(self._path(INDEX_FILE))
+            self._index_dirty = False
+            return self._index
+
+    def _use_index(self) -> bool:
+        if self.count <= self.ivf_threshold:
+            return False
+        # Retrain once the collection has quadrupled since the centroids were fitted
+        if self._index is None or self.count > 4 * self._index.trained_rows:
+            self.build_index()
+        return True
+
+    def search(self, queries, limit: int = 5, score_threshold: Optional[float] = None,
+               where: Optional[Dict[str, Any]] = None, exact: bool = False) -> List[List[Tuple[int, float]]]:
+        """Top ``limit`` (row, score) pairs for each query vector, best first.
+
+        ``where`` keeps rows whose metadata equals every given value.
+        ``exact`` scores every row even when the collection is indexed.
+        """
+        queries = normalize_rows(queries)
+        with self._lock:
+            if self.count == 0 or limit <= 0:
+                return [[] for _ in queries]
+            if queries.shape[1] != self.dim:
+                raise ValueError(f"Expected {self.dim}-dimensional queries, got {queries.shape[1]}")
+            mask = self._mask(where)
+            if exact or not self._use_index():
+                similarities = np.empty((len(queries), self.count), dtype=np.float32)
+                for start in range(0, self.count, SEARCH_BLOCK_ROWS):
+                    stop = min(start + SEARCH_BLOCK_ROWS, self.count)
+                    similarities[:, start:stop] = self._dot(queries, slice(start, stop))
+                if mask is not None:
+                    similarities[:, ~mask] = -np.inf
+                return [self._rank(query, row_similarities, None, limit, score_threshold)
+                        for query, row_similarities in zip(queries, similarities)]
+
+            nprobe = self.nprobe or IVFIndex.default_nprobe(self._index.nlist)
+            results = []
+            for query in queries:
+                rows = self._index.candidates(query, nprobe)
+                if mask is not None:
+                    rows = rows[mask[rows]]
+                results.append(self._rank(query, self._dot(query, rows), rows, limit, score_threshold))
+            return results
+
+    def _mask(self, where: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        if not where:
+            return None
+        return np.fromiter((_matches(metadata, where) for metadata in self._metadatas), dtype=bool, count=self.count)
+
+    def sync_lexical(self) -> int:
+        """Add rows saved since the last call to the BM25 index; returns how many"""
+        with self._lock:
+            if self.lexical is None:
+                self.lexical = BM25Index()
+            start = len(self.lexical)
+            # Ids are content hashes, so an upserted row's text never changes
+            self.lexical.add_many(self._contents[start:self.count])
+            return self.count - start
+
+    def hybrid_search(self, query_text: str, query_vector, limit: int = 5, score_threshold: Optional[float] = None,
+                      where: Optional[Dict[str, Any]] = None) -> List[Tuple[int, float]]:
+        """Vector and BM25 results merged by reciprocal-rank fusion, as (row, vector score) pairs.
+
+        Embeddings barely tell identifiers apart, so rows containing one from
+        the query (a token with letters and digits, like an order number or SKU) come
+        first, even below ``score_threshold``, as long as at most
+        ``PREFILTER_MAX_ROWS`` rows contain it. When at least ``limit`` rows
+        do, they are the only vector candidates and the matrix is not
+        scanned.
+        """
+        query = normalize_rows(query_vector)[0]
+        tokens = tokenize(query_text)
+        with self._lock:
+            if self.count == 0 or limit <= 0:
+                return []
+            self.sync_lexical()
+            mask = self._mask(where)
+            exact_rows = self.lexical.rows_with_any(token for token in tokens if is_identifier(token))
+            if mask is not None:
+                exact_rows = exact_rows[mask[exact_rows]]
+            if len(exact_rows) > PREFILTER_MAX_ROWS:
+                exact_rows = exact_rows[:0]  # not selective enough to stand for the query
+            lexical_rows, _ = self.lexical.search(tokens, LEXICAL_CANDIDATES, mask)
+
+            if len(exact_rows) >= limit:
+                vector_rows = exact_rows
+            else:
+                vector_rows = np.asarray([row for row, _ in self.search(
+                    query, limit * HYBRID_DEPTH_FACTOR, where=where)[0]], dtype=np.int64)
+
+            candidates = np.unique(np.concatenate([vector_rows, lexical_rows, exact_rows]))
+            matrix = self._matrix if self._matrix is not None else self._rows()
+            similarities = dict(zip(candidates.tolist(), (np.asarray(matrix[candidates]) @ query).tolist()))
+            rankings = [sorted(rows.tolist(), key=similarities.__getitem__, reverse=True)
+                        for rows in (vector_rows, exact_rows)]
+            fused = reciprocal_rank_fusion([rankings[0], lexical_rows.tolist(), rankings[1]])
+
+            exact = set(rankings[1])
+            results = []
+            for row in [row for row in fused if row in exact] + [row for row in fused if row not in exact]:
+                score = float(similarity_to_score(similarities[row]))
+                if score_threshold and score < score_threshold and row not in exact:
+                    continue
+                results.append((row, score))
+                if len(results) == limit:
+                    break
+            return results
+
+    def _rank(self, query: np.ndarray, similarities: np.ndarray, rows: Optional[np.ndarray], limit: int,
+              score_threshold: Optional[float]) -> List[Tuple[int, float]]:
+        """Best rows by similarity; a quantized collection re-scores its best candidates at full precision"""
+        if self._codes is not None and self.rerank and self._matrix is not None:
+            candidates = self._best(similarities, limit * RERANK_FACTOR)
+            candidates = candidates[np.isfinite(similarities[candidates])]
+            rows = np.sort(rows[candidates] if rows is not None else candidates)
+            similarities = np.asarray(self._matrix[rows]) @ query
+        return self._top(similarities, rows, limit, score_threshold)
+
+    @staticmethod
+    def _best(similarities: np.ndarray, count: int) -> np.ndarray:
+        if len(similarities) > count:
+            return np.argpartition(-similarities, count - 1)[:count]
+        return np.arange(len(similarities))
+
+    @classmethod
+    def _top(cls, similarities: np.ndarray, rows: Optional[np.ndarray], limit: int,
+             score_threshold: Optional[float]) -> List[Tuple[int, float]]:
+        best = cls._best(similarities, limit)
+        best = best[np.argsort(-similarities[best], kind="stable")]
+        scores = similarity_to_score(similarities[best])
+        keep = np.isfinite(similarities[best])
+        if score_threshold:
+            keep &= scores >= score_threshold
+        best_rows = rows[best] if rows is not None else best
+        return [(int(row), float(score)) for row, score in zip(best_rows[keep], scores[keep])]
+
+    def record(self, row: int, score: float) -> Dict[str, Any]:
+        """A CrewAI SearchResult for a row"""
+        with self._lock:
+            return {"id": self._row_ids[row], "content": self._contents[row],
+                    "metadata": dict(self._metadatas[row]), "score": score}
+
+    def reset(self):
+        """Delete every row and the files on disk"""
+        with self._lock:
+            self._matrix = self._codes = self._scales = None
+            for name in (VECTORS_FILE, *QUANTIZED_FILES.values(), SCALES_FILE, RECORDS_FILE, MANIFEST_FILE,
+                         INDEX_FILE):
+                if os.path.exists(self._path(name)):
+                    os.remove(self._path(name))
+            self.dim = None
+            self.count = 0
+            self._capacity = 0
+            self._ids.clear()
+            self._row_ids.clear()
+            self._contents.clear()
+            self._metadatas.clear()
+            self._index = None
+            self._index_dirty = False
+            self.lexical = None
+
+    def flush(self):
+        """Write dirty matrix pages and the index's late assignments to disk"""
+        with self._lock:
+            for array in (self._matrix, self._codes, self._scales):
+                if array is not None:
+                    array.flush()
+            if self._index is not None and self._index_dirty:
+                self._index.save(self._path(INDEX_FILE))
+                self._index_dirty = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "rows": self.count,
+                "dim": self.dim,
+                "dtype": self.dtype,
+                "rerank": self.rerank and self.dtype != "float32",
+                # Bytes per row read by a full scan (int8 includes its scale)
+                "scan_bytes_per_vector": ({"float32": 4, "float16": 2, "int8": 1}[self.dtype] * self.dim
+                                          + (4 if self.dtype == "int8" else 0)) if self.dim else 0,
+                "capacity": self._capacity,
+                "index": "ivf" if self.count > self.ivf_threshold else "exact",
+                "nlist": self._index.nlist if self._index is not None else 0,
+                "lexical_rows": len(self.lexical) if self.lexical is not None else 0,
+                "lexical_terms": self.lexical.term_count if self.lexical is not None else 0
+            }
+
+
+_collections: Dict[str, VectorCollection] = {}
+_collections_lock = threading.Lock()
+
+
+def open_collection(directory: str, dtype: str = "float32", rerank: bool = True) -> VectorCollection:
+    """The process-wide collection for a directory (pooled crews share one)"""
+    directory = os.path.abspath(directory)
+    with _collections_lock:
+        collection = _collections.get(directory)
+        if collection is None:
+            collection = _collections[directory] = VectorCollection(directory, dtype, rerank)
+        return collection
+
+
+def collection_stats() -> Dict[str, Dict[str, Any]]:
+    with _collections_lock:
+        collections = dict(_collections)
+    return {directory: collection.stats() for directory, collection in collections.items()}
+
+
+@atexit.register
+def _flush_collections():
+    with _collections_lock:
+        collections = list(_collections.values())
+    for collection in collections:
+        collection.flush()
+
+
+class MmapRAGStorage(BaseRAGStorage):
+    """Drop-in replacement for CrewAI's RAGStorage on a VectorCollection.
+
+    Pass it as ``ShortTermMemory(storage=...)`` or ``EntityMemory(storage=...)``.
+    Like RAGStorage it is named after the crew's agent roles and lives in
+    ``<storage dir>/<type>/<roles>/``, so it sits next to the Chroma and
+    long-term memory files in ``CREWAI_STORAGE_DIR``. ``embedder`` turns a
+    list of texts into vectors, e.g. the shared cached embedder. ``dtype``
+    and ``rerank`` apply when the collection is first created. With
+    ``hybrid``, searches fuse BM25 and vector rankings (see
+    ``VectorCollection.hybrid_search``).
+    """
+
+    def __init__(self, type: str, embedder: Callable[[List[str]], Sequence], crew: Any = None,
+                 agents: Optional[Sequence[Any]] = None, path: Optional[str] = None, allow_reset: bool = True,
+                 dtype: str = "float32", rerank: bool = True, hybrid: bool = False):
+        self.type = type
+        self.allow_reset = allow_reset
+        self.embedder_config = None
+        self.crew = crew
+        agents = agents if agents is not None else (crew.agents if crew else [])
+        self.agents = "_".join(self._sanitize_role(agent.role) for agent in agents)
+        self.embedder = embedder
+        self.hybrid = hybrid
+        self.path = path or os.environ.get('CREWAI_STORAGE_DIR', './storage')
+        # Same trimming as RAGStorage._build_storage_file_name
+        self.collection = open_collection(os.path.join(self.path, type, self.agents[:255] or "default"),
+                                          dtype, rerank)
+
+    def _sanitize_role(self, role: str) -> str:
+        return role.replace("\n", "").replace(" ", "_").replace("/", "_")
+
+    def save(self, value: Any, metadata: Dict[str, Any]) -> None:
+        try:
+            self.save_many([value], [metadata])
+        except Exception as e:
+            logging.error(f"Error during {self.type} save: {e!s}\n{traceback.format_exc()}")
+
+    def save_many(self, values: Sequence[Any], metadatas: Sequence[Dict[str, Any]],
+                  vectors: Optional[Sequence] = None) -> None:
+        """Save several memories with one embedding call (or given ``vectors``) and one insert; raises on failure"""
+        contents = [str(value) for value in values]
+        if vectors is None:
+            vectors = self.embedder(contents)
+        self.collection.add([record_id(content, metadata) for content, metadata in zip(contents, metadatas)],
+                            contents, list(metadatas), vectors)
+
+    def search(self, query: str, limit: int = 5, filter: Optional[Dict[str, Any]] = None,
+               score_threshold: float = 0.6) -> List[Any]:
+        try:
+            if self.hybrid:
+                hits = self.collection.hybrid_search(query, self.embedder([query]), limit, score_threshold, filter)
+            else:
+                hits = self.collection.search(self.embedder([query]), limit, score_threshold, where=filter)[0]
+            return [self.collection.record(row, score) for row, score in hits]
+        except Exception as e:
+            logging.error(f"Error during {self.type} search: {e!s}\n{traceback.format_exc()}")
+            return []
+
+    def sync_lexical_index(self) -> int:
+        """Index new saves for hybrid search now rather than on the next search"""
+        return self.collection.sync_lexical() if self.hybrid else 0
+
+    def reset(self) -> None:
+        self.collection.reset()
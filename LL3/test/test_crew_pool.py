@@ -0,0 +1,91 @@
+"""
+Tests for checking learning crews out of the crew pool
+"""
+
+import os
+import sys
+import time
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.crew_pool import CrewPool
+
+
+def counting_builder():
+    built = []
+
+    def build_crew():
+        built.append(object())
+        return built[-1]
+    return build_crew, built
+
+
+def test_crews_are_built_lazily_up_to_size():
+    build_crew, built = counting_builder()
+    pool = CrewPool(build_crew, size=2, prebuild=1)
+    assert len(built) == 1
+
+    with pool.checkout() as first, pool.checkout() as second:
+        assert first is not second
+        assert pool.stats()["busy"] == 2
+    assert len(built) == 2 and pool.stats()["busy"] == 0
+
+
+def test_checkout_waits_for_a_free_crew_when_all_are_busy():
+    build_crew, built = counting_builder()
+    pool = CrewPool(build_crew, size=1)
+    holding = threading.Event()
+    got = []
+
+    def hold():
+        with pool.checkout() as crew:
+            holding.set()
+            time.sleep(0.1)
+            got.append(crew)
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    holding.wait()
+    with pool.checkout() as crew:
+        got.append(crew)
+    thread.join()
+
+    assert got == [built[0], built[0]]
+    assert pool.stats()["waits"] == 1 and pool.stats()["checkouts"] == 2
+
+
+def test_session_gets_its_previous_crew_back():
+    build_crew, built = counting_builder()
+    pool = CrewPool(build_crew, size=3, prebuild=3)
+    with pool.checkout("bob") as bob_crew, pool.checkout("alice") as alice_crew:
+        pass  # alice's crew is released first, so bob's would be handed out next
+
+    with pool.checkout("carol") as carol_crew:
+        assert carol_crew is bob_crew
+
+    with pool.checkout("alice") as again:
+        assert again is alice_crew
+    with pool.checkout("bob") as again:
+        assert again is bob_crew
+    assert pool.stats()["sessions"] == 3
+
+
+def test_failed_build_frees_its_slot():
+    calls = []
+
+    def build_crew():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("no API key")
+        return object()
+
+    pool = CrewPool(build_crew, size=1, prebuild=0)
+    with pytest.raises(RuntimeError):
+        with pool.checkout():
+            pass
+    with pool.checkout() as crew:
+        assert crew is not None
+    assert pool.stats()["built"] == 1
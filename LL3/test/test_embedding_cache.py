@@ -0,0 +1,72 @@
+"""
+Tests for the persistent embedding cache
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.embedding_cache import CachedEmbedder, EmbeddingCache, cache_key
+
+
+class CountingEmbedder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [np.full(4, len(text), dtype=np.float32) for text in texts]
+
+
+def test_only_missing_texts_are_embedded_and_whitespace_is_normalized(tmp_path):
+    embed = CountingEmbedder()
+    embedder = CachedEmbedder(embed, "model", EmbeddingCache(str(tmp_path / "cache.db")))
+
+    first = embedder(["refund policy", "shipping  time"])
+    second = embedder(["shipping time\n", "refund policy", "warranty"])
+
+    assert embed.calls == [["refund policy", "shipping time"], ["warranty"]]
+    np.testing.assert_array_equal(second[0], first[1])
+    assert embedder.cache.stats()["memory_hits"] == 2
+
+
+def test_vectors_survive_a_restart(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = EmbeddingCache(path)
+    CachedEmbedder(CountingEmbedder(), "model", cache)(["refund policy"])
+    cache.close()
+
+    embed = CountingEmbedder()
+    reopened = EmbeddingCache(path)
+    vector = CachedEmbedder(embed, "model", reopened)(["refund policy"])[0]
+
+    assert embed.calls == []
+    np.testing.assert_array_equal(vector, np.full(4, 13, dtype=np.float32))
+    assert reopened.stats()["disk_hits"] == 1
+
+
+def test_models_do_not_share_vectors(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.db"))
+    embed = CountingEmbedder()
+    CachedEmbedder(embed, "small", cache)(["hello"])
+    CachedEmbedder(embed, "large", cache)(["hello"])
+
+    assert len(embed.calls) == 2
+    assert cache_key("small", "hello") != cache_key("large", "hello")
+
+
+def test_least_recently_used_rows_are_evicted(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.db"), max_entries=2, memory_entries=1)
+    embedder = CachedEmbedder(CountingEmbedder(), "model", cache)
+    embedder(["a"])
+    embedder(["b"])
+    embedder(["a"])  # memory miss, disk hit: "a" is now more recent than "b"
+    embedder(["c"])
+
+    assert cache.stats()["disk_entries"] == 2
+    keys = [cache_key("model", text) for text in ("a", "b", "c")]
+    cache._memory.clear()
+    assert set(cache.get_many(keys)) == {keys[0], keys[2]}
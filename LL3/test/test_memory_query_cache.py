@@ -0,0 +1,147 @@
+"""
+Tests for the memory query cache and prefetching memory searches
+"""
+
+import os
+import sys
+import time
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.memory_query_cache import CachedQueryStorage, MemoryQueryCache
+from src.memory_prefetch import CONTEXT_SCORE_THRESHOLD, CONTEXT_SEARCH_LIMIT, MemoryPrefetcher
+
+
+class FakeStorage:
+    """A storage that counts searches and can hold them until released"""
+
+    def __init__(self, type="short_term"):
+        self.type = type
+        self.memories = []
+        self.queries = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def save(self, value, metadata):
+        self.memories.append(value)
+
+    def search(self, query, limit=5, filter=None, score_threshold=0.6):
+        self.queries.append(query)
+        self.release.wait()
+        return [{"content": memory} for memory in self.memories if query in memory][:limit]
+
+    def reset(self):
+        self.memories.clear()
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def test_repeated_search_is_served_from_the_cache():
+    storage = FakeStorage()
+    storage.save("refund for order 7", {})
+    cached = CachedQueryStorage(storage, MemoryQueryCache(ttl=60))
+
+    first = cached.search("refund")
+    first[0]["content"] = "changed by the caller"
+    second = cached.search("refund")
+
+    assert storage.queries == ["refund"]
+    assert second == [{"content": "refund for order 7"}]
+    assert cached.cache.stats()["hits"] == 1
+
+
+def test_save_invalidates_the_collection():
+    storage = FakeStorage()
+    cache = MemoryQueryCache(ttl=60)
+    cached = CachedQueryStorage(storage, cache)
+    other = CachedQueryStorage(FakeStorage(type="entities"), cache)
+    cached.search("refund")
+    other.search("refund")
+
+    cached.save("refund for order 8", {})
+
+    assert cached.search("refund") == [{"content": "refund for order 8"}]
+    other.search("refund")
+    assert len(storage.queries) == 2 and len(other.storage.queries) == 1
+
+
+def test_entries_expire_after_the_ttl():
+    storage = FakeStorage()
+    cached = CachedQueryStorage(storage, MemoryQueryCache(ttl=0.05))
+    cached.search("refund")
+    time.sleep(0.06)
+    cached.search("refund")
+
+    assert len(storage.queries) == 2
+    assert cached.cache.stats()["expired"] == 1
+
+
+def test_result_of_a_search_overlapping_a_save_is_not_cached():
+    storage = FakeStorage()
+    cached = CachedQueryStorage(storage, MemoryQueryCache(ttl=60))
+    storage.release.clear()
+    thread = threading.Thread(target=cached.search, args=("refund",))
+    thread.start()
+    wait_until(lambda: storage.queries)
+    cached.save("refund for order 9", {})
+    storage.release.set()
+    thread.join()
+
+    assert cached.search("refund") == [{"content": "refund for order 9"}]
+    assert len(storage.queries) == 2
+
+
+def test_search_query_keys_the_cache_on_the_stable_part():
+    storage = FakeStorage()
+    storage.save("refund for order 7", {})
+    cached = CachedQueryStorage(storage, MemoryQueryCache(ttl=60),
+                                search_query=lambda query: query.split("message: ")[-1])
+
+    cached.search("Turn 1\nmessage: refund")
+    cached.search("Turn 2\nmessage: refund")
+
+    assert storage.queries == ["refund"]
+
+
+def test_crew_search_joins_a_running_prefetch():
+    storage = FakeStorage()
+    storage.save("refund for order 7", {})
+    cached = CachedQueryStorage(storage, MemoryQueryCache(ttl=60))
+    prefetcher = MemoryPrefetcher(max_workers=1)
+    prefetcher.add_storage(cached)
+    prefetcher.add_storage(CachedQueryStorage(FakeStorage(), cached.cache))  # same collection, ignored
+
+    storage.release.clear()
+    futures = prefetcher.prefetch("refund")
+    wait_until(lambda: storage.queries)
+    crew_results = []
+    crew = threading.Thread(target=lambda: crew_results.append(
+        cached.search("refund", limit=CONTEXT_SEARCH_LIMIT, score_threshold=CONTEXT_SCORE_THRESHOLD)))
+    crew.start()
+    time.sleep(0.02)
+    storage.release.set()
+    crew.join()
+
+    assert len(futures) == 1 and futures[0].result() == [{"content": "refund for order 7"}]
+    assert crew_results == [[{"content": "refund for order 7"}]]
+    assert storage.queries == ["refund"]
+    assert cached.cache.stats()["joined"] == 1
+    assert prefetcher.stats()["collections"] == 1 and prefetcher.stats()["prefetches"] == 1
+
+
+def test_failed_prefetch_is_counted_and_ignored():
+    class BrokenStorage(FakeStorage):
+        def search(self, query, limit=5, filter=None, score_threshold=0.6):
+            raise RuntimeError("embedding service down")
+
+    prefetcher = MemoryPrefetcher(max_workers=1)
+    prefetcher.add_storage(CachedQueryStorage(BrokenStorage(), MemoryQueryCache(ttl=60)))
+
+    assert [future.result() for future in prefetcher.prefetch("refund")] == [None]
+    assert prefetcher.stats()["failures"] == 1
@@ -0,0 +1,59 @@
+"""
+Tests for the bounded event ring and histogram timing statistics
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.memory_stats import EventRing, StreamingStats
+
+
+def test_percentiles_are_within_the_histogram_resolution():
+    values = np.random.default_rng(0).lognormal(mean=3, sigma=1, size=20_000)
+    stats = StreamingStats()
+    for value in values:
+        stats.add(float(value))
+
+    estimated = stats.percentiles((50, 95, 99))
+    for percent in (50, 95, 99):
+        assert estimated[f"p{percent}"] == pytest.approx(np.percentile(values, percent), rel=0.04)
+    assert stats.mean == pytest.approx(values.mean())
+    assert (stats.min, stats.max) == (values.min(), values.max())
+
+
+def test_small_samples_are_clamped_to_the_exact_extremes():
+    stats = StreamingStats()
+    stats.add(5.0)
+    stats.add(float("nan"))
+    stats.add(None)
+
+    assert stats.count == 1
+    assert stats.percentiles() == {"p50": 5.0, "p95": 5.0, "p99": 5.0}
+
+
+def test_empty_stats_and_empty_percent_list():
+    stats = StreamingStats()
+
+    assert stats.percentiles() == {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+    assert stats.percentiles(()) == {}
+    stats.add(1.0)
+    assert stats.percentiles(()) == {}
+    assert stats.summary(())["count"] == 1
+
+
+def test_event_ring_keeps_the_latest_events():
+    ring = EventRing(capacity=3)
+    for event_id in range(1, 6):
+        ring.append({"id": event_id})
+
+    assert [event["id"] for event in ring.recent(10)] == [3, 4, 5]
+    assert [event["id"] for event in ring.recent(2)] == [4, 5]
+    assert [event["id"] for event in ring.since(3)] == [4, 5]
+    assert [event["id"] for event in ring.since(0)] == [3, 4, 5]
+    assert ring.recent(0) == []
+    assert (len(ring), ring.total) == (3, 5)
@@ -0,0 +1,148 @@
+"""
+Tests for write-behind memory saves
+"""
+
+import os
+import sys
+import time
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src import memory_write_behind
+from src.memory_write_behind import EVENTUAL, WriteBehindQueue, WriteBehindStorage
+
+
+class FakeStorage:
+    """A bulk-saving storage whose writes can be held until released"""
+
+    def __init__(self, type="short_term", embedder=None):
+        self.type = type
+        self.embedder = embedder
+        self.memories = []
+        self.batches = []
+        self.vectors = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def save_many(self, values, metadatas, vectors=None):
+        self.release.wait()
+        self.batches.append(list(values))
+        self.vectors.append(vectors)
+        self.memories.extend(values)
+
+    def search(self, query, limit=5, filter=None, score_threshold=0.6):
+        return [memory for memory in self.memories if query in memory]
+
+    def reset(self):
+        self.memories.clear()
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def test_search_sees_earlier_saves_in_read_your_writes_mode():
+    storage = FakeStorage()
+    writes = WriteBehindStorage(storage, WriteBehindQueue(max_delay=0.05))
+
+    for turn in range(3):
+        writes.save(f"turn {turn}", {})
+
+    assert writes.search("turn") == ["turn 0", "turn 1", "turn 2"]
+    assert storage.batches == [["turn 0", "turn 1", "turn 2"]]
+
+
+def test_eventual_search_does_not_wait_for_queued_saves():
+    storage = FakeStorage()
+    storage.release.clear()
+    queue = WriteBehindQueue(consistency=EVENTUAL, max_delay=0)
+    writes = WriteBehindStorage(storage, queue)
+    writes.save("turn 0", {})
+
+    assert writes.search("turn") == []
+    storage.release.set()
+    assert queue.flush(5)
+    assert writes.search("turn") == ["turn 0"]
+
+
+def test_saves_are_batched_per_collection_and_embedded_together():
+    calls = []
+
+    def embed(texts):
+        calls.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+    short_term, entities = FakeStorage(embedder=embed), FakeStorage(type="entities", embedder=embed)
+    written = []
+    queue = WriteBehindQueue(on_write=written.append, max_delay=0.05)
+    short_term.release.clear()
+    WriteBehindStorage(short_term, queue).save("hold the writer", {})
+    wait_until(lambda: not queue._pending)  # the first save is being written
+    WriteBehindStorage(short_term, queue).save("a", {})
+    WriteBehindStorage(entities, queue).save("bb", {})
+    WriteBehindStorage(entities, queue).save("ccc", {})
+    short_term.release.set()
+    queue.flush()
+
+    assert calls == [["a", "bb", "ccc"]]
+    assert short_term.batches == [["hold the writer"], ["a"]]
+    assert entities.batches == [["bb", "ccc"]] and entities.vectors == [[[2.0], [3.0]]]
+    assert sorted(set(written)) == ["memory_entities", "memory_short_term"]
+    stats = queue.stats()
+    assert (stats["written"], stats["failures"], stats["batches"], stats["pending"]) == (4, 0, 3, 0)
+
+
+def test_failed_write_is_counted_and_the_writer_keeps_going():
+    class BrokenStorage(FakeStorage):
+        def save_many(self, values, metadatas, vectors=None):
+            raise RuntimeError("disk full")
+
+    queue = WriteBehindQueue(max_delay=0)
+    WriteBehindStorage(BrokenStorage(), queue).save("lost", {})
+    queue.flush()
+    good = WriteBehindStorage(FakeStorage(), queue)
+    good.save("kept", {})
+
+    assert good.search("kept") == ["kept"]
+    assert queue.stats()["failures"] == 1 and queue.stats()["written"] == 1
+
+
+def test_stuck_write_times_out_the_search_and_is_counted(monkeypatch):
+    monkeypatch.setattr(memory_write_behind, "SEARCH_FLUSH_TIMEOUT", 0.05)
+    storage = FakeStorage()
+    storage.release.clear()
+    queue = WriteBehindQueue(max_delay=0)
+    writes = WriteBehindStorage(storage, queue)
+    writes.save("stuck", {})
+
+    assert writes.search("stuck") == []
+    assert queue.stats()["flush_timeouts"] == 1
+    storage.release.set()
+    assert queue.flush(5)
+
+
+def test_reset_drops_queued_saves():
+    storage = FakeStorage()
+    storage.release.clear()
+    queue = WriteBehindQueue(max_delay=0)
+    writes = WriteBehindStorage(storage, queue)
+    writes.save("being written", {})
+    wait_until(lambda: not queue._pending)
+    writes.save("still queued", {})
+
+    threading.Timer(0.05, storage.release.set).start()
+    writes.reset()
+
+    assert storage.memories == []
+    assert queue.stats()["pending"] == 0 and queue.stats()["written"] == 1
+
+
+def test_unknown_consistency_mode_is_rejected():
+    with pytest.raises(ValueError, match="Unknown consistency mode"):
+        WriteBehindQueue(consistency="strong")
@@ -0,0 +1,157 @@
+"""
+Tests for the in-process vector store: quantized and IVF search, persistence and hybrid search
+"""
+
+import os
+import sys
+import zlib
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.vector_store import RECORDS_FILE, INDEX_FILE, VectorCollection, normalize_rows, similarity_to_score
+
+
+def embed(texts):
+    """Unrelated random unit vectors, so only the lexical side can match"""
+    return normalize_rows(np.stack([np.random.default_rng(zlib.crc32(text.encode())).normal(size=32)
+                                    for text in texts]).astype(np.float32))
+
+
+def clustered(rows, dim=32, clusters=16, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    return normalize_rows((centers[rng.integers(clusters, size=rows)] + 0.3 * rng.normal(size=(rows, dim)))
+                          .astype(np.float32))
+
+
+def fill(collection, vectors):
+    ids = [f"id-{i}" for i in range(len(vectors))]
+    collection.add(ids, [f"memory {i}" for i in ids], [{"n": i} for i in range(len(vectors))], vectors)
+
+
+def exact_top(vectors, query, limit):
+    similarities = vectors @ query
+    return np.argsort(-similarities, kind="stable")[:limit].tolist(), similarities
+
+
+def test_quantized_search_reranks_at_full_precision(tmp_path):
+    vectors = clustered(2000)
+    collection = VectorCollection(str(tmp_path), dtype="int8")
+    fill(collection, vectors)
+    queries = normalize_rows(vectors[:20] + 0.05 * np.random.default_rng(1).normal(size=(20, 32)).astype(np.float32))
+
+    for query, hits in zip(queries, collection.search(queries, limit=5)):
+        expected, similarities = exact_top(vectors, query, 5)
+        assert [row for row, _ in hits] == expected
+        np.testing.assert_allclose([score for _, score in hits], similarity_to_score(similarities[expected]),
+                                   rtol=1e-5)
+
+
+def test_quantized_without_rerank_keeps_no_float32_matrix(tmp_path):
+    vectors = clustered(500)
+    collection = VectorCollection(str(tmp_path), dtype="float16", rerank=False)
+    fill(collection, vectors)
+
+    hits = collection.search(vectors[:1], limit=1)[0]
+
+    assert collection._matrix is None
+    assert hits[0][0] == 0
+    assert sorted(os.listdir(tmp_path)) == ["collection.json", "records.jsonl", "vectors.f16"]
+
+
+def test_ivf_index_is_built_past_the_threshold_and_probes_nearby_lists(tmp_path):
+    vectors = clustered(3000)
+    collection = VectorCollection(str(tmp_path), ivf_threshold=1000)
+    fill(collection, vectors)
+    queries = vectors[:50]
+
+    results = collection.search(queries, limit=10)
+
+    assert collection.stats()["index"] == "ivf" and collection.stats()["nlist"] > 1
+    assert os.path.exists(tmp_path / INDEX_FILE)
+    recall = np.mean([len({row for row, _ in hits} & set(exact_top(vectors, query, 10)[0])) / 10
+                      for query, hits in zip(queries, results)])
+    assert recall >= 0.9
+    index = collection._index
+    assert len(index.candidates(queries[0], 1)) < collection.count
+    assert np.array_equal(index.candidates(queries[0], index.nlist), np.arange(collection.count))
+
+
+def test_rows_added_after_the_index_is_built_are_searchable(tmp_path):
+    vectors = clustered(1500)
+    collection = VectorCollection(str(tmp_path), ivf_threshold=1000)
+    fill(collection, vectors[:1200])
+    collection.build_index()
+    collection.add(["late"], ["late memory"], [{}], vectors[1400:1401])
+
+    assert collection.search(vectors[1400:1401], limit=1)[0][0][0] == 1200
+
+
+def test_reopening_a_collection_maps_the_same_rows(tmp_path):
+    vectors = clustered(300)
+    collection = VectorCollection(str(tmp_path), dtype="int8")
+    fill(collection, vectors)
+    collection.add(["id-7"], ["updated"], [{"n": 7, "edited": True}], vectors[7:8])
+    before = collection.search(vectors[:5], limit=3)
+    collection.flush()
+    with open(tmp_path / RECORDS_FILE, 'a', encoding='utf-8') as f:
+        f.write('{"row": 300, "id": "torn')  # a write cut short by a crash
+
+    reopened = VectorCollection(str(tmp_path), dtype="float32")
+
+    assert (reopened.count, reopened.dtype) == (300, "int8")
+    assert reopened.search(vectors[:5], limit=3) == before
+    assert reopened.record(7, 1.0)["content"] == "updated"
+    assert reopened.record(7, 1.0)["metadata"] == {"n": 7, "edited": True}
+    assert reopened.add(["id-3", "new"], ["memory id-3", "new"], [{}, {}], vectors[3:5]) == 1
+
+
+def test_failed_write_leaves_ids_unassigned(tmp_path):
+    vectors = clustered(3)
+    collection = VectorCollection(str(tmp_path))
+    fill(collection, vectors[:1])
+    os.remove(tmp_path / RECORDS_FILE)
+    os.mkdir(tmp_path / RECORDS_FILE)  # appending records fails
+
+    with pytest.raises(OSError):
+        collection.add(["a", "b"], ["a", "b"], [{}, {}], vectors[1:])
+
+    assert collection.count == 1 and set(collection._ids) == {"id-0"}
+    os.rmdir(tmp_path / RECORDS_FILE)
+    assert collection.add(["b", "a", "b"], ["b", "a", "b"], [{}, {}, {}], vectors[[2, 1, 2]]) == 2
+    assert [collection.record(row, 1.0)["id"] for row in range(collection.count)] == ["id-0", "b", "a"]
+
+
+def test_identifier_rows_are_pinned_first_even_below_the_threshold(tmp_path):
+    contents = ["Order ORD-555 was delayed by the courier."] + [f"Shipping question number {i}" for i in range(30)]
+    collection = VectorCollection(str(tmp_path))
+    vectors = embed(contents)
+    collection.add([str(i) for i in range(len(contents))], contents, [{} for _ in contents], vectors)
+    query = "Shipping question about ORD-555"
+    # A query vector close to an unrelated row, so vector search alone ranks ORD-555 low
+    query_vector = vectors[5:6]
+
+    hits = collection.hybrid_search(query, query_vector, limit=3, score_threshold=0.9)
+
+    assert hits[0][0] == 0 and hits[0][1] < 0.9
+    assert all(score >= 0.9 for _, score in hits[1:])
+    assert collection.hybrid_search(query, query_vector, limit=3, where={"missing": 1}) == []
+
+
+def test_order_number_is_pinned_but_counters_are_not(tmp_path):
+    contents = [
+        "Customer asked where order ORD-104233 is; it ships tomorrow.",
+        "Closed 100 tickets this week.",
+        "Refunded 100 dollars for a damaged blender.",
+        "Customer asked about order ORD-104299 and got a tracking link."
+    ]
+    collection = VectorCollection(str(tmp_path))
+    collection.add([str(i) for i in range(len(contents))], contents, [{} for _ in contents], embed(contents))
+
+    query = "Total Conversations: 100\nCustomer message: Where is my order ORD-104233?"
+    hits = collection.hybrid_search(query, embed([query]), limit=5, score_threshold=0.6)
+
+    assert [row for row, _ in hits] == [0]